@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Benchmark of vectorized issue lifecycle analytics on a synthetic data set."""
+
+import collections
+import sys
+import time
+
+import click
+import numpy
+
+from githubcap.analytics import burndown
+from githubcap.analytics import IssueColumns
+from githubcap.analytics import label_throughput
+from githubcap.analytics import time_to_close
+from githubcap.analytics import time_to_first_response
+
+_SECONDS_PER_DAY = 24 * 3600
+
+
+def _generate_columns(count: int, repositories: int, labels: int, milestones: int, seed: int) -> IssueColumns:
+    """Generate synthetic issue columns, issues are created during 5 years, about 80% of them are closed."""
+    rand = numpy.random.RandomState(seed)
+    created_at = numpy.datetime64('2013-01-01T00:00:00') + rand.randint(0, 5 * 365 * _SECONDS_PER_DAY, count)
+    lifetime = rand.exponential(30 * _SECONDS_PER_DAY, count).astype('int64')
+    closed_at = created_at + lifetime
+    closed_at[rand.random_sample(count) < 0.2] = numpy.datetime64('NaT')
+    updated_at = numpy.where(numpy.isnat(closed_at), created_at + lifetime // 2, closed_at)
+
+    label_counts = rand.randint(0, 4, count)
+    label_offsets = numpy.zeros(count + 1, dtype='int64')
+    numpy.cumsum(label_counts, out=label_offsets[1:])
+    assignee_counts = rand.randint(0, 2, count)
+    assignee_offsets = numpy.zeros(count + 1, dtype='int64')
+    numpy.cumsum(assignee_counts, out=assignee_offsets[1:])
+
+    return IssueColumns(
+        repository=rand.randint(0, repositories, count).astype('int32'),
+        number=numpy.arange(1, count + 1, dtype='int64'),
+        id=numpy.arange(1, count + 1, dtype='int64') + 100000000,
+        state=numpy.where(numpy.isnat(closed_at), 0, 1).astype('int8'),
+        author_association=rand.randint(0, 7, count).astype('int8'),
+        user=rand.randint(0, 10000, count).astype('int32'),
+        comments=rand.poisson(3, count).astype('int32'),
+        milestone=rand.randint(-1, milestones, count).astype('int32'),
+        created_at=created_at,
+        updated_at=updated_at,
+        closed_at=closed_at,
+        label_codes=rand.randint(0, labels, label_offsets[-1]).astype('int32'),
+        label_offsets=label_offsets,
+        assignee_codes=rand.randint(0, 10000, assignee_offsets[-1]).astype('int32'),
+        assignee_offsets=assignee_offsets,
+        repositories=numpy.array(['org/repo-{}'.format(i) for i in range(repositories)]),
+        states=numpy.array(['open', 'closed']),
+        author_associations=numpy.array(['OWNER', 'CONTRIBUTOR', 'MEMBER', 'COLLABORATOR', 'FIRST_TIME_CONTRIBUTOR',
+                                         'FIRST_TIMER', 'NONE']),
+        logins=numpy.array(['user-{}'.format(i) for i in range(10000)]),
+        milestones=numpy.array(['v{}'.format(i) for i in range(milestones)]),
+        labels=numpy.array(['label-{}'.format(i) for i in range(labels)]),
+    )
+
+
+def _time_to_close_loop(columns: IssueColumns) -> dict:
+    """Compute mean time to close per repository using a plain Python loop, used as a baseline."""
+    total = collections.defaultdict(float)
+    count = collections.Counter()
+    repositories = columns.repositories.tolist()
+    for repository, created_at, closed_at in zip(columns.repository.tolist(), columns.created_at.tolist(),
+                                                 columns.closed_at.tolist()):
+        if closed_at is not None:
+            total[repositories[repository]] += (closed_at - created_at).total_seconds()
+            count[repositories[repository]] += 1
+    return {repository: total[repository] / count[repository] for repository in count}
+
+
+def _measure(func) -> float:
+    """Measure time needed to call func."""
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--count', '-n', type=int, default=1000000, show_default=True,
+              help="Number of issues in the generated data set.")
+@click.option('--repositories', type=int, default=200, show_default=True,
+              help="Number of repositories in the generated data set.")
+@click.option('--labels', type=int, default=50, show_default=True,
+              help="Number of labels in the generated data set.")
+@click.option('--milestones', type=int, default=30, show_default=True,
+              help="Number of milestones in the generated data set.")
+@click.option('--seed', type=int, default=42, show_default=True,
+              help="Seed for data set generation.")
+@click.option('--baseline/--no-baseline', default=True, show_default=True,
+              help="Measure also time to close computed using a Python loop.")
+def bench_analytics(count: int, repositories: int, labels: int, milestones: int, seed: int, baseline: bool) -> None:
+    """Measure computation of issue lifecycle metrics on synthetic issue columns."""
+    start = time.perf_counter()
+    columns = _generate_columns(count, repositories, labels, milestones, seed)
+    click.echo("Generated {} issues in {:.3f}s, columns take {:.1f} MB".format(
+        len(columns), time.perf_counter() - start, columns.nbytes / 1024 / 1024))
+
+    first_comment_at = columns.created_at + numpy.random.RandomState(seed).exponential(
+        2 * _SECONDS_PER_DAY, count).astype('int64')
+    first_comment_at[columns.comments == 0] = numpy.datetime64('NaT')
+
+    results = [
+        ('time_to_close', _measure(lambda: time_to_close(columns))),
+        ('time_to_close/repository', _measure(lambda: time_to_close(columns, 'repository'))),
+        ('time_to_close/label', _measure(lambda: time_to_close(columns, 'label'))),
+        ('time_to_close/milestone', _measure(lambda: time_to_close(columns, 'milestone'))),
+        ('time_to_close/month', _measure(lambda: time_to_close(columns, 'month'))),
+        ('time_to_first_response', _measure(lambda: time_to_first_response(columns, first_comment_at, 'label'))),
+        ('burndown/week', _measure(lambda: burndown(columns, 'week'))),
+        ('burndown/day/repository', _measure(lambda: burndown(columns, 'day', 'repository'))),
+        ('label_throughput/week', _measure(lambda: label_throughput(columns, 'week'))),
+    ]
+    if baseline:
+        results.append(('loop time_to_close/repository', _measure(lambda: _time_to_close_loop(columns))))
+
+    for name, elapsed in results:
+        click.echo("{:<32s} {:8.3f}s".format(name, elapsed))
+
+
+if __name__ == '__main__':
+    sys.exit(bench_analytics())
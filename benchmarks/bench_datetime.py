@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Microbenchmark of datetime parsing and serialization used when (de)serializing resources."""
+
+import datetime
+import random
+import sys
+import time
+
+import click
+
+from githubcap.utils import parse_datetime
+from githubcap.utils import serialize_datetime
+
+_DATETIME_ISO_8601 = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _generate_timestamps(count: int, distinct: int, seed: int) -> list:
+    """Generate a list of ISO-8601 timestamps with the given number of distinct values."""
+    rand = random.Random(seed)
+    base = datetime.datetime(2008, 1, 1)
+    pool = [
+        (base + datetime.timedelta(seconds=rand.randrange(10 * 365 * 24 * 3600))).strftime(_DATETIME_ISO_8601)
+        for _ in range(distinct)
+    ]
+    return [pool[rand.randrange(distinct)] for _ in range(count)]
+
+
+def _measure(func, items: list) -> float:
+    """Measure time needed to apply func on all items."""
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return time.perf_counter() - start
+
+
+@click.command()
+@click.option('--count', '-n', type=int, default=3000000, show_default=True,
+              help="Number of timestamps to parse and serialize.")
+@click.option('--distinct', '-d', type=int, default=50000, show_default=True,
+              help="Number of distinct timestamps in the generated data set.")
+@click.option('--seed', type=int, default=42, show_default=True,
+              help="Seed for data set generation.")
+def bench_datetime(count: int, distinct: int, seed: int) -> None:
+    """Compare strptime/strftime based datetime handling with the one provided by githubcap."""
+    timestamps = _generate_timestamps(count, distinct, seed)
+    parsed = [parse_datetime(item) for item in timestamps]
+
+    results = (
+        ('strptime', _measure(lambda item: datetime.datetime.strptime(item, _DATETIME_ISO_8601), timestamps)),
+        ('parse_datetime', _measure(parse_datetime, timestamps)),
+        ('strftime', _measure(lambda item: item.strftime(_DATETIME_ISO_8601), parsed)),
+        ('serialize_datetime', _measure(serialize_datetime, parsed)),
+    )
+
+    for name, elapsed in results:
+        click.echo("{:<20s} {:8.3f}s {:10.1f}ns/item".format(name, elapsed, elapsed / count * 1e9))
+
+
+if __name__ == '__main__':
+    sys.exit(bench_datetime())
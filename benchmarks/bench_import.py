@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Benchmark of import time of githubcap package and its submodules."""
+
+import statistics
+import subprocess
+import sys
+
+import click
+
+from githubcap import _LAZY_SUBMODULES
+
+
+def _measure(module: str, repeat: int) -> list:
+    """Import the given module in a fresh interpreter, return cumulative import times (in microseconds) of runs."""
+    times = []
+    for _ in range(repeat):
+        process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {}'.format(module)],
+                                 stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True,
+                                 check=True)
+        # Lines look like 'import time: self [us] | cumulative | imported package', the requested module is last.
+        for line in reversed(process.stderr.splitlines()):
+            if line.startswith('import time:') and line.rsplit('|', 1)[-1].strip() == module:
+                times.append(int(line.split('|')[1]))
+                break
+    return times
+
+
+@click.command()
+@click.option('--repeat', '-n', type=int, default=5, show_default=True,
+              help="Number of imports per module.")
+@click.argument('modules', nargs=-1)
+def bench_import(repeat: int, modules: tuple) -> None:
+    """Measure import time of githubcap and the given (default all) submodules, each imported in a fresh interpreter.
+
+    Times are cumulative, they include import time of all modules the measured module pulls in.
+    """
+    modules = modules or ['githubcap'] + ['githubcap.' + name for name in sorted(_LAZY_SUBMODULES)]
+    for module in modules:
+        times = _measure(module, repeat)
+        click.echo("{:<28s} {:8.1f}ms (min {:.1f}ms)".format(
+            module, statistics.median(times) / 1000, min(times) / 1000))
+
+
+if __name__ == '__main__':
+    sys.exit(bench_import())
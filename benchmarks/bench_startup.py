@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Benchmark of githubcap-cli startup time per subcommand."""
+
+import statistics
+import subprocess
+import sys
+import time
+
+import click
+
+from githubcap.commands import COMMANDS
+
+
+def _measure(command_line: list, repeat: int) -> list:
+    """Run the given command line the given number of times, return wall clock times of runs."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command_line, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+@click.command()
+@click.option('--repeat', '-n', type=int, default=10, show_default=True,
+              help="Number of CLI runs per subcommand.")
+@click.option('--client', is_flag=True,
+              help="Run commands using githubcap-client, start githubcap-cli daemon beforehand.")
+@click.argument('commands', nargs=-1)
+def bench_startup(repeat: int, client: bool, commands: tuple) -> None:
+    """Measure startup time of githubcap-cli - '--version' and '--help' of the given (default all) subcommands."""
+    cli = [sys.executable, '-m', 'githubcap.client' if client else 'githubcap.cli']
+    # Bare interpreter startup is measured as a baseline.
+    runs = [('(interpreter)', [sys.executable, '-c', 'pass']), ('--version', cli + ['--version']),
+            ('--help', cli + ['--help'])]
+    runs.extend((command, cli + [command, '--help']) for command in (commands or sorted(COMMANDS)))
+
+    for name, command_line in runs:
+        times = _measure(command_line, repeat)
+        click.echo("{:<20s} {:8.1f}ms (min {:.1f}ms)".format(
+            name, statistics.median(times) * 1000, min(times) * 1000))
+
+
+if __name__ == '__main__':
+    sys.exit(bench_startup())
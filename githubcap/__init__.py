@@ -1,13 +1,76 @@
 """A clean library for manipulating with GitHub API v3 with CLI interface and bunch of useful things."""
 
-from .configuration import Configuration
-from .configuration import ConfigurationDefaults
-from .token_management import Token
-from .token_management import TokenManagement
-from .utils import setup_logging
+import importlib
+import sys
+import typing
 
 __version__ = '1.0.0rc1'
 __title__ = 'githubcap'
 __author__ = 'Fridolin Pokorny'
 __license__ = 'ASL 2.0'
 __copyright__ = 'Copyright 2018 Fridolin Pokorny'
+
+# Attributes of the package namespace and submodules they are defined in, submodules are imported on first access
+# so importing githubcap (e.g. just to use Configuration) does not import resources, schemas or CLI dependencies.
+_LAZY_ATTRIBUTES = {
+    'Configuration': 'configuration',
+    'ConfigurationDefaults': 'configuration',
+    'setup_logging': 'utils',
+}
+_LAZY_SUBMODULES = frozenset((
+    'analytics',
+    'base',
+    'batch',
+    'bench',
+    'classes',
+    'cli',
+    'client',
+    'commands',
+    'configuration',
+    'daemon',
+    'enums',
+    'exceptions',
+    'manipulators',
+    'pagination',
+    'profiling',
+    'schemas',
+    'scraping',
+    'serialization',
+    'storage',
+    'utils',
+    'watch',
+))
+
+__all__ = sorted(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> typing.Any:
+    """Load package attributes lazily - submodules, their exported attributes and resource classes (e.g. Issue)."""
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module('.' + _LAZY_ATTRIBUTES[name], __name__), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module('.' + name, __name__)
+    elif name[:1].isupper():
+        # Resource classes are accessible directly from the package namespace.
+        value = getattr(importlib.import_module('.classes', __name__), name, None)
+        if not isinstance(value, type):
+            raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    # Cache the value so the next access does not go through __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> typing.List[str]:
+    """List package attributes including the ones loaded lazily."""
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | _LAZY_SUBMODULES)
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # Module __getattr__ (PEP 562) is not supported, attributes are imported eagerly; submodules and resource classes
+    # are accessible once imported explicitly.
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
+    del _name
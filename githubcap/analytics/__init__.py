@@ -0,0 +1,7 @@
+"""Vectorized analytics of issues, requires NumPy."""
+
+from .columnar import IssueColumns
+from .lifecycle import burndown
+from .lifecycle import label_throughput
+from .lifecycle import time_to_close
+from .lifecycle import time_to_first_response
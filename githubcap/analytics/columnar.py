@@ -0,0 +1,374 @@
+"""Columnar representation of issue listings backed by NumPy arrays.
+
+Issues are stored column by column - numbers and ids as int64 arrays, timestamps as datetime64 arrays (NaT denotes
+a missing value) and categorical attributes (repository, state, author association, author, milestone) as integer
+codes into string tables. Milestones are distinguished by repository and number, as milestones of different
+repositories can share a title - the milestones table holds titles, milestone_repositories and milestone_numbers
+identify them. Labels and assignees, which are lists, are stored as flat arrays of codes together with offsets
+delimiting codes of each issue (row i owns codes[offsets[i]:offsets[i + 1]]).
+
+NumPy is an optional dependency, it is required only when columns are built or loaded.
+"""
+
+import logging
+import typing
+
+import githubcap.enums as enums
+from githubcap.base import GitHubBase
+from githubcap.exceptions import MissingDependency
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+_LOG = logging.getLogger(__name__)
+
+_DEFAULT_CHUNK_SIZE = 65536
+# Code used for missing categorical values (e.g. an issue without milestone).
+MISSING = -1
+
+
+def require_numpy() -> None:
+    """Make sure NumPy is available, raise an exception otherwise."""
+    if numpy is None:
+        raise MissingDependency("NumPy is required for columnar analytics, install it using 'pip3 install numpy'")
+
+
+def _get_repository_name(repository_url: str) -> str:
+    """Get full name of repository (owner/name) from its API URL."""
+    return '/'.join(repository_url.rsplit('/', maxsplit=2)[-2:])
+
+
+class _Categories(object):
+    """A string table assigning integer codes to categorical values in order of their first occurrence."""
+
+    def __init__(self, values: typing.Iterable[str] = ()):
+        """Initialize string table, optionally with values that should get the lowest codes."""
+        self.codes = {}
+        self.values = []
+        for value in values:
+            self.get_code(value)
+
+    def get_code(self, value: typing.Optional[str]) -> int:
+        """Get code of the given value, the value is added to the table if not present yet."""
+        if value is None:
+            return MISSING
+
+        code = self.codes.get(value)
+        if code is None:
+            code = len(self.values)
+            self.codes[value] = code
+            self.values.append(value)
+        return code
+
+    def to_array(self) -> 'numpy.ndarray':
+        """Get string table as a NumPy array, so codes can be translated to values using fancy indexing."""
+        return numpy.array(self.values, dtype=str)
+
+
+class _ColumnsBuilder(object):
+    """Build issue columns from a stream of issues.
+
+    Rows are accumulated in Python lists only up to chunk size, each full chunk is converted to NumPy arrays and the
+    chunks are concatenated once the stream is exhausted.
+    """
+
+    _SCALAR_COLUMNS = (
+        ('repository', 'int32'),
+        ('number', 'int64'),
+        ('id', 'int64'),
+        ('state', 'int8'),
+        ('author_association', 'int8'),
+        ('user', 'int32'),
+        ('comments', 'int32'),
+        ('milestone', 'int32'),
+        ('created_at', 'datetime64[s]'),
+        ('updated_at', 'datetime64[s]'),
+        ('closed_at', 'datetime64[s]'),
+    )
+
+    def __init__(self, chunk_size: int):
+        """Initialize an empty builder."""
+        self.chunk_size = chunk_size
+        self.repositories = _Categories()
+        self.states = _Categories(state.value for state in enums.IssueState if state != enums.IssueState.ALL)
+        self.author_associations = _Categories(item.value for item in enums.AuthorAssociation)
+        self.logins = _Categories()
+        # Keyed by repository name and milestone number, titles are kept aside.
+        self.milestones = _Categories()
+        self.milestone_titles = []
+        self.labels = _Categories()
+
+        self._rows = []
+        self._label_codes = []
+        self._label_counts = []
+        self._assignee_codes = []
+        self._assignee_counts = []
+        self._chunks = {name: [] for name, _ in self._SCALAR_COLUMNS}
+        for name in ('label_codes', 'label_counts', 'assignee_codes', 'assignee_counts'):
+            self._chunks[name] = []
+
+    @staticmethod
+    def _get_dict_row(issue: dict) -> tuple:
+        """Extract column values from an issue in its dict representation (as returned by GitHub API)."""
+        milestone = issue.get('milestone')
+        closed_at = issue.get('closed_at')
+        return (
+            _get_repository_name(issue['repository_url']),
+            issue['number'],
+            issue['id'],
+            # State is not present if not requested in projection.
+            issue.get('state'),
+            issue.get('author_association'),
+            (issue.get('user') or {}).get('login'),
+            issue['comments'],
+            (milestone.get('number'), milestone.get('title')) if milestone else None,
+            # Datetimes are parsed by NumPy in bulk, the trailing 'Z' (UTC) is stripped.
+            issue['created_at'][:19],
+            issue['updated_at'][:19],
+            closed_at[:19] if closed_at else None,
+            [label['name'] for label in issue.get('labels') or ()],
+            [user['login'] for user in issue.get('assignees') or ()],
+        )
+
+    @staticmethod
+    def _get_resource_row(issue: GitHubBase) -> tuple:
+        """Extract column values from an issue object."""
+        return (
+            _get_repository_name(issue.repository_url),
+            issue.number,
+            issue.id,
+            issue.state.value if issue.state else None,
+            issue.author_association.value if issue.author_association else None,
+            issue.user.login if issue.user else None,
+            issue.comments,
+            (issue.milestone.number, issue.milestone.title) if issue.milestone else None,
+            issue.created_at,
+            issue.updated_at,
+            issue.closed_at,
+            [label.name for label in issue.labels or ()],
+            [user.login for user in issue.assignees or ()],
+        )
+
+    def add(self, issue: typing.Union[dict, GitHubBase]) -> None:
+        """Add an issue to the columns being built."""
+        row = self._get_dict_row(issue) if isinstance(issue, dict) else self._get_resource_row(issue)
+        labels, assignees = row[-2:]
+
+        label_codes = [self.labels.get_code(name) for name in labels]
+        self._label_codes.extend(label_codes)
+        self._label_counts.append(len(label_codes))
+
+        assignee_codes = [self.logins.get_code(login) for login in assignees]
+        self._assignee_codes.extend(assignee_codes)
+        self._assignee_counts.append(len(assignee_codes))
+
+        milestone_code = MISSING
+        if row[7] is not None:
+            number, title = row[7]
+            milestone_code = self.milestones.get_code((row[0], number))
+            if milestone_code == len(self.milestone_titles):
+                self.milestone_titles.append(title)
+
+        self._rows.append((
+            self.repositories.get_code(row[0]),
+            row[1],
+            row[2],
+            self.states.get_code(row[3]),
+            self.author_associations.get_code(row[4]),
+            self.logins.get_code(row[5]),
+            row[6],
+            milestone_code,
+        ) + row[8:11])
+
+        if len(self._rows) >= self.chunk_size:
+            self._flush_chunk()
+
+    def _flush_chunk(self) -> None:
+        """Convert accumulated rows to NumPy arrays."""
+        if not self._rows:
+            return
+
+        for (name, dtype), values in zip(self._SCALAR_COLUMNS, zip(*self._rows)):
+            self._chunks[name].append(numpy.array(values, dtype=dtype))
+
+        self._chunks['label_codes'].append(numpy.array(self._label_codes, dtype='int32'))
+        self._chunks['label_counts'].append(numpy.array(self._label_counts, dtype='int64'))
+        self._chunks['assignee_codes'].append(numpy.array(self._assignee_codes, dtype='int32'))
+        self._chunks['assignee_counts'].append(numpy.array(self._assignee_counts, dtype='int64'))
+
+        self._rows = []
+        self._label_codes = []
+        self._label_counts = []
+        self._assignee_codes = []
+        self._assignee_counts = []
+
+    def _concatenate(self, name: str, dtype: str) -> 'numpy.ndarray':
+        """Concatenate chunks of the given column, chunks are released once concatenated."""
+        chunks = self._chunks.pop(name)
+        if not chunks:
+            return numpy.empty(0, dtype=dtype)
+        return numpy.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+
+    @staticmethod
+    def _to_offsets(counts: 'numpy.ndarray') -> 'numpy.ndarray':
+        """Turn per-row counts into offsets delimiting row values in a flat array."""
+        offsets = numpy.zeros(len(counts) + 1, dtype='int64')
+        numpy.cumsum(counts, out=offsets[1:])
+        return offsets
+
+    def build(self) -> 'IssueColumns':
+        """Build issue columns out of all issues added."""
+        self._flush_chunk()
+        columns = {name: self._concatenate(name, dtype) for name, dtype in self._SCALAR_COLUMNS}
+        columns['label_codes'] = self._concatenate('label_codes', 'int32')
+        columns['label_offsets'] = self._to_offsets(self._concatenate('label_counts', 'int64'))
+        columns['assignee_codes'] = self._concatenate('assignee_codes', 'int32')
+        columns['assignee_offsets'] = self._to_offsets(self._concatenate('assignee_counts', 'int64'))
+
+        columns['repositories'] = self.repositories.to_array()
+        columns['states'] = self.states.to_array()
+        columns['author_associations'] = self.author_associations.to_array()
+        columns['logins'] = self.logins.to_array()
+        columns['milestones'] = numpy.array(self.milestone_titles, dtype=str)
+        columns['milestone_repositories'] = numpy.array(
+            [self.repositories.codes[repository] for repository, _ in self.milestones.values], dtype='int32'
+        )
+        columns['milestone_numbers'] = numpy.array(
+            [MISSING if number is None else number for _, number in self.milestones.values], dtype='int64'
+        )
+        columns['labels'] = self.labels.to_array()
+
+        return IssueColumns(**columns)
+
+
+class IssueColumns(object):
+    """Issues stored in columnar NumPy arrays suitable for vectorized analysis.
+
+    >>> from githubcap.classes import Issue
+    >>> columns = IssueColumns.from_issues(Issue.list_project_issues('fridex', 'githubcap', raw=True))
+    >>> open_issues = columns.state == columns.get_code('states', 'open')
+    >>> columns.labels[columns.label_codes]  # all label names assigned
+    """
+
+    ARRAYS = (
+        'repository', 'number', 'id', 'state', 'author_association', 'user', 'comments', 'milestone',
+        'created_at', 'updated_at', 'closed_at',
+        'label_codes', 'label_offsets', 'assignee_codes', 'assignee_offsets',
+        'repositories', 'states', 'author_associations', 'logins', 'milestones', 'labels',
+        'milestone_repositories', 'milestone_numbers',
+    )
+
+    def __init__(self, **arrays):
+        """Initialize columns from NumPy arrays, see ARRAYS for names of arrays expected."""
+        require_numpy()
+        missing = set(self.ARRAYS) - set(arrays)
+        if missing:
+            raise ValueError("Missing issue columns: {}".format(', '.join(sorted(missing))))
+
+        # pylint: disable=invalid-name
+        self.repository = arrays['repository']
+        self.number = arrays['number']
+        self.id = arrays['id']
+        self.state = arrays['state']
+        self.author_association = arrays['author_association']
+        self.user = arrays['user']
+        self.comments = arrays['comments']
+        self.milestone = arrays['milestone']
+        self.created_at = arrays['created_at']
+        self.updated_at = arrays['updated_at']
+        self.closed_at = arrays['closed_at']
+        self.label_codes = arrays['label_codes']
+        self.label_offsets = arrays['label_offsets']
+        self.assignee_codes = arrays['assignee_codes']
+        self.assignee_offsets = arrays['assignee_offsets']
+        # String tables.
+        self.repositories = arrays['repositories']
+        self.states = arrays['states']
+        self.author_associations = arrays['author_associations']
+        self.logins = arrays['logins']
+        self.milestones = arrays['milestones']
+        self.labels = arrays['labels']
+        # Milestones - codes of their repositories and their numbers.
+        self.milestone_repositories = arrays['milestone_repositories']
+        self.milestone_numbers = arrays['milestone_numbers']
+
+    @classmethod
+    def from_issues(cls, issues: typing.Iterable[typing.Union[dict, GitHubBase]],
+                    chunk_size: int = _DEFAULT_CHUNK_SIZE) -> 'IssueColumns':
+        """Build columns from a stream of issues - issue objects or their dict representation (raw listings).
+
+        :param issues: issues to be stored, typically a generator returned by Issue.list_* methods
+        :param chunk_size: number of rows accumulated before they are converted to NumPy arrays
+        :return: issue columns
+        """
+        require_numpy()
+        builder = _ColumnsBuilder(chunk_size)
+        for issue in issues:
+            builder.add(issue)
+
+        columns = builder.build()
+        _LOG.debug("Built issue columns of %d issues (%d bytes)", len(columns), columns.nbytes)
+        return columns
+
+    @classmethod
+    def load(cls, path: str) -> 'IssueColumns':
+        """Load columns previously stored using save()."""
+        require_numpy()
+        with numpy.load(path, allow_pickle=False) as arrays:
+            return cls(**{name: arrays[name] for name in cls.ARRAYS})
+
+    def save(self, path: str) -> None:
+        """Store columns in a NumPy .npz file."""
+        numpy.savez(path, **{name: getattr(self, name) for name in self.ARRAYS})
+
+    def __len__(self) -> int:
+        """Get number of issues stored."""
+        return len(self.number)
+
+    @property
+    def nbytes(self) -> int:
+        """Get number of bytes occupied by all arrays."""
+        return sum(getattr(self, name).nbytes for name in self.ARRAYS)
+
+    def get_code(self, table: str, value: str) -> int:
+        """Get code of a value in the given string table (e.g. 'labels'), return MISSING if not present."""
+        codes = numpy.flatnonzero(getattr(self, table) == value)
+        return int(codes[0]) if len(codes) else MISSING
+
+    @property
+    def milestone_names(self) -> 'numpy.ndarray':
+        """Get unique names of milestones - titles, the ones shared across repositories are prefixed with repository."""
+        _, inverse, counts = numpy.unique(self.milestones, return_inverse=True, return_counts=True)
+        names = self.milestones.astype(object)
+        shared = counts[inverse] > 1
+        names[shared] = self.repositories[self.milestone_repositories[shared]].astype(object) + ': ' + names[shared]
+        return names.astype(str)
+
+    @staticmethod
+    def _get_rows(offsets: 'numpy.ndarray') -> 'numpy.ndarray':
+        """Get row index for each value of a list column given its offsets."""
+        return numpy.repeat(numpy.arange(len(offsets) - 1), numpy.diff(offsets))
+
+    @property
+    def label_rows(self) -> 'numpy.ndarray':
+        """Get row index for each entry in label_codes."""
+        return self._get_rows(self.label_offsets)
+
+    @property
+    def assignee_rows(self) -> 'numpy.ndarray':
+        """Get row index for each entry in assignee_codes."""
+        return self._get_rows(self.assignee_offsets)
+
+    def has_label(self, name: str) -> 'numpy.ndarray':
+        """Get boolean mask of issues labeled with the given label."""
+        mask = numpy.zeros(len(self), dtype=bool)
+        mask[self.label_rows[self.label_codes == self.get_code('labels', name)]] = True
+        return mask
+
+    def has_assignee(self, login: str) -> 'numpy.ndarray':
+        """Get boolean mask of issues assigned to the given user."""
+        mask = numpy.zeros(len(self), dtype=bool)
+        mask[self.assignee_rows[self.assignee_codes == self.get_code('logins', login)]] = True
+        return mask
@@ -0,0 +1,258 @@
+"""Vectorized issue lifecycle metrics computed on issue columns.
+
+All metrics are computed using array operations on IssueColumns - time to close, time to first response, open
+issue burndown and label throughput. Metrics can be grouped by repository, label, milestone or by creation time
+bucket (day, week, month or year). When grouped by label, an issue is accounted in each of its labels.
+"""
+
+import typing
+
+import attr
+
+from .columnar import IssueColumns
+from .columnar import require_numpy
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+GROUP_BY_REPOSITORY = 'repository'
+GROUP_BY_LABEL = 'label'
+GROUP_BY_MILESTONE = 'milestone'
+# Time buckets, a bucket is expressed as NumPy datetime64 unit.
+TIME_BUCKETS = {
+    'day': 'D',
+    'week': 'W',
+    'month': 'M',
+    'year': 'Y',
+}
+GROUP_BY = (GROUP_BY_REPOSITORY, GROUP_BY_LABEL, GROUP_BY_MILESTONE) + tuple(TIME_BUCKETS)
+
+
+@attr.s
+class DurationStats(object):
+    """Statistics of durations (in seconds) per group, groups without any duration have NaN statistics."""
+
+    groups = attr.ib(type='numpy.ndarray')
+    count = attr.ib(type='numpy.ndarray')
+    mean = attr.ib(type='numpy.ndarray')
+    median = attr.ib(type='numpy.ndarray')
+    percentile_90 = attr.ib(type='numpy.ndarray')
+
+    def to_dict(self) -> dict:
+        """Convert statistics to a dictionary keyed by group name."""
+        return {
+            str(group): {
+                'count': int(self.count[i]),
+                'mean': float(self.mean[i]),
+                'median': float(self.median[i]),
+                'percentile_90': float(self.percentile_90[i]),
+            } for i, group in enumerate(self.groups)
+        }
+
+
+@attr.s
+class TimeSeries(object):
+    """Values per group (rows) and time bucket (columns), times are starts of time buckets."""
+
+    groups = attr.ib(type='numpy.ndarray')
+    times = attr.ib(type='numpy.ndarray')
+    values = attr.ib(type='numpy.ndarray')
+
+    def to_dict(self) -> dict:
+        """Convert time series to a dictionary keyed by group name and time bucket start."""
+        times = [str(time) for time in self.times]
+        return {str(group): dict(zip(times, self.values[i].tolist())) for i, group in enumerate(self.groups)}
+
+
+def _get_time_unit(bucket: str) -> str:
+    """Get NumPy datetime64 unit for the given time bucket name."""
+    try:
+        return TIME_BUCKETS[bucket]
+    except KeyError:
+        raise ValueError("Unknown time bucket {!r}, available: {}".format(bucket, ', '.join(TIME_BUCKETS)))
+
+
+def _get_groups(columns: IssueColumns,
+                group_by: typing.Optional[str]) -> typing.Tuple['numpy.ndarray', 'numpy.ndarray', 'numpy.ndarray']:
+    """Assign issues to groups.
+
+    :return: a tuple of row indexes, group codes of the rows and group names; a row can be present multiple times
+             (e.g. an issue with multiple labels) or not at all (e.g. an issue without milestone)
+    """
+    if group_by is None:
+        return numpy.arange(len(columns)), numpy.zeros(len(columns), dtype='int64'), numpy.array(['all'])
+
+    if group_by == GROUP_BY_REPOSITORY:
+        return numpy.arange(len(columns)), columns.repository, columns.repositories
+
+    if group_by == GROUP_BY_LABEL:
+        return columns.label_rows, columns.label_codes, columns.labels
+
+    if group_by == GROUP_BY_MILESTONE:
+        rows = numpy.flatnonzero(columns.milestone >= 0)
+        return rows, columns.milestone[rows], columns.milestone_names
+
+    if group_by in TIME_BUCKETS:
+        unit = 'datetime64[{}]'.format(TIME_BUCKETS[group_by])
+        if not len(columns):
+            return numpy.arange(0), numpy.zeros(0, dtype='int64'), numpy.array([], dtype=str)
+
+        # Bucket numbers are dense, so groups are assigned by counting rather than sorting (numpy.unique).
+        buckets = columns.created_at.astype(unit).astype('int64')
+        low = buckets.min()
+        present = numpy.bincount(buckets - low) > 0
+        codes = (numpy.cumsum(present) - 1)[buckets - low]
+        names = (numpy.flatnonzero(present) + low).astype(unit).astype(str)
+        return numpy.arange(len(columns)), codes, names
+
+    raise ValueError("Unknown grouping {!r}, available: {}".format(group_by, ', '.join(GROUP_BY)))
+
+
+def _sort_per_group(codes: 'numpy.ndarray', durations: 'numpy.ndarray', count: 'numpy.ndarray') -> 'numpy.ndarray':
+    """Sort durations by group code and then by duration, return sorted durations."""
+    if not len(durations):
+        return durations
+
+    # Durations are whole seconds, so group code and duration can be packed into a single float key that
+    # is exact (and so sorted directly, which is way faster than lexsort) as long as it fits into 53 bits.
+    low = durations.min()
+    span = durations.max() - low + 1
+    if span * len(count) < 2 ** 53:
+        group_offsets = numpy.repeat(numpy.arange(len(count), dtype='float64') * span, count)
+        return numpy.sort(codes * span + (durations - low)) - group_offsets + low
+
+    return durations[numpy.lexsort((durations, codes))]
+
+
+def _get_duration_stats(codes: 'numpy.ndarray', durations: 'numpy.ndarray',
+                        groups: 'numpy.ndarray') -> DurationStats:
+    """Compute statistics of durations per group, durations are float seconds (NaN is ignored)."""
+    present = ~numpy.isnan(durations)
+    codes = codes[present]
+    durations = durations[present]
+
+    group_count = len(groups)
+    count = numpy.bincount(codes, minlength=group_count)
+    with numpy.errstate(invalid='ignore', divide='ignore'):
+        mean = numpy.bincount(codes, weights=durations, minlength=group_count) / count
+
+    # Sort durations within groups, quantiles are then picked by computing positions in each group's range.
+    durations = _sort_per_group(codes, durations, count)
+    starts = numpy.concatenate(([0], numpy.cumsum(count)[:-1]))
+
+    def quantile(fraction: float) -> 'numpy.ndarray':
+        position = (count - 1) * fraction
+        lower = numpy.floor(position).astype('int64')
+        upper = numpy.ceil(position).astype('int64')
+        result = numpy.full(group_count, numpy.nan)
+        nonempty = count > 0
+        low_values = durations[(starts + lower)[nonempty]]
+        high_values = durations[(starts + upper)[nonempty]]
+        result[nonempty] = low_values + (high_values - low_values) * (position - lower)[nonempty]
+        return result
+
+    return DurationStats(groups=groups, count=count, mean=mean, median=quantile(0.5), percentile_90=quantile(0.9))
+
+
+def _to_seconds(deltas: 'numpy.ndarray') -> 'numpy.ndarray':
+    """Convert timedelta64 array to float seconds, NaT is converted to NaN."""
+    seconds = deltas.astype('timedelta64[s]').astype('float64')
+    seconds[numpy.isnat(deltas)] = numpy.nan
+    return seconds
+
+
+def time_to_close(columns: IssueColumns, group_by: str = None) -> DurationStats:
+    """Compute statistics of time (in seconds) needed to close issues, open issues are not accounted."""
+    require_numpy()
+    rows, codes, groups = _get_groups(columns, group_by)
+    durations = _to_seconds(columns.closed_at - columns.created_at)
+    return _get_duration_stats(codes, durations[rows], groups)
+
+
+def time_to_first_response(columns: IssueColumns, first_comment_at: 'numpy.ndarray',
+                           group_by: str = None) -> DurationStats:
+    """Compute statistics of time (in seconds) to the first response on issues.
+
+    The first response is either the first comment or closing the issue, whichever happened first. Issue data do not
+    carry time of the first comment, it needs to be supplied (e.g. from issue comment listings) as a datetime64 array
+    aligned with issue columns (NaT for issues without comments). Issues without any response are not accounted.
+    """
+    require_numpy()
+    if len(first_comment_at) != len(columns):
+        raise ValueError("Times of first comments do not match issue columns ({} != {})".format(
+            len(first_comment_at), len(columns)))
+
+    first_comment_at = first_comment_at.astype(columns.created_at.dtype)
+    # NaT compares false, the closing time is taken also if there is no comment.
+    responded_at = numpy.where(first_comment_at <= columns.closed_at, first_comment_at, columns.closed_at)
+    responded_at = numpy.where(numpy.isnat(columns.closed_at), first_comment_at, responded_at)
+
+    rows, codes, groups = _get_groups(columns, group_by)
+    durations = _to_seconds(responded_at - columns.created_at)
+    return _get_duration_stats(codes, durations[rows], groups)
+
+
+def _get_time_buckets(columns: IssueColumns, bucket: str) -> 'numpy.ndarray':
+    """Get starts of time buckets covering whole lifetime of issues in columns."""
+    unit = _get_time_unit(bucket)
+    if not len(columns):
+        return numpy.empty(0, dtype='datetime64[{}]'.format(unit))
+
+    # Issues are closed and updated after they are created, but data can be inconsistent - take all times into
+    # account. NaT would win in min() and max(), missing closing times are left out.
+    closed_at = columns.closed_at[~numpy.isnat(columns.closed_at)]
+    times = [columns.created_at, columns.updated_at, closed_at]
+    start = min(column.min() for column in times if len(column)).astype('datetime64[{}]'.format(unit))
+    end = max(column.max() for column in times if len(column)).astype('datetime64[{}]'.format(unit))
+    return numpy.arange(start, end + 1)
+
+
+def _count_per_bucket(codes: 'numpy.ndarray', times: 'numpy.ndarray', group_count: int,
+                      buckets: 'numpy.ndarray') -> 'numpy.ndarray':
+    """Count times falling into time buckets per group.
+
+    NaT times are not accounted, so are times after the last bucket. Times before the first bucket are accounted
+    in the first bucket, so cumulative counts stay consistent.
+    """
+    if not len(buckets):
+        return numpy.zeros((group_count, 0), dtype='int64')
+
+    present = ~numpy.isnat(times)
+    # Buckets are consecutive, bucket index is the distance from the first bucket in bucket units.
+    bucket_index = (times[present].astype(buckets.dtype) - buckets[0]).astype('int64')
+    codes = codes[present].astype('int64')
+    in_range = bucket_index < len(buckets)
+    bucket_index = numpy.maximum(bucket_index[in_range], 0)
+    flat = codes[in_range] * len(buckets) + bucket_index
+    counts = numpy.bincount(flat, minlength=group_count * len(buckets))
+    return counts.reshape(group_count, len(buckets))
+
+
+def burndown(columns: IssueColumns, bucket: str = 'week', group_by: str = None) -> TimeSeries:
+    """Compute number of open issues at the end of each time bucket."""
+    require_numpy()
+    buckets = _get_time_buckets(columns, bucket)
+    rows, codes, groups = _get_groups(columns, group_by)
+
+    opened = _count_per_bucket(codes, columns.created_at[rows], len(groups), buckets)
+    closed = _count_per_bucket(codes, columns.closed_at[rows], len(groups), buckets)
+    return TimeSeries(groups=groups, times=buckets, values=numpy.cumsum(opened - closed, axis=1))
+
+
+def label_throughput(columns: IssueColumns, bucket: str = 'week') -> typing.Tuple[TimeSeries, TimeSeries]:
+    """Compute number of issues opened and closed per label in each time bucket.
+
+    :return: a tuple of time series - issues opened and issues closed
+    """
+    require_numpy()
+    buckets = _get_time_buckets(columns, bucket)
+    rows, codes, groups = _get_groups(columns, GROUP_BY_LABEL)
+
+    opened = _count_per_bucket(codes, columns.created_at[rows], len(groups), buckets)
+    closed = _count_per_bucket(codes, columns.closed_at[rows], len(groups), buckets)
+    return (
+        TimeSeries(groups=groups, times=buckets, values=opened),
+        TimeSeries(groups=groups, times=buckets, values=closed)
+    )
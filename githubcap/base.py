@@ -1,31 +1,223 @@
 """Base classes for resource and resource handler classes."""
 
+from concurrent.futures import ThreadPoolExecutor
 import copy
 from datetime import datetime
 import enum
+import functools
 import logging
+import threading
 import time
 import typing
 
 import requests
 
 import attr
+from voluptuous import ALLOW_EXTRA
+from voluptuous import Any
 from voluptuous import Schema
 from voluptuous import ScalarInvalid
 from voluptuous import MultipleInvalid
 
+from . import profiling
 from .configuration import Configuration
 from .configuration import ConfigurationDefaults
 from .enums import GitHubCapEnum
 from .exceptions import HTTPError
 from .exceptions import MissingPassword
 from .exceptions import SchemaValidationError
+from .exceptions import UserInputError
+from .pagination import ListingCheckpoint
+from .pagination import PaginatedList
 from .utils import dict2json
+from .utils import last_pagination_page
 from .utils import next_pagination_page
 from .utils import parse_datetime
 from .utils import serialize_datetime
 
 _LOG = logging.getLogger(__name__)
+# Values of these types are serialized as they are.
+_PLAIN_TYPES = frozenset((str, int, float, bool))
+# Projection - a dict mapping requested attribute names to projection of nested resource (None if requested whole).
+_ProjectionType = typing.Dict[str, typing.Optional[dict]]
+_FieldsType = typing.Optional[typing.Iterable[str]]
+# HTTP sessions per thread, a session keeps connections to GitHub API alive so TLS handshake is done once.
+_SESSIONS = threading.local()
+
+
+def _get_session() -> requests.Session:
+    """Get HTTP session of the current thread."""
+    session = getattr(_SESSIONS, 'session', None)
+    if session is None:
+        session = _SESSIONS.session = requests.Session()
+    return session
+
+
+def _get_error_response(response: requests.Response) -> dict:
+    """Get error response as a dict with message, an error body that is not such JSON (e.g. HTML) is wrapped."""
+    try:
+        error_response = response.json()
+    except ValueError:
+        error_response = None
+
+    if not isinstance(error_response, dict) or not isinstance(error_response.get('message'), str):
+        error_response = {'message': response.text.strip() or str(response.reason or response.status_code)}
+    return error_response
+
+
+def _get_rate_limit_wait(response: requests.Response) -> typing.Optional[float]:
+    """Get number of seconds to wait before retrying a request that hit rate limit, None if no limit was hit."""
+    if response.status_code not in (403, 429):
+        return None
+
+    if 'Retry-After' in response.headers:
+        # Secondary rate limit (e.g. too many concurrent requests or content created too quickly).
+        try:
+            return float(response.headers['Retry-After'])
+        except ValueError:
+            _LOG.debug("Ignoring Retry-After header that is not in seconds: %r", response.headers['Retry-After'])
+
+    if response.status_code == 403 and _get_error_response(response)['message'].startswith("API rate limit exceeded"):
+        try:
+            reset_datetime = datetime.fromtimestamp(int(response.headers['X-RateLimit-Reset']))
+        except (KeyError, ValueError):
+            _LOG.debug("No valid rate limit reset time in response, not waiting")
+            return None
+        return max((reset_datetime - datetime.now()).total_seconds(), 0)
+
+    return None
+
+
+def _project_schema(schema: typing.Any, projection: typing.Optional[_ProjectionType]) -> typing.Any:
+    """Restrict schema to validate only attributes requested in projection."""
+    if projection is None:
+        return schema
+
+    if isinstance(schema, Schema):
+        schema = schema.schema
+
+    if isinstance(schema, dict):
+        return Schema({
+            key: _project_schema(value, projection[getattr(key, 'schema', key)])
+            for key, value in schema.items() if getattr(key, 'schema', key) in projection
+        }, extra=ALLOW_EXTRA)
+    elif isinstance(schema, list):
+        return [_project_schema(item, projection) for item in schema]
+    elif isinstance(schema, Any):
+        return Any(*(_project_schema(item, projection) for item in schema.validators), msg=schema.msg)
+
+    return schema
+
+
+def _project_dict(dict_: typing.Any, projection: typing.Optional[_ProjectionType]) -> typing.Any:
+    """Restrict a raw dictionary (or a list of dictionaries) to keys requested in projection."""
+    if projection is None or dict_ is None:
+        return dict_
+
+    if isinstance(dict_, list):
+        return [_project_dict(item, projection) for item in dict_]
+
+    return {key: _project_dict(dict_[key], value) for key, value in projection.items() if key in dict_}
+
+
+class _DerivedUrl(object):
+    """A descriptor for an URL attribute that is derived from another (base) attribute of a resource.
+
+    The URL is kept in the instance only if it differs from the derived one, otherwise it is computed on access.
+    """
+
+    __slots__ = ('name', 'base', 'prefix', 'suffix')
+
+    def __init__(self, name: str, base: str, prefix: str, suffix: str):
+        """Initialize descriptor for attribute name computed as prefix + base attribute value + suffix."""
+        self.name = name
+        self.base = base
+        self.prefix = prefix
+        self.suffix = suffix
+
+    def __get__(self, instance: typing.Any, owner: type) -> typing.Any:
+        """Get stored URL if it was stored, compute it from base attribute otherwise."""
+        if instance is None:
+            return self
+
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            base = getattr(instance, self.base)
+            return self.prefix + base + self.suffix if base is not None else None
+
+    def __set__(self, instance: typing.Any, value: typing.Any) -> None:
+        """Store URL in the instance, it is dropped on compaction if it can be derived."""
+        instance.__dict__[self.name] = value
+
+    def compact(self, instance: typing.Any) -> None:
+        """Drop URL stored in the instance if it matches the one derived from base attribute."""
+        base = getattr(instance, self.base)
+        if isinstance(base, str) and instance.__dict__.get(self.name) == self.prefix + base + self.suffix:
+            del instance.__dict__[self.name]
+
+
+class _BaseAttribute(object):
+    """A descriptor for a base attribute URL attributes are derived from.
+
+    Once the base attribute is changed, URLs derived from its previous value are stored in the instance, so changing
+    the base attribute does not change them.
+    """
+
+    __slots__ = ('name', 'derived')
+
+    def __init__(self, name: str, derived: typing.Tuple[_DerivedUrl, ...]):
+        """Initialize descriptor for attribute name, derived are descriptors of URLs derived from it."""
+        self.name = name
+        self.derived = derived
+
+    def __get__(self, instance: typing.Any, owner: type) -> typing.Any:
+        """Get value of the attribute stored in the instance."""
+        if instance is None:
+            return self
+
+        try:
+            return instance.__dict__[self.name]
+        except KeyError:
+            raise AttributeError("{!r} object has no attribute {!r}".format(owner.__name__, self.name))
+
+    def __set__(self, instance: typing.Any, value: typing.Any) -> None:
+        """Store value in the instance, URLs derived from the previous value are kept as they were."""
+        if self.name in instance.__dict__:
+            for derived_url in self.derived:
+                if derived_url.name not in instance.__dict__:
+                    instance.__dict__[derived_url.name] = derived_url.__get__(instance, type(instance))
+        instance.__dict__[self.name] = value
+
+
+def derived_urls(**derived: typing.Tuple[str, ...]) -> typing.Callable[[type], type]:
+    """Compute URL attributes of a resource from its base attributes on access instead of storing them.
+
+    Derived attributes are stated as name=(base, suffix) or name=(base, suffix, prefix), the decorator has to
+    be applied on an attr.s decorated class. Derived URLs keep their values if a base attribute is changed, they
+    are stored in the instance then:
+
+    >>> @derived_urls(events_url=('url', '/events'))
+    >>> @attr.s
+    >>> class Resource(GitHubBase):
+    >>>     events_url = attr.ib(type=str)
+    >>>     url = attr.ib(type=str)
+    """
+    def decorator(resource_class: type) -> type:
+        descriptors = []
+        for name, (base, suffix, *prefix) in sorted(derived.items()):
+            descriptor = _DerivedUrl(name, base, prefix[0] if prefix else '', suffix)
+            setattr(resource_class, name, descriptor)
+            descriptors.append(descriptor)
+
+        for base in sorted({descriptor.base for descriptor in descriptors}):
+            base_derived = tuple(descriptor for descriptor in descriptors if descriptor.base == base)
+            setattr(resource_class, base, _BaseAttribute(base, base_derived))
+
+        resource_class._DERIVED_URLS = tuple(descriptors)  # pylint: disable=protected-access
+        return resource_class
+
+    return decorator
 
 
 @attr.s
@@ -33,11 +225,18 @@ class GitHubBase(object):
     """Base class for resources provided by GitHub API v3."""
 
     _SCHEMA: typing.ClassVar[Schema] = None
+    _SERIALIZERS: typing.ClassVar[tuple] = None
+    _DERIVED_URLS: typing.ClassVar[tuple] = ()
 
     DEFAULT_PER_PAGE: typing.ClassVar[int] = ConfigurationDefaults.PER_PAGE_LISTING
 
     # TODO: dirty flag
 
+    def __attrs_post_init__(self):
+        """Drop attributes that are computed on access so they do not occupy memory."""
+        for derived_url in self._DERIVED_URLS:
+            derived_url.compact(self)
+
     @staticmethod
     def _report_schema_errors(response: dict, exc: Exception) -> None:
         """Report schema errors in a human readable fashion."""
@@ -54,48 +253,159 @@ class GitHubBase(object):
             _LOG.error("Unknown value in %s: %r", error.path, value)
 
     @classmethod
-    def from_response(cls, response: dict):
-        """Parse resource from GitHub API response."""
+    @functools.lru_cache(maxsize=128)
+    def _compile_projection(cls, fields: typing.Tuple[str, ...]) -> _ProjectionType:
+        """Create projection of attributes based on requested fields, nested fields are delimited by a dot."""
+        projection = {}
+        for field in fields:
+            resource_class = cls
+            node = projection
+            parts = field.strip().split('.')
+            for idx, part in enumerate(parts):
+                if not isinstance(resource_class, type) or not issubclass(resource_class, GitHubBase):
+                    raise UserInputError("Field {!r} cannot be projected, {!r} is not a resource".format(
+                        field, '.'.join(parts[:idx])))
+
+                attribute = getattr(attr.fields(resource_class), part, None)
+                if attribute is None:
+                    raise UserInputError("Unknown field {!r} requested for {!r}".format(
+                        field, resource_class.__name__))
+
+                if node is None:
+                    # The whole attribute was already requested, the rest of the field is only checked.
+                    pass
+                elif idx == len(parts) - 1:
+                    node[part] = None
+                elif part in node and node[part] is None:
+                    node = None
+                else:
+                    node = node.setdefault(part, {})
+
+                resource_class = cls._list_item_type(attribute.type) or attribute.type
+
+        return projection
+
+    @classmethod
+    def _get_projection(cls, fields: typing.Union[_FieldsType, _ProjectionType]) -> typing.Optional[_ProjectionType]:
+        """Get projection for requested fields, an already computed projection is returned as is."""
+        if fields is None or isinstance(fields, dict):
+            return fields
+
+        if isinstance(fields, str):
+            fields = fields.split(',')
+
+        return cls._compile_projection(tuple(fields))
+
+    @classmethod
+    @functools.lru_cache(maxsize=128)
+    def _get_schema(cls, fields: typing.Optional[typing.Tuple[str, ...]] = None) -> Schema:
+        """Get schema for validating a response, restricted to requested fields if any."""
+        if fields is None:
+            return cls._SCHEMA
+
+        return _project_schema(cls._SCHEMA, cls._compile_projection(fields))
+
+    @classmethod
+    def validate_response(cls, response: dict, fields: _FieldsType = None) -> None:
+        """Validate GitHub API response against resource schema, if schema validation is turned on in configuration.
+
+        :param response: response as returned by GitHub API
+        :param fields: an optional list of fields to be validated (nested fields delimited by a dot)
+        """
         if cls._SCHEMA is None:
             raise NotImplementedError("No schema defined for entity {!r}".format(cls.__name__))
 
-        if Configuration().validate_schemas:
-            try:
-                cls._SCHEMA(response)  # pylint: disable=not-callable
-            except Exception as exc:
-                _LOG.debug(dict2json(response))
-                cls._report_schema_errors(response, exc)
-                raise SchemaValidationError("Failed to validate schema for {!r}".format(cls.__name__)) from exc
+        if not Configuration().validate_schemas:
+            return
+
+        if fields is not None:
+            fields = tuple(fields.split(',') if isinstance(fields, str) else fields)
 
-        return cls.from_dict(response)
+        schema = cls._get_schema(fields)
+        try:
+            schema(response)  # pylint: disable=not-callable
+        except Exception as exc:
+            _LOG.debug(dict2json(response))
+            cls._report_schema_errors(response, exc)
+            raise SchemaValidationError("Failed to validate schema for {!r}".format(cls.__name__)) from exc
 
     @classmethod
-    def _from_dict_value(cls, attribute_type: attr.Attribute, value: typing.Any) -> typing.Any:
-        """Translate value to it's actual representation based on resource type defined."""
+    def from_response(cls, response: dict, fields: _FieldsType = None, raw: bool = False):
+        """Parse resource from GitHub API response.
+
+        :param response: response as returned by GitHub API
+        :param fields: an optional list of fields to be parsed (nested fields delimited by a dot, e.g. 'user.login'),
+                       fields that were not requested are not validated, nor parsed and are set to None
+        :param raw: return the (validated) response as is instead of constructing resource, restricted to
+                    requested fields if any
+        """
+        with profiling.phase(profiling.PHASE_VALIDATION):
+            cls.validate_response(response, fields)
+
+        with profiling.phase(profiling.PHASE_CONSTRUCTION):
+            if raw:
+                return _project_dict(response, cls._get_projection(fields))
+
+            return cls.from_dict(response, fields)
+
+    @staticmethod
+    def _list_item_type(attribute_type: typing.Any) -> typing.Any:
+        """Get type of list items if the given attribute type is a typing.List, return None otherwise."""
         # pylint: disable=protected-access
+        if '_gorg' in getattr(attribute_type, '__dict__', ()):
+            # Python 3.6 typing.
+            is_list = attribute_type._gorg == typing.List
+        else:
+            is_list = getattr(attribute_type, '__origin__', None) in (list, typing.List)
+
+        if not is_list:
+            return None
+
+        assert len(attribute_type.__args__) == 1,\
+            "Type defined multiple types: {!r}".format(attribute_type)  # Ignore B101
+        return attribute_type.__args__[0]
+
+    @classmethod
+    def _from_dict_value(cls, attribute_type: attr.Attribute, value: typing.Any,
+                         projection: typing.Optional[_ProjectionType] = None) -> typing.Any:
+        """Translate value to it's actual representation based on resource type defined."""
         if attribute_type == datetime:
             return parse_datetime(value)
-        elif issubclass(attribute_type, GitHubCapEnum):
+        elif isinstance(attribute_type, type) and issubclass(attribute_type, GitHubCapEnum):
             return attribute_type.from_value(value)
-        elif issubclass(attribute_type, GitHubBase):
-            return attribute_type.from_dict(value)
-        elif '_gorg' in attribute_type.__dict__ and attribute_type._gorg == typing.List:
-            assert len(attribute_type.__args__) == 1,\
-                "Type defined multiple types: {!r}".format(attribute_type)  # Ignore B101
-            return list(cls._from_dict_value(attribute_type.__args__[0], item) for item in value)
+        elif isinstance(attribute_type, type) and issubclass(attribute_type, GitHubBase):
+            return attribute_type.from_dict(value, projection)
+
+        item_type = cls._list_item_type(attribute_type)
+        if item_type is not None:
+            return list(cls._from_dict_value(item_type, item, projection) for item in value)
 
         return value
 
     @classmethod
-    def from_dict(cls, dict_: dict):
-        """Create resource instance from a dictionary."""
+    def from_dict(cls, dict_: dict, fields: _FieldsType = None):
+        """Create resource instance from a dictionary.
+
+        :param dict_: a dictionary representation of the resource
+        :param fields: an optional list of fields to be parsed (nested fields delimited by a dot, e.g. 'user.login'),
+                       fields that were not requested are not parsed and are set to None
+        """
         if dict_ is None:
             return None
 
+        projection = cls._get_projection(fields)
+
         values = {}
         for attribute in cls.__attrs_attrs__:  # pylint: disable=no-member
-            if attribute.name in dict_:
-                values[attribute.name] = cls._from_dict_value(attribute.type, dict_[attribute.name])
+            if projection is None:
+                if attribute.name in dict_:
+                    values[attribute.name] = cls._from_dict_value(attribute.type, dict_[attribute.name])
+            elif attribute.name not in projection:
+                values[attribute.name] = None
+            elif attribute.name in dict_:
+                values[attribute.name] = cls._from_dict_value(
+                    attribute.type, dict_[attribute.name], projection[attribute.name]
+                )
 
         return cls(**values)
 
@@ -113,25 +423,92 @@ class GitHubBase(object):
 
         return value
 
-    def to_dict(self) -> dict:
-        """Create a dictionary representation of a resource."""
+    @classmethod
+    def _compile_to_dict_value(cls, attribute_type: typing.Any) -> typing.Callable[[typing.Any], typing.Any]:
+        """Create a serializer for values of the given attribute type.
+
+        The created serializer handles values of the declared type directly, values of any other type are
+        serialized using generic (slower) type dispatching so results are always the same as with _to_dict_value.
+        """
+        generic = GitHubBase._to_dict_value
+
+        if attribute_type is datetime:
+            return lambda value: serialize_datetime(value) if value.__class__ is datetime else generic(value)
+        elif isinstance(attribute_type, type) and issubclass(attribute_type, enum.Enum):
+            return lambda value: value.value if value.__class__ is attribute_type else generic(value)
+        elif isinstance(attribute_type, type) and issubclass(attribute_type, GitHubBase):
+            return lambda value: value.to_dict() if value.__class__ is attribute_type else generic(value)
+
+        item_type = cls._list_item_type(attribute_type)
+        if item_type is not None:
+            item_serializer = cls._compile_to_dict_value(item_type)
+            return lambda value: [item_serializer(item) for item in value] if value.__class__ is list \
+                else generic(value)
+
+        return lambda value: value if value.__class__ in _PLAIN_TYPES else generic(value)
+
+    @classmethod
+    def _get_serializers(cls) -> typing.Tuple[typing.Tuple[str, typing.Callable[[typing.Any], typing.Any]], ...]:
+        """Get serializers for all attributes of this resource, serializers are compiled once per class."""
+        serializers = cls.__dict__.get('_SERIALIZERS')
+        if serializers is None:
+            serializers = tuple(
+                (attribute.name, cls._compile_to_dict_value(attribute.type))
+                for attribute in cls.__attrs_attrs__  # pylint: disable=no-member
+            )
+            cls._SERIALIZERS = serializers
+
+        return serializers
+
+    def to_dict(self, fields: _FieldsType = None) -> dict:
+        """Create a dictionary representation of a resource.
+
+        :param fields: an optional list of fields to be included (nested fields delimited by a dot, e.g. 'user.login')
+        """
         result = {}
-        for attribute in self.__attrs_attrs__:  # pylint: disable=no-member
-            result[attribute.name] = self._to_dict_value(getattr(self, attribute.name))
+        projection = self._get_projection(fields)
+        if projection is None:
+            for name, serializer in self._get_serializers():
+                value = getattr(self, name)
+                result[name] = serializer(value) if value is not None else None
+            return result
+
+        for name, serializer in self._get_serializers():
+            if name not in projection:
+                continue
+
+            value = getattr(self, name)
+            if value is None or projection[name] is None:
+                result[name] = serializer(value) if value is not None else None
+            elif isinstance(value, list):
+                result[name] = list(
+                    item.to_dict(projection[name]) if isinstance(item, GitHubBase) else self._to_dict_value(item)
+                    for item in value
+                )
+            elif isinstance(value, GitHubBase):
+                result[name] = value.to_dict(projection[name])
+            else:
+                result[name] = serializer(value)
+
         return result
 
     @classmethod
-    def _call(cls, uri: str, payload: typing.Union[dict, list] = None, method: str = None, json_response: bool = True):
+    def _call(cls, uri: str, payload: typing.Union[dict, list] = None, method: str = None, json_response: bool = True,
+              headers: dict = None):
         """Perform a request to GitHub API v3.
 
         :param uri: API endpoint
         :param payload: data sent to GitHub API remote
         :param method: a string representation of method that should be used
         :param json_response: False for a raw response, no JSON is parsed
+        :param headers: additional request headers (e.g. If-None-Match for a conditional request), response of
+                        a conditional request that was not modified (HTTP 304) is returned as None
         """
         requests_kwargs = {
             'headers': copy.copy(Configuration().headers)
         }
+        if headers:
+            requests_kwargs['headers'].update(headers)
 
         if Configuration().token:
             _LOG.debug("Using OAuth2 token '%s***' for GitHub call", Configuration().token[:4])
@@ -146,35 +523,42 @@ class GitHubBase(object):
             _LOG.debug("No authentication is used")
 
         url = "{!s}{!s}".format(Configuration().github_api, uri)
-        requests_func = getattr(requests, method.lower())
+        requests_func = getattr(_get_session(), method.lower())
         if payload:
             requests_kwargs['json'] = payload
 
         while True:
             _LOG.debug("%s %s", method, url)
-            response = requests_func(url, **requests_kwargs)
+            with profiling.phase(profiling.PHASE_HTTP):
+                response = requests_func(url, **requests_kwargs)
+            profiling.record_request(len(response.request.body or b''), len(response.content))
 
             _LOG.debug("Request took %s and the HTTP status code for response was %d",
                        response.elapsed, response.status_code)
 
-            if not (response.status_code == 403 and
-                    response.json()['message'].startswith("API rate limit exceeded") and
-                    Configuration().omit_rate_limiting):
+            sleep_time = None
+            if Configuration().omit_rate_limiting:
+                sleep_time = _get_rate_limit_wait(response)
+            if sleep_time is None:
                 break
 
-            reset_datetime = datetime.fromtimestamp(int(response.headers['X-RateLimit-Reset']))
-            sleep_time = (reset_datetime - datetime.now()).total_seconds()
             _LOG.debug("API rate limit hit, retrying in %d seconds...", sleep_time)
-            time.sleep(sleep_time)
+            with profiling.phase(profiling.PHASE_RATE_LIMIT):
+                time.sleep(sleep_time)
 
         try:
             # Rely on request's checks here
             response.raise_for_status()
         except requests.exceptions.HTTPError as exc:
-            raise HTTPError(response.json(), response.status_code) from exc
+            raise HTTPError(_get_error_response(response), response.status_code) from exc
+
+        if response.status_code == 304:
+            _LOG.debug("Resource %s was not modified", url)
+            return None, response.headers
 
         if json_response:
-            return response.json(), response.headers
+            with profiling.phase(profiling.PHASE_JSON):
+                return response.json(), response.headers
         return response.text, response.headers
 
     def _get_query_string(self):
@@ -182,22 +566,163 @@ class GitHubBase(object):
         raise NotImplementedError
 
     @classmethod
-    def _do_listing(cls, base_uri: str, query_string: str = None, page: int = 0, method: str = None):
-        """Perform listing of entries returned from API endpoint - respect pagination if configured."""
+    def _do_listing(cls, base_uri: str, query_string: str = None, page: int = 0, method: str = None,
+                    resume: str = None):
+        """Perform listing of entries returned from API endpoint - respect pagination if configured.
+
+        :param resume: path to a state file the listing position is checkpointed to after each page, if the file
+                       exists, listing continues from the checkpoint; the file is removed once the listing is done
+        """
+        checkpoint = None
+        # Id of the last item seen, it is checkpointed together with the next page.
+        last_item = None
+        resumed = False
+        # Page size is stated explicitly, so page numbers match the ones of other listings (and checkpoints).
+        per_page = Configuration().per_page_listing
+        if resume is not None:
+            checkpoint = ListingCheckpoint(resume, base_uri, query_string, per_page)
+            state = checkpoint.load()
+            if state is not None:
+                page = state['page']
+                last_item = state['last_item']
+                resumed = True
+
         while True:
-            uri = '{!s}?page={!s}&{!s}'.format(base_uri, page, query_string if query_string else "")
+            uri = '{!s}?page={!s}&per_page={!s}&{!s}'.format(
+                base_uri, page, per_page, query_string if query_string else ""
+            )
             response, headers = cls._call(uri, method=method or 'GET')
 
+            if resumed:
+                # Items could be shifted to the resumed page since the checkpoint, skip the ones already seen.
+                item_ids = [entry.get('id') if isinstance(entry, dict) else None for entry in response]
+                if last_item is not None and last_item in item_ids:
+                    response = response[item_ids.index(last_item) + 1:]
+                resumed = False
+
             for entry in response:
                 yield entry, headers
 
-            if not Configuration().pagination:
-                return
+            if response:
+                last_item = response[-1].get('id') if isinstance(response[-1], dict) else None
 
-            page = next_pagination_page(headers)
-            if page is None:
+            next_page = next_pagination_page(headers) if Configuration().pagination else None
+
+            if checkpoint is not None:
+                if next_page is None:
+                    checkpoint.clear()
+                else:
+                    # An empty page (e.g. all its items were seen before resuming) keeps the previous last item.
+                    checkpoint.save(page=next_page, last_completed_page=page, last_item=last_item)
+
+            if next_page is None:
                 return
 
+            page = next_page
+
+    @classmethod
+    def _do_paginated_listing(cls, base_uri: str, query_string: str = None, page: int = 0,
+                              transform: typing.Callable[[typing.Any], typing.Any] = None,
+                              method: str = None) -> PaginatedList:
+        """Create a lazy random-access listing of entries returned from API endpoint, pages are retrieved on demand.
+
+        :param transform: a function applied on each entry retrieved (e.g. constructing a resource object)
+        """
+        def fetch_page(page_number: int, per_page: int) -> typing.Tuple[list, dict]:
+            uri = '{!s}?page={!s}&per_page={!s}&{!s}'.format(
+                base_uri, page_number, per_page, query_string if query_string else ""
+            )
+            return cls._call(uri, method=method or 'GET')
+
+        return PaginatedList(
+            fetch_page,
+            per_page=Configuration().per_page_listing,
+            transform=transform,
+            first_page=page,
+            paginate=Configuration().pagination
+        )
+
+    @classmethod
+    def _fetch_listing_page(cls, base_uri: str, query_string: str = None, page: int = 1,
+                            method: str = None) -> typing.Tuple[list, typing.Optional[int]]:
+        """Retrieve a single page of a listing, return its entries and the next page number (None on the last one)."""
+        uri = '{!s}?page={!s}&per_page={!s}&{!s}'.format(
+            base_uri, page, Configuration().per_page_listing, query_string if query_string else ""
+        )
+        response, headers = cls._call(uri, method=method or 'GET')
+        return response, next_pagination_page(headers) if Configuration().pagination else None
+
+    @classmethod
+    def _do_conditional_listing(cls, base_uri: str, query_string: str = None, etags: typing.List[str] = None,
+                                per_page: int = None, max_workers: int = 4,
+                                request_slots: threading.Semaphore = None) -> typing.Tuple[list, typing.List[str]]:
+        """Retrieve pages of a listing, pages retrieved before are revalidated using their ETags.
+
+        Pages known from the previous retrieval are requested conditionally (If-None-Match), GitHub does not count
+        responses that were not modified (HTTP 304) against rate limit. Pages are retrieved concurrently - pages known
+        from the previous retrieval (or stated by rel="last" of the first page) at once, pages that appeared since
+        then one by one as they are discovered.
+
+        :param etags: ETags of pages as returned by the previous retrieval of the same listing
+        :param per_page: number of entries per page, it has to be the same as in the previous retrieval
+        :param max_workers: maximum number of pages retrieved at once
+        :param request_slots: a semaphore bounding number of requests in flight, share it to bound requests of
+                              listings retrieved at once (e.g. of multiple repositories)
+        :return: entries of each page (None for a page that was not modified) and ETags of pages
+        """
+        etags = list(etags or [])
+        per_page = per_page or Configuration().per_page_listing
+
+        def fetch_page(page: int) -> typing.Tuple[typing.Optional[list], dict]:
+            uri = '{!s}?page={!s}&per_page={!s}&{!s}'.format(base_uri, page, per_page, query_string or "")
+            etag = etags[page - 1] if page <= len(etags) else None
+            if request_slots is None:
+                return cls._call(uri, method='GET', headers={'If-None-Match': etag} if etag else None)
+
+            with request_slots:
+                return cls._call(uri, method='GET', headers={'If-None-Match': etag} if etag else None)
+
+        response, headers = fetch_page(1)
+        results = [(response, headers)]
+        if Configuration().pagination:
+            if response is None:
+                page_count = len(etags)
+            else:
+                page_count = last_pagination_page(headers) or 1
+
+            if page_count > 1:
+                with ThreadPoolExecutor(max_workers=max(min(max_workers, page_count - 1), 1)) as executor:
+                    results.extend(executor.map(fetch_page, range(2, page_count + 1)))
+
+            # The listing could grow since the previous retrieval.
+            while results[-1][0] is not None and next_pagination_page(results[-1][1]) is not None:
+                results.append(fetch_page(len(results) + 1))
+
+            # Or shrink, pages past the end of listing are empty.
+            while len(results) > 1 and results[-1][0] == []:
+                results.pop()
+
+        pages = [response for response, _ in results]
+        new_etags = [headers.get('ETag') or (etags[i] if i < len(etags) else None)
+                     for i, (_, headers) in enumerate(results)]
+        return pages, new_etags
+
+    @classmethod
+    def _do_count(cls, base_uri: str, query_string: str = None, method: str = None) -> int:
+        """Count entries of a listing without retrieving them.
+
+        Entries are requested one per page, the number of the last page (rel="last" in Link header) is then the total
+        number of entries - a single request is needed regardless of listing size.
+        """
+        uri = '{!s}?page=1&per_page=1&{!s}'.format(base_uri, query_string if query_string else "")
+        response, headers = cls._call(uri, method=method or 'GET')
+        last_page = last_pagination_page(headers)
+        if last_page is None:
+            # There is no other page, GitHub does not provide 'Link'.
+            return len(response)
+
+        return last_page
+
     @classmethod
     def submit(cls, item):
         """Submit an item to remote."""
@@ -0,0 +1,190 @@
+"""Bulk issue operations - create and edit issues described in newline delimited JSON (NDJSON).
+
+Each line describes an operation on an issue:
+
+    {"repository": "fridex/githubcap", "title": "Crash on start", "labels": ["bug"]}
+    {"repository": "fridex/githubcap", "number": 42, "state": "closed", "assignees": ["fridex"]}
+
+An operation with an issue number edits the issue, an operation without number creates one; the operation can be
+also stated explicitly as "operation": "create" or "operation": "edit". The repository can be omitted if a default
+one is supplied. Operations are run concurrently, a result is reported for each operation in the input order.
+"""
+
+import collections
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+import json
+import logging
+import threading
+import time
+import typing
+
+import attr
+import requests
+
+from .classes import Issue
+from .exceptions import GithubcapException
+from .exceptions import HTTPError
+from .exceptions import UserInputError
+
+_LOG = logging.getLogger(__name__)
+
+OPERATION_CREATE = 'create'
+OPERATION_EDIT = 'edit'
+_ISSUE_ATTRIBUTES = frozenset(('title', 'body', 'state', 'milestone', 'labels', 'assignees', 'assignee'))
+
+
+class _Throttle(object):
+    """Keep at least the given delay between starts of operations across threads."""
+
+    def __init__(self, delay: float):
+        """Initialize throttle, no delay is kept if delay is zero."""
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def wait(self) -> None:
+        """Wait until an operation can be started."""
+        if not self.delay:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+
+        if start > now:
+            time.sleep(start - now)
+
+
+@attr.s(slots=True)
+class IssueOperation(object):
+    """An issue create or edit operation."""
+
+    line = attr.ib(type=int)
+    operation = attr.ib(type=str)
+    organization = attr.ib(type=str)
+    project = attr.ib(type=str)
+    attributes = attr.ib(type=dict)
+    number = attr.ib(type=int, default=None)
+
+    @classmethod
+    def from_dict(cls, dict_: dict, line: int, repository: str = None) -> 'IssueOperation':
+        """Create an operation from its dictionary representation.
+
+        :param dict_: operation as stated on input
+        :param line: input line number of the operation
+        :param repository: repository (owner/name) used if the operation does not state one
+        """
+        if not isinstance(dict_, dict):
+            raise UserInputError("Operation has to be a JSON object")
+
+        dict_ = dict(dict_)
+        number = dict_.pop('number', None)
+        operation = dict_.pop('operation', OPERATION_CREATE if number is None else OPERATION_EDIT)
+        repository = dict_.pop('repository', repository)
+
+        if operation not in (OPERATION_CREATE, OPERATION_EDIT):
+            raise UserInputError("Unknown operation {!r}".format(operation))
+        if operation == OPERATION_EDIT and not isinstance(number, int):
+            raise UserInputError("Issue number has to be stated for edit operation")
+        if operation == OPERATION_CREATE and number is not None:
+            raise UserInputError("Issue number cannot be stated for create operation")
+        if operation == OPERATION_CREATE and not dict_.get('title'):
+            raise UserInputError("Issue title has to be stated for create operation")
+        if not isinstance(repository, str) or repository.count('/') != 1:
+            raise UserInputError("Repository has to be stated as owner/name, got {!r}".format(repository))
+
+        unknown = set(dict_) - _ISSUE_ATTRIBUTES
+        if unknown:
+            raise UserInputError("Unknown issue attributes: {}".format(', '.join(sorted(unknown))))
+
+        organization, project = repository.split('/')
+        return cls(line=line, operation=operation, organization=organization, project=project,
+                   attributes=dict_, number=number)
+
+    def _get_result(self, **result: typing.Any) -> dict:
+        """Create a result of the operation with the given result attributes."""
+        operation_result = {
+            'line': self.line,
+            'operation': self.operation,
+            'repository': '{}/{}'.format(self.organization, self.project),
+        }
+        if self.number is not None:
+            operation_result['number'] = self.number
+        operation_result.update(result)
+        return operation_result
+
+    def run(self, throttle: _Throttle = None) -> dict:
+        """Run the operation, errors are reported in the result.
+
+        :return: result - line, operation, repository and either number and html_url of the issue or an error
+        """
+        if throttle is not None:
+            throttle.wait()
+
+        try:
+            if self.operation == OPERATION_CREATE:
+                issue = Issue.create_by_attributes(self.organization, self.project, self.attributes, raw=True)
+            else:
+                issue = Issue.edit_by_number(self.organization, self.project, self.number, self.attributes, raw=True)
+        except HTTPError as exc:
+            _LOG.debug("Operation on line %d failed with HTTP status %d: %s", self.line, exc.status_code, str(exc))
+            return self._get_result(error=str(exc), status_code=exc.status_code)
+        except (GithubcapException, requests.RequestException) as exc:
+            _LOG.debug("Operation on line %d failed: %s", self.line, str(exc))
+            return self._get_result(error=str(exc))
+        except Exception as exc:  # pylint: disable=broad-except
+            # Reported as the operation result, so a single operation does not stop the whole batch.
+            _LOG.debug("Operation on line %d failed unexpectedly", self.line, exc_info=True)
+            return self._get_result(error="Unexpected error: {!r}".format(exc))
+
+        return self._get_result(number=issue['number'], html_url=issue['html_url'])
+
+
+def _parse_operation(line: str, line_number: int, repository: typing.Optional[str]) -> IssueOperation:
+    """Parse an operation from an input line."""
+    try:
+        dict_ = json.loads(line)
+    except ValueError as exc:
+        raise UserInputError("Invalid JSON: {!s}".format(str(exc))) from exc
+
+    return IssueOperation.from_dict(dict_, line_number, repository)
+
+
+def run_issue_batch(lines: typing.Iterable[str], repository: str = None, max_workers: int = 4,
+                    delay: float = 0.0) -> typing.Generator[dict, None, None]:
+    """Run issue operations stated as NDJSON lines concurrently, results are yielded in the input order.
+
+    Input is consumed as operations are run, so results of first operations are available before the whole
+    input is read. Invalid operations are reported as errors, other operations are run regardless.
+
+    :param lines: lines of NDJSON input, empty lines are skipped
+    :param repository: repository (owner/name) used for operations that do not state one
+    :param max_workers: maximum number of operations run concurrently
+    :param delay: minimum delay in seconds between starts of operations, GitHub recommends keeping
+                  requests creating content apart to avoid hitting secondary rate limits
+    :return: a generator of operation results (see IssueOperation.run for result attributes)
+    """
+    throttle = _Throttle(delay)
+    pending = collections.deque()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for line_number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+
+            try:
+                operation = _parse_operation(line, line_number, repository)
+            except UserInputError as exc:
+                future = Future()
+                future.set_result({'line': line_number, 'error': str(exc)})
+                pending.append(future)
+            else:
+                pending.append(executor.submit(operation.run, throttle))
+
+            # Keep number of operations in flight bounded, so input is streamed as operations finish.
+            while pending and (pending[0].done() or len(pending) > 2 * max_workers):
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,323 @@
+"""Reproducible benchmarks of githubcap that need no network access.
+
+Micro benchmarks measure time per operation of hot paths - parsing responses (from_response) and serializing
+resources (to_dict) per resource class, datetime parsing, pagination header parsing and checkbox manipulation.
+Resource responses are generated from resource schemas, so each resource class is benchmarked on a complete
+response. Macro benchmarks measure listing of pages (_do_listing and from_response of listed items) against
+a local HTTP server stubbing GitHub API with a configurable latency.
+
+Inputs are deterministic, so results of different githubcap versions (or Python versions) on the same machine
+are comparable.
+"""
+
+import datetime
+import enum
+from http.server import BaseHTTPRequestHandler
+from http.server import HTTPServer
+import json
+import logging
+import platform
+import random
+import re
+import socketserver
+import statistics
+import threading
+import time
+import timeit
+import typing
+
+import attr
+from voluptuous import All
+from voluptuous import Any
+from voluptuous import Range
+from voluptuous import Schema
+from voluptuous import Self
+
+from githubcap import __version__ as githubcap_version
+import githubcap.classes as classes
+from githubcap.base import GitHubBase
+from githubcap.configuration import Configuration
+from githubcap.exceptions import SchemaValidationError
+from githubcap.manipulators import Checkbox
+from githubcap.utils import clear_datetime_cache
+from githubcap.utils import next_pagination_page
+from githubcap.utils import parse_datetime
+
+_LOG = logging.getLogger(__name__)
+
+_SAMPLE_DATETIME = '2018-01-02T03:04:05Z'
+_SAMPLE_URL = 'https://api.github.com/repos/fridex/githubcap'
+_SEED = 42
+
+
+def _sample_value(validator: typing.Any, key: str = None) -> typing.Any:
+    """Create a sample value accepted by a schema validator, key is the dictionary key the value is stored under."""
+    # pylint: disable=too-many-return-statements
+    if isinstance(validator, Schema):
+        return _sample_value(validator.schema, key)
+    if isinstance(validator, dict):
+        return {getattr(name, 'schema', name): _sample_value(value, getattr(name, 'schema', name))
+                for name, value in validator.items()}
+    if isinstance(validator, list):
+        return [_sample_value(validator[0], key)] if validator and validator[0] is not Self else []
+    if isinstance(validator, Any):
+        return _sample_value(next((option for option in validator.validators if option is not None), None), key)
+    if isinstance(validator, All):
+        return _sample_value(validator.validators[0], key)
+    if isinstance(validator, Range):
+        return validator.min if validator.min is not None else 1
+    if validator is str:
+        # Datetime attributes are validated as strings.
+        return _SAMPLE_DATETIME if key and key.endswith(('_at', '_on')) else 'sample'
+    if validator in (int, float):
+        return validator(1)
+    if validator in (bool, dict, list):
+        return validator()
+    if getattr(validator, '__name__', None) == 'Url':
+        return _SAMPLE_URL
+    if isinstance(validator, (str, int, bool)):
+        return validator
+
+    # Self references, None and anything accepting any value.
+    return None
+
+
+def _adjust_sample(resource_class: type, sample: typing.Any) -> typing.Any:
+    """Adjust a sample generated from schema to resource attribute types - e.g. enums validated as strings."""
+    if not isinstance(sample, dict):
+        return sample
+
+    for attribute in attr.fields(resource_class):
+        if sample.get(attribute.name) is None:
+            continue
+
+        # pylint: disable=protected-access
+        item_type = GitHubBase._list_item_type(attribute.type)
+        attribute_type = item_type or attribute.type
+        if isinstance(attribute_type, type) and issubclass(attribute_type, enum.Enum):
+            value = next(iter(attribute_type)).value
+            sample[attribute.name] = [value] if item_type else value
+        elif isinstance(attribute_type, type) and issubclass(attribute_type, GitHubBase):
+            if item_type:
+                sample[attribute.name] = [_adjust_sample(attribute_type, item) for item in sample[attribute.name]]
+            else:
+                sample[attribute.name] = _adjust_sample(attribute_type, sample[attribute.name])
+
+    return sample
+
+
+def sample_response(resource_class: type) -> dict:
+    """Create a complete sample response of the given resource class based on its schema."""
+    # pylint: disable=protected-access
+    return _adjust_sample(resource_class, _sample_value(resource_class._SCHEMA))
+
+
+def get_resource_classes() -> typing.List[type]:
+    """Get all resource classes with a schema."""
+    return [value for _, value in sorted(vars(classes).items())
+            if isinstance(value, type) and issubclass(value, GitHubBase) and value is not GitHubBase and
+            getattr(value, '_SCHEMA', None) is not None]
+
+
+def measure(func: typing.Callable[[], typing.Any], repeat: int = 5, min_time: float = 0.05,
+            operations: int = 1) -> dict:
+    """Measure time of an operation.
+
+    :param func: function performing the measured operation(s)
+    :param repeat: number of measurements, statistics are computed out of them
+    :param min_time: minimum time of a measurement in seconds, func is called multiple times to reach it
+    :param operations: number of operations a single func call performs
+    :return: number of calls in a measurement, minimum and median time per operation in microseconds
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else min(max(int(min_time / elapsed * 1.2), 2), 10)
+
+    times = [elapsed] + timer.repeat(repeat=repeat - 1, number=number) if repeat > 1 else [elapsed]
+    per_operation = [value / number / operations * 1e6 for value in times]
+    return {
+        'number': number * operations,
+        'repeat': repeat,
+        'min_us': round(min(per_operation), 3),
+        'median_us': round(statistics.median(per_operation), 3),
+    }
+
+
+def _get_micro_benchmarks() -> typing.Tuple[typing.Dict[str, typing.Tuple[typing.Callable, int]], typing.Dict[str, str]]:
+    """Prepare micro benchmarks - name to a tuple of function and number of operations it performs.
+
+    :return: benchmarks and benchmarks skipped with the reason
+    """
+    benchmarks = {}
+    skipped = {}
+    for resource_class in get_resource_classes():
+        response = sample_response(resource_class)
+        try:
+            resource = resource_class.from_response(response)
+            resource.to_dict()
+        except (SchemaValidationError, TypeError) as exc:
+            # Resource classes that do not match their schema (sample response is not valid or not accepted).
+            reason = "{}: {!s}".format(exc.__class__.__name__, str(exc))
+            skipped['from_response/' + resource_class.__name__] = reason
+            skipped['to_dict/' + resource_class.__name__] = reason
+            continue
+
+        benchmarks['from_response/' + resource_class.__name__] = (
+            lambda cls=resource_class, data=response: cls.from_response(data), 1
+        )
+        benchmarks['to_dict/' + resource_class.__name__] = (lambda obj=resource: obj.to_dict(), 1)
+
+    rand = random.Random(_SEED)
+    base = datetime.datetime(2008, 1, 1)
+    timestamps = [(base + datetime.timedelta(seconds=rand.randrange(10 * 365 * 24 * 3600))).strftime(
+        '%Y-%m-%dT%H:%M:%SZ') for _ in range(1000)]
+
+    def parse_distinct():
+        # Parsed values are memoized, the cache is cleared so parsing is measured.
+        clear_datetime_cache()
+        for timestamp in timestamps:
+            parse_datetime(timestamp)
+
+    benchmarks['parse_datetime'] = (parse_distinct, len(timestamps))
+    benchmarks['parse_datetime/cached'] = (lambda: parse_datetime(_SAMPLE_DATETIME), 1)
+
+    headers = {'Link': '<{0}/issues?state=open&page=3>; rel="next", <{0}/issues?state=open&page=50>; rel="last", '
+                       '<{0}/issues?state=open&page=1>; rel="first", <{0}/issues?state=open&page=1>; rel="prev"'
+                       .format(_SAMPLE_URL)}
+    benchmarks['next_pagination_page'] = (lambda: next_pagination_page(headers), 1)
+
+    text = '\n'.join('- [{}] task {:d}'.format('x' if i % 2 else ' ', i) for i in range(100))
+    benchmarks['Checkbox.set'] = (lambda: Checkbox.set(text, 'task 50'), 1)
+    benchmarks['Checkbox.unset'] = (lambda: Checkbox.unset(text, 'task 51'), 1)
+    return benchmarks, skipped
+
+
+def run_micro_benchmarks(pattern: str = None, repeat: int = 5, min_time: float = 0.05) -> dict:
+    """Run micro benchmarks.
+
+    :param pattern: a regular expression, only benchmarks with matching names are run
+    :param repeat: number of measurements of each benchmark
+    :param min_time: minimum time of a measurement in seconds
+    :return: results keyed by benchmark name, benchmarks that could not be run are listed under "skipped"
+    """
+    benchmarks, skipped = _get_micro_benchmarks()
+    pattern = re.compile(pattern) if pattern else None
+    results = {}
+    with Configuration().temporary_change(validate_schemas=True):
+        for name, (func, operations) in sorted(benchmarks.items()):
+            if pattern is not None and not pattern.search(name):
+                continue
+            _LOG.debug("Running micro benchmark %r", name)
+            results[name] = measure(func, repeat=repeat, min_time=min_time, operations=operations)
+
+    results['skipped'] = {name: reason for name, reason in sorted(skipped.items())
+                          if pattern is None or pattern.search(name)}
+    return results
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    """HTTP server handling each request in a thread."""
+
+    daemon_threads = True
+
+
+def _create_stub_server(pages: int, per_page: int, latency: float) -> HTTPServer:
+    """Create a local HTTP server serving pages of an issue listing."""
+    bodies = {}
+    issue = sample_response(classes.Issue)
+    for page in range(1, pages + 1):
+        items = []
+        for i in range(per_page):
+            number = (page - 1) * per_page + i + 1
+            items.append(dict(issue, number=number, id=number, title='Issue {:d}'.format(number)))
+        bodies[page] = json.dumps(items).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        """Serve listing pages, pagination is stated in Link header as GitHub does."""
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            """Serve a page of the listing."""
+            matched = re.search(r'[?&]page=(\d+)', self.path)
+            page = max(int(matched.group(1)) if matched else 1, 1)
+            body = bodies.get(page, b'[]')
+            if latency:
+                time.sleep(latency)
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if page < pages:
+                base_url = 'http://{}:{:d}{}'.format(self.server.server_address[0], self.server.server_address[1],
+                                                     self.path.split('?')[0])
+                self.send_header('Link', '<{0}?page={1:d}>; rel="next", <{0}?page={2:d}>; rel="last"'.format(
+                    base_url, page + 1, pages))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *_):  # pylint: disable=arguments-differ
+            """Do not log requests."""
+
+    return _ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+
+
+def run_macro_benchmarks(pages: int = 10, per_page: int = 100, latency: float = 0.0, repeat: int = 5) -> dict:
+    """Run macro benchmarks against a local stub of GitHub API.
+
+    :param pages: number of pages listed
+    :param per_page: number of issues on a page
+    :param latency: latency of the stub in seconds, added to each response
+    :param repeat: number of measurements
+    :return: results keyed by benchmark name
+    """
+    server = _create_stub_server(pages, per_page, latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def list_issues():
+        # pylint: disable=protected-access
+        count = 0
+        for item, _ in classes.Issue._do_listing('/repos/bench/bench/issues', 'state=all', page=1):
+            classes.Issue.from_response(item)
+            count += 1
+        return count
+
+    try:
+        api = 'http://{}:{:d}'.format(*server.server_address)
+        with Configuration().temporary_change(github_api=api, user=None, token=None, pagination=True,
+                                              validate_schemas=True, omit_rate_limiting=False):
+            times = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                count = list_issues()
+                times.append(time.perf_counter() - start)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        'listing': {
+            'pages': pages,
+            'per_page': per_page,
+            'latency_s': latency,
+            'items': count,
+            'repeat': repeat,
+            'min_s': round(min(times), 6),
+            'median_s': round(statistics.median(times), 6),
+            'items_per_second': round(count / statistics.median(times), 1),
+        }
+    }
+
+
+def get_environment() -> dict:
+    """Describe environment benchmarks were run in."""
+    return {
+        'githubcap': githubcap_version,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
@@ -1,4 +1,6 @@
 from datetime import datetime
+import functools
+import operator
 import typing
 
 import attr
@@ -7,8 +9,11 @@ from voluptuous import Schema
 import githubcap.enums as enums
 import githubcap.schemas as schemas
 
+from .base import derived_urls
 from .base import GitHubBase
 from .exceptions import HTTPError
+from .pagination import merge_listings
+from .pagination import PaginatedList
 from .utils import serialize_datetime
 
 # Break cyclic type dependencies where needed.
@@ -17,6 +22,18 @@ _RepositoryType = typing.TypeVar('T', bound='Repository')
 _IssueType = typing.TypeVar('T', bound='Issue')
 
 
+@derived_urls(
+    events_url=('url', '/events{/privacy}'),
+    followers_url=('url', '/followers'),
+    following_url=('url', '/following{/other_user}'),
+    gists_url=('url', '/gists{/gist_id}'),
+    html_url=('login', '', 'https://github.com/'),
+    organizations_url=('url', '/orgs'),
+    received_events_url=('url', '/received_events'),
+    repos_url=('url', '/repos'),
+    starred_url=('url', '/starred{/owner}{/repo}'),
+    subscriptions_url=('url', '/subscriptions'),
+)
 @attr.s
 class User(GitHubBase):
     """A GitHub user."""
@@ -118,6 +135,49 @@ class RepositoryPermissions(GitHubBase):
     push = attr.ib(type=bool)
 
 
+@derived_urls(
+    archive_url=('url', '/{archive_format}{/ref}'),
+    assignees_url=('url', '/assignees{/user}'),
+    blobs_url=('url', '/git/blobs{/sha}'),
+    branches_url=('url', '/branches{/branch}'),
+    clone_url=('full_name', '.git', 'https://github.com/'),
+    collaborators_url=('url', '/collaborators{/collaborator}'),
+    comments_url=('url', '/comments{/number}'),
+    commits_url=('url', '/commits{/sha}'),
+    compare_url=('url', '/compare/{base}...{head}'),
+    contents_url=('url', '/contents/{+path}'),
+    contributors_url=('url', '/contributors'),
+    deployments_url=('url', '/deployments'),
+    downloads_url=('url', '/downloads'),
+    events_url=('url', '/events'),
+    forks_url=('url', '/forks'),
+    git_commits_url=('url', '/git/commits{/sha}'),
+    git_refs_url=('url', '/git/refs{/sha}'),
+    git_tags_url=('url', '/git/tags{/sha}'),
+    git_url=('full_name', '.git', 'git://github.com/'),
+    hooks_url=('url', '/hooks'),
+    html_url=('full_name', '', 'https://github.com/'),
+    issue_comment_url=('url', '/issues/comments{/number}'),
+    issue_events_url=('url', '/issues/events{/number}'),
+    issues_url=('url', '/issues{/number}'),
+    keys_url=('url', '/keys{/key_id}'),
+    labels_url=('url', '/labels{/name}'),
+    languages_url=('url', '/languages'),
+    merges_url=('url', '/merges'),
+    milestones_url=('url', '/milestones{/number}'),
+    notifications_url=('url', '/notifications{?since,all,participating}'),
+    pulls_url=('url', '/pulls{/number}'),
+    releases_url=('url', '/releases{/id}'),
+    ssh_url=('full_name', '.git', 'git@github.com:'),
+    stargazers_url=('url', '/stargazers'),
+    statuses_url=('url', '/statuses/{sha}'),
+    subscribers_url=('url', '/subscribers'),
+    subscription_url=('url', '/subscription'),
+    svn_url=('full_name', '', 'https://github.com/'),
+    tags_url=('url', '/tags'),
+    teams_url=('url', '/teams'),
+    trees_url=('url', '/git/trees{/sha}'),
+)
 @attr.s
 class Repository(GitHubBase):
     """A repository definition."""
@@ -1385,6 +1445,11 @@ class IssuePullRequestInfo(GitHubBase):
     patch_url = attr.ib(type=str)
 
 
+@derived_urls(
+    comments_url=('url', '/comments'),
+    events_url=('url', '/events'),
+    labels_url=('url', '/labels{/name}'),
+)
 @attr.s
 class Issue(GitHubBase):
     """An issue representation."""
@@ -1448,30 +1513,42 @@ class Issue(GitHubBase):
                   .format(number=number, owner=owner, repo=repo), method='DELETE')
 
     @classmethod
-    def by_number(cls, organization: str, project: str, number: int) -> _IssueType:
-        """Retrieve issue based on it's number."""
+    def by_number(cls, organization: str, project: str, number: int,
+                  fields: typing.List[str] = None, raw: bool = False) -> typing.Union[_IssueType, dict]:
+        """Retrieve issue based on it's number, optionally parse only the requested fields or return raw response."""
         uri = '/repos/{org!s}/{project!s}/issues/{number:d}'.format(org=organization, project=project, number=number)
         response, _ = cls._call(uri, method='GET')
-        return cls.from_response(response)
+        return cls.from_response(response, fields, raw)
+
+    @classmethod
+    def create_by_attributes(cls, organization: str, project: str, attributes: dict,
+                             raw: bool = False) -> typing.Union[_IssueType, dict]:
+        """Create an issue with the given attributes (title, body, milestone, labels, assignees) as sent to GitHub."""
+        uri = '/repos/{org!s}/{project!s}/issues'.format(org=organization, project=project)
+        response, _ = cls._call(uri, payload=attributes, method='POST')
+        return cls.from_response(response, raw=raw)
+
+    @classmethod
+    def edit_by_number(cls, organization: str, project: str, number: int, attributes: dict,
+                       raw: bool = False) -> typing.Union[_IssueType, dict]:
+        """Edit attributes (title, body, state, milestone, labels, assignees) of an existing issue."""
+        uri = '/repos/{org!s}/{project!s}/issues/{number:d}'.format(org=organization, project=project, number=number)
+        response, _ = cls._call(uri, payload=attributes, method='PATCH')
+        return cls.from_response(response, raw=raw)
 
     def create(self, organization: str, project: str) -> _IssueType:
         """Create an issue."""
-        uri = '/repos/{org!s}/{project!s}/issues'.format(org=organization, project=project)
-        payload = {key: value for key, value in attr.asdict(self).items() if value is not None}
-        response, _ = self._call(uri, payload=payload, method='POST')
-        return Issue.from_response(response)
+        payload = {key: value for key, value in self.to_dict().items() if value is not None}
+        return self.create_by_attributes(organization, project, payload)
 
     def edit(self, organization: str, project: str, number: int) -> _IssueType:
         """Edit existing issue."""
-        uri = '/repos/{org!s}/{project!s}/issues/{number:d}'.format(org=organization, project=project, number=number)
-        payload = {key: value for key, value in attr.asdict(self).items() if value is not None}
-        response, _ = self._call(uri, payload=payload, method='PATCH')
+        payload = {key: value for key, value in self.to_dict().items() if value is not None}
         # TODO: report not-changed values
-        return Issue.from_response(response)
+        return self.edit_by_number(organization, project, number, payload)
 
     @classmethod
-    def _list_issues_any(cls, url: str, query_attrs: dict) -> typing.Generator[_IssueType, None, None]:
-        page = query_attrs.pop('page')
+    def _get_issues_query_string(cls, query_attrs: dict) -> str:
         query_attrs.pop('cls')
         query_string = ""
         for key, value in query_attrs.items():
@@ -1482,17 +1559,17 @@ class Issue(GitHubBase):
                 if isinstance(value, datetime):
                     value = serialize_datetime(value)
 
-            if key in ('assignee', 'creator', 'mentioned') and value is None:
+            if key in ('assignee', 'creator', 'mentioned', 'milestone') and value is None:
                 continue
 
             if key == 'filter':
-                value = enums.Filtering.get_default()
+                value = value or enums.Filtering.get_default()
             elif key == 'state':
-                value = enums.IssueState.get_default()
+                value = value or enums.IssueState.get_default()
             elif key == 'sort':
-                value = enums.Sorting.get_default()
+                value = value or enums.Sorting.get_default()
             elif key == 'direction':
-                value = enums.SortingDirection.get_default()
+                value = value or enums.SortingDirection.get_default()
             elif key == 'labels':
                 if not value:
                     continue
@@ -1503,16 +1580,46 @@ class Issue(GitHubBase):
 
             query_string += '{!s}={!s}'.format(key, str(value) if value is not None else 'none')
 
-        for item, _ in cls._do_listing(url, query_string, page):
-            yield cls.from_response(item)
+        return query_string
+
+    @classmethod
+    def _iter_issues_any(cls, url: str, query_string: str, page: int, fields: typing.List[str], raw: bool,
+                         resume: str) -> typing.Generator[typing.Union[_IssueType, dict], None, None]:
+        for item, _ in cls._do_listing(url, query_string, page, resume=resume):
+            yield cls.from_response(item, fields, raw)
+
+    @classmethod
+    def _list_issues_any(cls, url: str,
+                         query_attrs: dict) -> typing.Iterable[typing.Union[_IssueType, dict]]:
+        page = query_attrs.pop('page')
+        fields = query_attrs.pop('fields')
+        raw = query_attrs.pop('raw')
+        resume = query_attrs.pop('resume')
+        query_string = cls._get_issues_query_string(query_attrs)
+        if resume is not None:
+            # Checkpointed listings are sequential by nature.
+            return cls._iter_issues_any(url, query_string, page, fields, raw, resume)
+
+        return cls._do_paginated_listing(url, query_string, page,
+                                         transform=lambda item: cls.from_response(item, fields, raw))
+
+    @classmethod
+    def _count_issues_any(cls, url: str, query_attrs: dict) -> int:
+        return cls._do_count(url, cls._get_issues_query_string(query_attrs))
 
     @classmethod
     def list_assigned_issues(cls, page: int = 0, filter: enums.Filtering = None, state: enums.IssueState = None,
                              labels: typing.List[Label] = None, sort: enums.Sorting = None,
                              direction: enums.SortingDirection = None, since: typing.Union[datetime, str] = None,
                              milestone: str = None, assignee: str = None, creator: str = None,
-                             mentioned: str = None) -> typing.Generator[_IssueType, None, None]:
-        """List all assigned issues for the given organization - if organization is None, all issues are listed."""
+                             mentioned: str = None,
+                             fields: typing.List[str] = None,
+                             raw: bool = False,
+                             resume: str = None) -> typing.Iterable[typing.Union[_IssueType, dict]]:
+        """List all assigned issues for the given organization - if organization is None, all issues are listed.
+
+        Issues are returned as a lazy PaginatedList, a generator is returned for checkpointed listings (resume).
+        """
         return cls._list_issues_any('/issues', locals())
 
     @classmethod
@@ -1521,10 +1628,13 @@ class Issue(GitHubBase):
                                  sort: enums.Sorting = None, direction: enums.SortingDirection = None,
                                  since: typing.Union[datetime, str] = None, milestone: str = None,
                                  assignee: str = None, creator: str = None,
-                                 mentioned: str = None) ->typing.Generator[_IssueType, None, None]:
+                                 mentioned: str = None,
+                                 fields: typing.List[str] = None,
+                                 raw: bool = False,
+                                 resume: str = None) -> typing.Iterable[typing.Union[_IssueType, dict]]:
         """List issues for a organization."""
-        url = '/orgs/{!s}/issues'.format(organization)
         query_attrs = dict(locals())
+        url = '/orgs/{!s}/issues'.format(organization)
         query_attrs.pop('organization')
         return cls._list_issues_any(url, query_attrs)
 
@@ -1534,7 +1644,10 @@ class Issue(GitHubBase):
                                  sort: enums.Sorting = None, direction: enums.SortingDirection = None,
                                  since: typing.Union[datetime, str] = None, milestone: str = None,
                                  assignee: str = None, creator: str = None,
-                                 mentioned: str = None) -> typing.Generator[_IssueType, None, None]:
+                                 mentioned: str = None,
+                                 fields: typing.List[str] = None,
+                                 raw: bool = False,
+                                 resume: str = None) -> typing.Iterable[typing.Union[_IssueType, dict]]:
         """List issues for the given organization/owner and project."""
         query_attrs = dict(locals())
         url = '/repos/{!s}/{!s}/issues'.format(organization, project)
@@ -1542,6 +1655,68 @@ class Issue(GitHubBase):
         query_attrs.pop('project')
         return cls._list_issues_any(url, query_attrs)
 
+    @classmethod
+    def list_repositories_issues(cls, repositories: typing.Iterable[str], state: enums.IssueState = None,
+                                 labels: typing.List[Label] = None, since: typing.Union[datetime, str] = None,
+                                 milestone: str = None, assignee: str = None, creator: str = None,
+                                 mentioned: str = None,
+                                 fields: typing.List[str] = None,
+                                 raw: bool = False,
+                                 max_workers: int = 8) -> typing.Generator[typing.Union[_IssueType, dict], None, None]:
+        """List issues of multiple repositories (given by full names - owner/project) as a single stream.
+
+        Issues are listed from the most recently updated ones. Listings of all repositories are retrieved concurrently
+        and merged lazily, so the first issues are available once first pages arrive and memory is bounded by the
+        number of repositories. The stream ends once issues updated before 'since' would be listed.
+        """
+        since = serialize_datetime(since) if isinstance(since, datetime) else since
+        query_string = cls._get_issues_query_string({
+            'cls': cls, 'filter': None, 'state': state, 'labels': labels, 'sort': enums.Sorting.UPDATED,
+            'direction': enums.SortingDirection.DESC, 'since': since, 'milestone': milestone, 'assignee': assignee,
+            'creator': creator, 'mentioned': mentioned
+        })
+        fetchers = [
+            functools.partial(cls._fetch_listing_page, '/repos/{!s}/issues'.format(repository), query_string)
+            for repository in repositories
+        ]
+
+        for item in merge_listings(fetchers, key=operator.itemgetter('updated_at'), reverse=True,
+                                   max_workers=max_workers):
+            if since is not None and item['updated_at'] < since:
+                return
+            yield cls.from_response(item, fields, raw)
+
+    @classmethod
+    def count_assigned_issues(cls, filter: enums.Filtering = None, state: enums.IssueState = None,
+                              labels: typing.List[Label] = None, since: typing.Union[datetime, str] = None,
+                              milestone: str = None, assignee: str = None, creator: str = None,
+                              mentioned: str = None) -> int:
+        """Count assigned issues matching the given criteria without listing them (a single API call)."""
+        return cls._count_issues_any('/issues', locals())
+
+    @classmethod
+    def count_organization_issues(cls, organization: str, filter: enums.Filtering = None,
+                                  state: enums.IssueState = None, labels: typing.List[Label] = None,
+                                  since: typing.Union[datetime, str] = None, milestone: str = None,
+                                  assignee: str = None, creator: str = None, mentioned: str = None) -> int:
+        """Count issues of an organization matching the given criteria without listing them (a single API call)."""
+        query_attrs = dict(locals())
+        url = '/orgs/{!s}/issues'.format(organization)
+        query_attrs.pop('organization')
+        return cls._count_issues_any(url, query_attrs)
+
+    @classmethod
+    def count_project_issues(cls, organization: str, project: str, filter: enums.Filtering = None,
+                             state: enums.IssueState = None, labels: typing.List[Label] = None,
+                             since: typing.Union[datetime, str] = None, milestone: str = None,
+                             assignee: str = None, creator: str = None, mentioned: str = None) -> int:
+        """Count issues of a project matching the given criteria without listing them (a single API call)."""
+        query_attrs = dict(locals())
+        url = '/repos/{!s}/{!s}/issues'.format(organization, project)
+        query_attrs.pop('organization')
+        query_attrs.pop('project')
+        return cls._count_issues_any(url, query_attrs)
+
 
 class Team(GitHubBase):
     """Representation of a team."""
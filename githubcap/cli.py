@@ -9,7 +9,8 @@ import click
 import attr
 from githubcap import __version__ as githubcap_version
 from githubcap import Configuration
-import githubcap.commands as cli_commands
+from githubcap.commands import LazyGroup
+from githubcap.profiling import Profile
 from githubcap.utils import parse_cli_headers
 from githubcap.utils import setup_logging
 
@@ -27,7 +28,29 @@ def _print_version(ctx, _, value):
     ctx.exit()
 
 
-@click.group()
+def _start_profiling(ctx: click.Context, profile_output: str = None) -> None:
+    """Profile the command run, a per-phase breakdown is printed to standard error when the command finishes."""
+    profile = Profile()
+    profiler = None
+    if profile_output:
+        import cProfile
+        profiler = cProfile.Profile()
+
+    def report():
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_output)
+            _LOG.info("cProfile statistics written to %r", profile_output)
+        profile.stop()
+        click.echo(profile.format_report(), err=True)
+
+    ctx.call_on_close(report)
+    profile.start()
+    if profiler is not None:
+        profiler.enable()
+
+
+@click.group(cls=LazyGroup)
 @click.pass_context
 @click.option('-v', '--verbose', count=True,
               help="Be verbose about what's going on (can be supplied multiple times).")
@@ -55,15 +78,23 @@ def _print_version(ctx, _, value):
               help="Do not validate schemas from API response.")
 @click.option('--config', '-c', type=str, metavar='CONFIG.yaml',
               help="A path to configuration file.")
+@click.option('--profile', is_flag=True,
+              help="Print time spent in HTTP requests, rate limiting, validation, construction and output "
+                   "to standard error once the command finishes.")
+@click.option('--profile-output', type=str, metavar='FILE.prof',
+              help="Dump cProfile statistics of the command to the given file, implies --profile.")
 def cli(ctx=None, verbose=0, no_color=True, user=None, password=None, token=None, config=None,
         no_validate_schemas=False, no_omit_rate_limiting=False, no_pagination=False, headers=None,
-        per_page_listing=None, github_api=None):
+        per_page_listing=None, github_api=None, profile=False, profile_output=None):
     """Githubcap command line interface."""
     if ctx:
         ctx.auto_envvar_prefix = 'GITHUBCAP'
 
     setup_logging(verbose, no_color)
 
+    if profile or profile_output:
+        _start_profiling(ctx, profile_output)
+
     if config is not None:
         Configuration(config_file=config)
 
@@ -87,10 +118,5 @@ def cli(ctx=None, verbose=0, no_color=True, user=None, password=None, token=None
     _LOG.debug("Supplied cli options: %s", ctx.params)
 
 
-# Add implemented sub-comands.
-for command in cli_commands.__dict__.values():
-    if isinstance(command, click.core.Command):
-        cli.add_command(command)
-
 if __name__ == '__main__':
     sys.exit(cli())
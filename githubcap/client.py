@@ -0,0 +1,193 @@
+"""A thin client running githubcap-cli commands in a running githubcap daemon.
+
+The client forwards its arguments, environment, working directory and standard input to the daemon and streams
+output of the command back. It imports only the standard library, so a call does not pay for importing githubcap,
+parsing configuration or setting up connections to GitHub API. If no daemon is running, the command is run
+in-process as githubcap-cli would do:
+
+    $ githubcap-cli daemon &
+    $ githubcap-client issues fridex githubcap --state open
+
+The client forwards credentials (GITHUB* environment variables), so it talks only to a daemon run by the same user -
+both the socket file and the process listening on it have to be owned by the user.
+"""
+
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+import threading
+import typing
+
+# Frame types, a frame is the type byte followed by payload length (4 bytes, big endian) and the payload.
+FRAME_REQUEST = b'R'
+FRAME_STDIN = b'I'
+FRAME_STDOUT = b'O'
+FRAME_STDERR = b'E'
+FRAME_EXIT = b'X'
+_FRAME_HEADER = struct.Struct('>cI')
+_CHUNK_SIZE = 65536
+# Environment variables with this prefix are forwarded (e.g. GITHUB_TOKEN, GITHUBCAP_* options).
+_FORWARDED_ENVIRONMENT_PREFIX = 'GITHUB'
+# Peer credentials of a Unix socket - pid, uid and gid.
+_PEER_CREDENTIALS = struct.Struct('3i')
+
+
+def get_fallback_socket_path() -> str:
+    """Get path to daemon socket used if there is no runtime directory - a socket in a private temporary directory."""
+    return os.path.join(tempfile.gettempdir(), 'githubcap-{:d}'.format(os.getuid()), 'daemon.sock')
+
+
+def get_socket_path() -> str:
+    """Get path to daemon socket - $GITHUBCAP_DAEMON_SOCKET or a per-user socket in runtime directory."""
+    socket_path = os.getenv('GITHUBCAP_DAEMON_SOCKET')
+    if socket_path:
+        return socket_path
+
+    runtime_dir = os.getenv('XDG_RUNTIME_DIR')
+    if not runtime_dir:
+        return get_fallback_socket_path()
+    return os.path.join(runtime_dir, 'githubcap-{:d}.sock'.format(os.getuid()))
+
+
+def ensure_private_directory(path: str) -> None:
+    """Create a directory accessible only by the current user, an existing one has to be such a directory.
+
+    :raises PermissionError: if the directory is not owned by the user, is accessible by others or is not a directory
+    """
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+
+    # Not followed, a symlink could point to a directory of another user.
+    path_stat = os.lstat(path)
+    if not stat.S_ISDIR(path_stat.st_mode) or path_stat.st_uid != os.getuid() or path_stat.st_mode & 0o077:
+        raise PermissionError("{!r} is not a directory accessible only by the current user".format(path))
+
+
+def get_peer_uid(sock: socket.socket) -> typing.Optional[int]:
+    """Get uid of the process on the other end of a connected Unix socket, None if not supported by the platform."""
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEER_CREDENTIALS.size)
+    return _PEER_CREDENTIALS.unpack(credentials)[1]
+
+
+def verify_socket(sock: socket.socket, socket_path: str) -> None:
+    """Make sure the socket file and the process listening on the connected socket are owned by the current user.
+
+    :raises PermissionError: if the socket is owned or served by another user
+    """
+    uid = os.getuid()
+    owner = os.lstat(socket_path).st_uid
+    if owner != uid:
+        raise PermissionError("Daemon socket {!r} is owned by another user (uid {:d})".format(socket_path, owner))
+
+    peer_uid = get_peer_uid(sock)
+    if peer_uid is not None and peer_uid != uid:
+        raise PermissionError("Daemon socket {!r} is served by another user (uid {:d})".format(socket_path, peer_uid))
+
+
+def get_forwarded_environment() -> typing.Dict[str, str]:
+    """Get environment variables forwarded to the daemon."""
+    return {key: value for key, value in os.environ.items() if key.startswith(_FORWARDED_ENVIRONMENT_PREFIX)}
+
+
+def send_frame(sock: socket.socket, frame_type: bytes, payload: bytes = b'') -> None:
+    """Send a frame of the given type."""
+    sock.sendall(_FRAME_HEADER.pack(frame_type, len(payload)) + payload)
+
+
+def receive_frame(stream: typing.BinaryIO) -> typing.Tuple[typing.Optional[bytes], bytes]:
+    """Receive a frame from a socket stream, frame type is None if the connection was closed."""
+    header = stream.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        return None, b''
+
+    frame_type, length = _FRAME_HEADER.unpack(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None, b''
+
+    return frame_type, payload
+
+
+def _forward_stdin(sock: socket.socket) -> None:
+    """Forward standard input to the daemon, end of input is sent as an empty frame."""
+    try:
+        while True:
+            data = os.read(sys.stdin.fileno(), _CHUNK_SIZE)
+            send_frame(sock, FRAME_STDIN, data)
+            if not data:
+                break
+    except OSError:
+        # The daemon finished the command without reading whole input.
+        pass
+
+
+def forward(argv: typing.List[str], socket_path: str = None) -> typing.Optional[int]:
+    """Run githubcap-cli with the given arguments in a running daemon.
+
+    :param argv: githubcap-cli arguments
+    :param socket_path: path to daemon socket, see get_socket_path() for the default
+    :return: exit code of the command, None if no daemon (run by the current user) is running
+    """
+    socket_path = socket_path or get_socket_path()
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+        # Nothing is sent before the daemon is verified, the request carries credentials.
+        verify_socket(sock, socket_path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        sock.close()
+        return None
+    except PermissionError as exc:
+        sock.close()
+        sys.stderr.write("Not forwarding command to githubcap daemon: {!s}\n".format(exc))
+        return None
+
+    with sock:
+        # Interactive input is not forwarded, commands reading standard input are not run interactively.
+        forward_stdin = sys.stdin is not None and not sys.stdin.isatty()
+        request = {
+            'argv': argv,
+            'cwd': os.getcwd(),
+            'environment': get_forwarded_environment(),
+            'stdin': forward_stdin,
+        }
+        send_frame(sock, FRAME_REQUEST, json.dumps(request).encode())
+        if forward_stdin:
+            threading.Thread(target=_forward_stdin, args=(sock,), daemon=True).start()
+
+        outputs = {FRAME_STDOUT: sys.stdout.buffer, FRAME_STDERR: sys.stderr.buffer}
+        stream = sock.makefile('rb')
+        while True:
+            frame_type, payload = receive_frame(stream)
+            if frame_type == FRAME_EXIT:
+                return int(payload)
+
+            if frame_type not in outputs:
+                sys.stderr.write("githubcap daemon closed connection unexpectedly\n")
+                return 1
+
+            outputs[frame_type].write(payload)
+            outputs[frame_type].flush()
+
+
+def main() -> None:
+    """Entry point of githubcap-client."""
+    exit_code = forward(sys.argv[1:])
+    if exit_code is None:
+        from githubcap.cli import cli
+        cli(prog_name='githubcap-cli')  # pylint: disable=unexpected-keyword-arg,no-value-for-parameter
+
+    sys.exit(exit_code)
+
+
+if __name__ == '__main__':
+    main()
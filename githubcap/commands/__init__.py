@@ -1,8 +1,80 @@
-"""Commands for githubcap-cli."""
-
-from .config import cli_config
-from .issue import cli_issue
-from .issue import cli_issue_create
-from .issue import cli_issue_edit
-from .issue import cli_issues
-from .scrape import cli_scrape
+"""Commands for githubcap-cli.
+
+Commands are registered lazily - a module implementing a command is imported only once the command is invoked,
+so the CLI does not pay for importing all resources, schemas and scraping dependencies on each run.
+"""
+
+import importlib
+import sys
+import typing
+
+import click
+
+# Command name -> (module, command function, short help shown in command listing without importing the module).
+COMMANDS = {
+    'bench': ('githubcap.commands.bench', 'cli_bench', "Run benchmarks that need no network access."),
+    'config': ('githubcap.commands.config', 'cli_config', "Manipulate with githubcap configuration."),
+    'daemon': ('githubcap.commands.daemon', 'cli_daemon', "Stay resident and run commands forwarded by client."),
+    'issue': ('githubcap.commands.issue', 'cli_issue', "Retrieve a GitHub issue."),
+    'issue-batch': ('githubcap.commands.issue', 'cli_issue_batch', "Create and edit GitHub issues in bulk."),
+    'issue-create': ('githubcap.commands.issue', 'cli_issue_create', "Create a GitHub issue."),
+    'issue-edit': ('githubcap.commands.issue', 'cli_issue_edit', "Modify a GitHub issue."),
+    'issues': ('githubcap.commands.issue', 'cli_issues', "List GitHub issues."),
+    'mirror': ('githubcap.commands.mirror', 'cli_mirror', "Keep a local snapshot of issues of repositories."),
+    'scrape': ('githubcap.commands.scrape', 'cli_scrape', "Scrape GitHub API documentation for resources and schemas."),
+    'watch': ('githubcap.commands.watch', 'cli_watch', "Poll repositories for issue changes."),
+}
+
+
+def load_command(name: str) -> typing.Optional[click.Command]:
+    """Import module implementing the given command and return the command, None if there is no such command."""
+    if name not in COMMANDS:
+        return None
+
+    module_name, function_name, _ = COMMANDS[name]
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+class LazyGroup(click.Group):
+    """A click group loading registered commands on demand."""
+
+    def list_commands(self, ctx: click.Context) -> typing.List[str]:
+        """List registered commands together with commands added explicitly."""
+        return sorted(set(COMMANDS) | set(super().list_commands(ctx)))
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> typing.Optional[click.Command]:
+        """Get a command, the command module is imported only if the command is requested."""
+        command = super().get_command(ctx, cmd_name)
+        if command is None:
+            command = load_command(cmd_name)
+            if command is not None:
+                self.add_command(command, cmd_name)
+        return command
+
+    def format_commands(self, ctx: click.Context, formatter: click.HelpFormatter) -> None:
+        """Write command listing to help output using registered short help, no command module is imported."""
+        rows = []
+        for name in self.list_commands(ctx):
+            if name in COMMANDS:
+                rows.append((name, COMMANDS[name][2]))
+            else:
+                rows.append((name, self.commands[name].short_help or ''))
+
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+
+def __getattr__(name: str) -> click.Command:
+    """Provide command functions (e.g. cli_issues) as module attributes, modules are imported on first access."""
+    for command_name, (_, function_name, _) in COMMANDS.items():
+        if function_name == name:
+            return load_command(command_name)
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+
+if sys.version_info < (3, 7):  # pragma: no cover
+    # Module __getattr__ (PEP 562) is not supported, command functions are imported eagerly.
+    globals().update((function_name, load_command(command_name))
+                     for command_name, (_, function_name, _) in COMMANDS.items())
@@ -0,0 +1,47 @@
+"""Implementation of CLI for running githubcap benchmarks."""
+
+import logging
+
+import click
+
+from githubcap.bench import get_environment
+from githubcap.bench import run_macro_benchmarks
+from githubcap.bench import run_micro_benchmarks
+from githubcap.utils import print_command_result
+
+# pylint: disable=too-many-arguments
+
+_LOG = logging.getLogger(__name__)
+
+
+@click.command('bench')
+@click.option('--no-pretty', is_flag=True,
+              help="Print results in a well formatted manner.")
+@click.option('--micro/--no-micro', default=True, show_default=True,
+              help="Run micro benchmarks - parsing and serialization of resources and other hot paths.")
+@click.option('--macro/--no-macro', default=True, show_default=True,
+              help="Run macro benchmarks - listing pages from a local stub of GitHub API.")
+@click.option('--filter', '-f', 'pattern', type=str, metavar='REGEX',
+              help="Run only micro benchmarks with names matching the given regular expression.")
+@click.option('--repeat', '-r', type=click.IntRange(1, None), default=5, show_default=True,
+              help="Number of measurements of each benchmark.")
+@click.option('--min-time', type=float, default=0.05, show_default=True, metavar='SECONDS',
+              help="Minimum time of a micro benchmark measurement.")
+@click.option('--pages', type=click.IntRange(1, None), default=10, show_default=True,
+              help="Number of pages listed in macro benchmark.")
+@click.option('--per-page', type=click.IntRange(1, 100), default=100, show_default=True,
+              help="Number of issues on a page listed in macro benchmark.")
+@click.option('--latency', type=float, default=0.0, show_default=True, metavar='SECONDS',
+              help="Latency of the local GitHub API stub in macro benchmark.")
+def cli_bench(no_pretty=False, micro=True, macro=True, pattern=None, repeat=5, min_time=0.05, pages=10,
+              per_page=100, latency=0.0):
+    """Run reproducible benchmarks that need no network access, results are printed as JSON."""
+    results = {'environment': get_environment()}
+    if micro:
+        _LOG.info("Running micro benchmarks")
+        results['micro'] = run_micro_benchmarks(pattern, repeat=repeat, min_time=min_time)
+    if macro:
+        _LOG.info("Running macro benchmarks")
+        results['macro'] = run_macro_benchmarks(pages=pages, per_page=per_page, latency=latency, repeat=repeat)
+
+    print_command_result(results, not no_pretty)
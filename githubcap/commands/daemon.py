@@ -0,0 +1,24 @@
+"""Implementation of CLI for running githubcap daemon."""
+
+import logging
+
+import click
+
+from githubcap.daemon import Daemon
+
+_LOG = logging.getLogger(__name__)
+
+
+@click.command('daemon')
+@click.pass_context
+@click.option('--socket', '-s', 'socket_path', type=str, envvar='GITHUBCAP_DAEMON_SOCKET', metavar='SOCKET',
+              help="A path to Unix socket to listen on, defaults to a per-user socket in runtime directory.")
+@click.option('--idle-timeout', type=float, metavar='SECONDS',
+              help="Exit if no command was run for the given number of seconds.")
+def cli_daemon(ctx, socket_path=None, idle_timeout=None):
+    """Stay resident and run githubcap-cli commands forwarded by githubcap-client.
+
+    Options supplied to githubcap-cli when starting the daemon (e.g. a configuration file or a token) are
+    used as defaults for all commands run.
+    """
+    Daemon(ctx.find_root().command, socket_path=socket_path, idle_timeout=idle_timeout).serve()
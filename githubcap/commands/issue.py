@@ -5,11 +5,31 @@ from functools import partial
 import click
 
 import githubcap.enums as enums
+from githubcap.batch import run_issue_batch
 from githubcap.classes import Issue
+from githubcap.serialization import dump_csv
+from githubcap.serialization import dump_json
+from githubcap.serialization import dump_ndjson
 from githubcap.utils import command_choice_callback
 from githubcap.utils import print_command_result
 from githubcap.exceptions import UserInputError
 
+# Columns of issue tables (CSV and TSV output) if no fields are requested explicitly.
+_ISSUE_COLUMNS = (
+    'number',
+    'title',
+    'state',
+    'user.login',
+    'assignees.login',
+    'labels.name',
+    'milestone.title',
+    'comments',
+    'created_at',
+    'updated_at',
+    'closed_at',
+    'html_url',
+)
+
 
 @click.command('issues')
 @click.option('--no-pretty', is_flag=True,
@@ -47,18 +67,69 @@ from githubcap.exceptions import UserInputError
               help="Filter issues based on creator.")
 @click.option('--mentioned', '-m', default=None, type=str, metavar="USER",
               help="Filter issues based on mentioned user.")
-def cli_issues(organization=None, project=None, no_pretty=False, **issues_query):
+@click.option('--fields', '-F', default=None, type=str, metavar="FIELD1,FIELD2.NESTED,..",
+              help="Retrieve only the given fields - a comma separated list, nested fields delimited by a dot.")
+@click.option('--raw', is_flag=True,
+              help="Print issues as returned by GitHub API, without constructing issue objects.")
+@click.option('--resume', default=None, type=str, metavar="STATE_FILE",
+              help="Checkpoint listing position to the given state file, continue from the checkpoint if present.")
+@click.option('--count', is_flag=True,
+              help="Print only number of issues matching the given criteria, issues are not retrieved.")
+@click.option('--format', 'output_format', default='json', type=click.Choice(['json', 'ndjson', 'csv', 'tsv']),
+              show_default=True,
+              help="Output format - a JSON array, newline delimited JSON (one issue per line, streamed) or a table "
+                   "(CSV or TSV) with columns stated in --fields.")
+@click.option('--list-delimiter', default=';', type=str, show_default=True,
+              help="Delimiter of list items (e.g. label names) in a CSV or TSV cell.")
+def cli_issues(organization=None, project=None, no_pretty=False, fields=None, raw=False, count=False,
+               output_format='json', list_delimiter=';', **issues_query):
     """List GitHub issues."""
-    if organization is None and project is None:
+    if organization is None and project is not None:
+        raise UserInputError("Organization has to be specified explicitly for project %r" % project)
+
+    issues_query['labels'] = issues_query['labels'].split(',') if issues_query['labels'] else None
+
+    if count:
+        for option in ('page', 'sort', 'direction', 'resume'):
+            issues_query.pop(option)
+
+        if organization is None:
+            issues_count = Issue.count_assigned_issues(**issues_query)
+        elif project is None:
+            issues_count = Issue.count_organization_issues(organization, **issues_query)
+        else:
+            issues_count = Issue.count_project_issues(organization, project, **issues_query)
+
+        click.echo(issues_count)
+        return
+
+    fields = fields.split(',') if fields else None
+    if output_format in ('csv', 'tsv'):
+        # Only columns of the table are parsed.
+        fields = fields or list(_ISSUE_COLUMNS)
+    issues_query['fields'] = fields
+    issues_query['raw'] = raw
+    if organization is None:
         reported_issues = Issue.list_assigned_issues(**issues_query)
-    elif organization is not None and project is None:
+    elif project is None:
         reported_issues = Issue.list_organization_issues(organization, **issues_query)
-    elif organization is not None and project is not None:
-        reported_issues = Issue.list_project_issues(organization, project, **issues_query)
     else:
-        raise UserInputError("Organization has to be specified explicitly for project %r" % project)
+        reported_issues = Issue.list_project_issues(organization, project, **issues_query)
 
-    print_command_result(list(map(lambda x: x.to_dict(), reported_issues)), not no_pretty)
+    # Stream issues as they are retrieved, there is no need to keep the whole listing in memory.
+    if output_format in ('csv', 'tsv'):
+        dump_csv(reported_issues, click.get_text_stream('stdout'), fields,
+                 delimiter=',' if output_format == 'csv' else '\t', list_delimiter=list_delimiter, flush_every=100)
+        return
+
+    if fields and not raw:
+        reported_issues = (issue.to_dict(fields) for issue in reported_issues)
+
+    if output_format == 'ndjson':
+        dump_ndjson(reported_issues, click.get_text_stream('stdout'))
+    else:
+        dump_json(reported_issues, click.get_text_stream('stdout'), pretty=not no_pretty)
+        click.echo()
 
 
 @click.command('issue')
@@ -70,10 +141,12 @@ def cli_issues(organization=None, project=None, no_pretty=False, **issues_query)
               help="GitHub project name.")
 @click.option('--number', '-n', type=int, metavar='ID', required=True,
               help="Issue number (issue identifier).")
-def cli_issue(no_pretty=False, organization=None, project=None, number=None):
+@click.option('--raw', is_flag=True,
+              help="Print issue as returned by GitHub API, without constructing issue object.")
+def cli_issue(no_pretty=False, organization=None, project=None, number=None, raw=False):
     """Retrieve a GitHub issue."""
-    issue = Issue.by_number(organization, project, number)
-    print_command_result(issue.to_dict(), not no_pretty)
+    issue = Issue.by_number(organization, project, number, raw=raw)
+    print_command_result(issue if raw else issue.to_dict(), not no_pretty)
 
 
 @click.command('issue-edit')
@@ -103,8 +176,7 @@ def cli_issue_edit(no_pretty=False, organization=None, project=None, number=None
     if all(val is None for val in issue_attributes.values()):
         raise UserInputError("No attributes to edit")
 
-    # TODO: edit by number
-    issue = Issue.edit(organization, project, number, issue_attributes)
+    issue = Issue.edit_by_number(organization, project, number, _get_issue_attributes(issue_attributes))
     print_command_result(issue.to_dict(), not no_pretty)
 
 
@@ -130,6 +202,64 @@ def cli_issue_edit(no_pretty=False, organization=None, project=None, number=None
               help="Filter issues based on issue state.")
 def cli_issue_create(no_pretty=False, organization=None, project=None, **issue_attributes):
     """Create a GitHub issue."""
-    issue = Issue.from_dict(**issue_attributes)
-    issue = issue.create(organization, project)
+    issue = Issue.create_by_attributes(organization, project, _get_issue_attributes(issue_attributes))
     print_command_result(issue.to_dict(), not no_pretty)
+
+
+@click.command('issue-batch')
+@click.pass_context
+@click.argument('operations', type=click.File('r'), default='-')
+@click.option('--organization', '-o', type=str, default=None, metavar='ORGANIZATION',
+              help="GitHub owner used for operations that do not state repository.")
+@click.option('--project', '-p', type=str, default=None, metavar='PROJECT_NAME',
+              help="GitHub project name used for operations that do not state repository.")
+@click.option('--jobs', '-j', type=click.IntRange(1, 64), default=4, show_default=True,
+              help="Maximum number of operations run concurrently.")
+@click.option('--delay', '-d', type=float, default=0.0, show_default=True, metavar='SECONDS',
+              help="Minimum delay between starting operations, GitHub recommends 1 second for creating content.")
+def cli_issue_batch(ctx, operations, organization=None, project=None, jobs=4, delay=0.0):
+    """Create and edit GitHub issues stated as newline delimited JSON in a file (standard input by default).
+
+    An operation with issue number edits the issue, otherwise an issue is created, e.g.:
+
+    \b
+        {"repository": "fridex/githubcap", "title": "Crash on start", "labels": ["bug"]}
+        {"repository": "fridex/githubcap", "number": 42, "state": "closed"}
+
+    A result (number and html_url of the issue or an error) is printed as a JSON line for each operation, in the
+    order of operations. Exit code is 1 if any of the operations failed.
+    """
+    if (organization is None) != (project is None):
+        raise UserInputError("Both organization and project have to be specified for the default repository")
+
+    repository = '{}/{}'.format(organization, project) if organization is not None else None
+    failed = []
+
+    def track_errors(results):
+        for result in results:
+            if 'error' in result:
+                failed.append(result['line'])
+            yield result
+
+    results = run_issue_batch(operations, repository=repository, max_workers=jobs, delay=delay)
+    dump_ndjson(track_errors(results), click.get_text_stream('stdout'))
+    if failed:
+        ctx.exit(1)
+
+
+def _get_issue_attributes(issue_attributes: dict) -> dict:
+    """Convert issue attributes supplied on command line to attributes sent to GitHub API."""
+    attributes = {}
+    for key, value in issue_attributes.items():
+        if value is None:
+            continue
+
+        if key in ('labels', 'assignees'):
+            value = value.split(',')
+        elif key == 'milestone':
+            value = int(value)
+        elif key == 'state':
+            value = value.value
+        attributes[key] = value
+
+    return attributes
@@ -0,0 +1,59 @@
+"""Implementation of CLI for mirroring repositories into a local directory."""
+
+import logging
+
+import click
+
+from githubcap.serialization import dump_ndjson
+from githubcap.storage import Mirror
+
+# pylint: disable=too-many-arguments
+
+_LOG = logging.getLogger(__name__)
+
+
+@click.command('mirror')
+@click.pass_context
+@click.option('--organization', '-o', type=str, required=True, metavar='ORGANIZATION',
+              help="GitHub owner - GitHub user name or organization name.")
+@click.option('--project', '-p', type=str, default=None, metavar='PROJECT_NAME',
+              help="GitHub project name, all repositories of the organization are mirrored if omitted.")
+@click.option('--directory', '-d', type=click.Path(file_okay=False), default='.', show_default=True,
+              help="Directory holding the snapshot.")
+@click.option('--labels', is_flag=True,
+              help="Mirror labels as well.")
+@click.option('--milestones', is_flag=True,
+              help="Mirror milestones as well.")
+@click.option('--comments', is_flag=True,
+              help="Mirror issue comments as well.")
+@click.option('--jobs', '-j', type=click.IntRange(1, 64), default=4, show_default=True,
+              help="Maximum number of repositories mirrored (and pages of a listing retrieved) at once.")
+def cli_mirror(ctx, organization, project=None, directory='.', labels=False, milestones=False, comments=False,
+               jobs=4):
+    """Keep a local directory snapshot of issues of a repository or all repositories of an organization.
+
+    Only issues (and comments) updated since the previous run are retrieved, listings are revalidated using
+    ETags, so repositories with no changes cost only requests GitHub does not count against rate limit. High-water
+    marks of repositories are kept in manifest.json in the snapshot directory.
+
+    A result (number of resources updated, requests made or an error) is printed as a JSON line for each
+    repository. Exit code is 1 if mirroring of any repository failed.
+    """
+    mirror = Mirror(directory, labels=labels, milestones=milestones, comments=comments, max_workers=jobs)
+    if project is not None:
+        results = mirror.mirror_repositories([(organization, project)])
+    else:
+        results = mirror.mirror_organization(organization)
+
+    failed = []
+
+    def track_errors(results):
+        for result in results:
+            if 'error' in result:
+                failed.append(result['repository'])
+            yield result
+
+    dump_ndjson(track_errors(results), click.get_text_stream('stdout'))
+    if failed:
+        _LOG.error("Failed to mirror %d repositories: %s", len(failed), ', '.join(failed))
+        ctx.exit(1)
@@ -0,0 +1,42 @@
+"""Implementation of CLI for watching repositories for issue changes."""
+
+import logging
+
+import click
+
+from githubcap.serialization import dump_ndjson
+from githubcap.watch import WATCHED_FIELDS
+from githubcap.watch import IssuePoller
+
+# pylint: disable=too-many-arguments
+
+_LOG = logging.getLogger(__name__)
+
+
+@click.command('watch')
+@click.argument('repositories', nargs=-1, required=True, metavar='OWNER/PROJECT...')
+@click.option('--interval', '-i', type=click.FloatRange(1, None), default=60.0, show_default=True,
+              metavar='SECONDS',
+              help="Minimum interval between polls of a repository, a longer one requested by GitHub is respected.")
+@click.option('--since', default=None, type=str,
+              help="Report issues updated at or after the given time, only changes made after start are reported "
+                   "if omitted.")
+@click.option('--fields', '-F', default=None, type=str, metavar="FIELD1,FIELD2,..",
+              help="Watched issue fields - a comma separated list out of: {}.".format(', '.join(WATCHED_FIELDS)))
+@click.option('--cycles', type=click.IntRange(1, None), default=None,
+              help="Exit after the given number of polling cycles, poll until interrupted if omitted.")
+@click.option('--jobs', '-j', type=click.IntRange(1, 64), default=8, show_default=True,
+              help="Maximum number of repositories polled at once.")
+def cli_watch(repositories, interval=60.0, since=None, fields=None, cycles=None, jobs=8):
+    """Poll repositories for created and changed issues, an event is printed as a JSON line for each of them.
+
+    Listings are revalidated using ETags, so polling of repositories with no changes does not consume rate limit.
+    Changed issues are reported with old and new values of changed fields, polling errors are reported as error
+    events and polling continues.
+    """
+    poller = IssuePoller(repositories, interval=interval, since=since, fields=fields.split(',') if fields else None,
+                         max_workers=jobs)
+    try:
+        dump_ndjson(poller.watch(cycles), click.get_text_stream('stdout'))
+    except KeyboardInterrupt:
+        _LOG.debug("Watching interrupted")
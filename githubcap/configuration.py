@@ -5,8 +5,6 @@ import logging
 import os
 import typing
 
-import yaml
-
 import attr
 
 from .exceptions import ConfigNotFound
@@ -27,6 +25,18 @@ _CONFIGURATION_FILE_HEADER = """# Configuration file for githubcap in YAML langu
 """
 
 
+def _load_yaml(stream: typing.IO) -> typing.Any:
+    """Parse YAML from stream, yaml is imported only when a configuration file is used."""
+    import yaml
+    return yaml.safe_load(stream)
+
+
+def _dump_yaml(value: typing.Any, stream: typing.IO) -> None:
+    """Write value as YAML to stream."""
+    import yaml
+    yaml.dump(value, stream)
+
+
 class ConfigurationDefaults:  # pylint: disable=too-few-public-methods
     """Default values for configuration."""
 
@@ -94,7 +104,7 @@ class _ConfigurationSingleton(object):
         config_file_path = config_file_path or ConfigurationDefaults.CONFIG_FILE_PATH
         try:
             with open(config_file_path) as config_file:
-                configuration = yaml.safe_load(config_file)
+                configuration = _load_yaml(config_file)
         except FileNotFoundError as exc:
             raise ConfigNotFound("No configuration present in {!s}".format(config_file_path)) from exc
         except Exception as exc:
@@ -129,7 +139,7 @@ class _ConfigurationSingleton(object):
 
         with open(file_path, 'w') as config_file:
             config_file.write(_CONFIGURATION_FILE_HEADER)
-            yaml.dump(self.to_dict(), config_file)
+            _dump_yaml(self.to_dict(), config_file)
             _LOG.info("Configuration file written to %r", file_path)
 
     @classmethod
@@ -0,0 +1,258 @@
+"""A resident githubcap process serving githubcap-cli commands forwarded by githubcap-client over a Unix socket.
+
+The daemon keeps modules, schemas and HTTP connections to GitHub API warm between commands. Commands are run one
+at a time in the daemon process - configuration, environment, working directory, standard streams and logging
+are switched to the ones of the client for the time the command is run and restored afterwards.
+"""
+
+import contextlib
+import copy
+import io
+import json
+import logging
+import os
+import signal
+import socket
+import sys
+import traceback
+import typing
+
+import click
+
+from .client import FRAME_EXIT
+from .client import FRAME_REQUEST
+from .client import FRAME_STDERR
+from .client import FRAME_STDIN
+from .client import FRAME_STDOUT
+from .client import ensure_private_directory
+from .client import get_fallback_socket_path
+from .client import get_peer_uid
+from .client import get_socket_path
+from .client import receive_frame
+from .client import send_frame
+from .commands import COMMANDS
+from .commands import load_command
+from .configuration import Configuration
+from .exceptions import UserInputError
+
+_LOG = logging.getLogger(__name__)
+_FORWARDED_ENVIRONMENT_PREFIX = 'GITHUB'
+
+
+class _FrameWriter(io.RawIOBase):
+    """A raw stream sending written data to the client as frames of the given type."""
+
+    def __init__(self, sock: socket.socket, frame_type: bytes):
+        """Initialize writer sending frames to the given socket."""
+        super().__init__()
+        self._sock = sock
+        self._frame_type = frame_type
+
+    def writable(self) -> bool:
+        """Check whether the stream is writable - it always is."""
+        return True
+
+    def write(self, data: bytes) -> int:
+        """Send data to the client."""
+        send_frame(self._sock, self._frame_type, bytes(data))
+        return len(data)
+
+
+class _FrameReader(io.RawIOBase):
+    """A raw stream reading standard input sent by the client in frames, an empty frame marks end of input."""
+
+    def __init__(self, stream: typing.BinaryIO, forwarded: bool):
+        """Initialize reader of frames from a socket stream; if input is not forwarded, it is empty."""
+        super().__init__()
+        self._stream = stream
+        self._pending = b''
+        self._eof = not forwarded
+
+    def readable(self) -> bool:
+        """Check whether the stream is readable - it always is."""
+        return True
+
+    def readinto(self, buffer: bytearray) -> int:
+        """Read data received from the client into buffer, wait for a frame if no data are pending."""
+        while not self._pending and not self._eof:
+            frame_type, payload = receive_frame(self._stream)
+            if frame_type != FRAME_STDIN or not payload:
+                self._eof = True
+            else:
+                self._pending = payload
+
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _uses_config_file(argv: typing.List[str]) -> bool:
+    """Check whether a configuration file is supplied in githubcap-cli options (options preceding command name)."""
+    for arg in argv:
+        if arg in ('-c', '--config') or arg.startswith('--config='):
+            return True
+        if arg in COMMANDS:
+            break
+
+    return False
+
+
+def _get_exit_code(code: typing.Union[int, str, None]) -> int:
+    """Get exit code out of SystemExit code, a message is printed to standard error."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+
+    sys.stderr.write("{!s}\n".format(code))
+    return 1
+
+
+@contextlib.contextmanager
+def _client_environment(request: dict):
+    """Switch environment, working directory, configuration and logging to the ones of a client request."""
+    saved_environment = {key: value for key, value in os.environ.items()
+                         if key.startswith(_FORWARDED_ENVIRONMENT_PREFIX)}
+    saved_cwd = os.getcwd()
+    saved_configuration = Configuration().instance
+    saved_excepthook = sys.excepthook
+    root_logger = logging.getLogger()
+    saved_handlers = list(root_logger.handlers)
+    saved_level = root_logger.level
+
+    try:
+        for key in saved_environment:
+            del os.environ[key]
+        os.environ.update(request.get('environment', {}))
+        os.chdir(request['cwd'])
+        # Each command starts with configuration the daemon was started with, a configuration file supplied
+        # explicitly is loaded on the command run.
+        Configuration._instance = None if _uses_config_file(request['argv']) else copy.deepcopy(saved_configuration)
+        yield
+    finally:
+        for key in [key for key in os.environ if key.startswith(_FORWARDED_ENVIRONMENT_PREFIX)]:
+            del os.environ[key]
+        os.environ.update(saved_environment)
+        os.chdir(saved_cwd)
+        Configuration._instance = saved_configuration
+        sys.excepthook = saved_excepthook
+        root_logger.handlers = saved_handlers
+        root_logger.setLevel(saved_level)
+
+
+class Daemon(object):
+    """Serve githubcap-cli commands forwarded by githubcap-client."""
+
+    def __init__(self, cli: click.Group, socket_path: str = None, idle_timeout: float = None):
+        """Initialize daemon.
+
+        :param cli: githubcap-cli command group commands are run in
+        :param socket_path: path to Unix socket the daemon listens on, see get_socket_path() for the default
+        :param idle_timeout: exit if no command was forwarded for the given number of seconds
+        """
+        self.cli = cli
+        self.socket_path = socket_path or get_socket_path()
+        self.idle_timeout = idle_timeout
+
+    def _bind(self) -> socket.socket:
+        """Create socket the daemon listens on, a stale socket file of a daemon no longer running is removed."""
+        if self.socket_path == get_fallback_socket_path():
+            # The temporary directory is shared with other users, the socket is placed in a private directory.
+            try:
+                ensure_private_directory(os.path.dirname(self.socket_path))
+            except PermissionError as exc:
+                raise UserInputError(str(exc)) from exc
+
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except ConnectionRefusedError:
+                _LOG.debug("Removing stale daemon socket %r", self.socket_path)
+                os.remove(self.socket_path)
+            else:
+                raise UserInputError("Daemon is already running on {!r}".format(self.socket_path))
+            finally:
+                probe.close()
+
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # The client forwards credentials in its environment, the socket is accessible only by the owner.
+        umask = os.umask(0o177)
+        try:
+            server.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+
+        server.listen(socket.SOMAXCONN)
+        server.settimeout(self.idle_timeout)
+        return server
+
+    def serve(self) -> None:
+        """Serve commands until terminated (or idle timeout exceeded)."""
+        # Warm up - import all command modules (and so resources and schemas) before the first command comes.
+        for command_name in COMMANDS:
+            load_command(command_name)
+
+        server = self._bind()
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        _LOG.info("Daemon listening on %r", self.socket_path)
+        try:
+            while True:
+                try:
+                    connection, _ = server.accept()
+                except socket.timeout:
+                    _LOG.info("No command forwarded in %s seconds, exiting", self.idle_timeout)
+                    break
+
+                with connection:
+                    peer_uid = get_peer_uid(connection)
+                    if peer_uid is not None and peer_uid != os.getuid():
+                        _LOG.warning("Rejecting connection of a client run by another user (uid %d)", peer_uid)
+                        continue
+                    connection.settimeout(None)
+                    self._handle(connection)
+        finally:
+            server.close()
+            os.remove(self.socket_path)
+
+    def _handle(self, connection: socket.socket) -> None:
+        """Handle a connection of a client - run the forwarded command and send its exit code."""
+        stream = connection.makefile('rb')
+        frame_type, payload = receive_frame(stream)
+        if frame_type != FRAME_REQUEST:
+            # E.g. a check whether a daemon is running on the socket.
+            _LOG.debug("Client closed connection without sending a command")
+            return
+
+        request = json.loads(payload.decode())
+        _LOG.debug("Running command %r", request['argv'])
+        stdin = io.TextIOWrapper(io.BufferedReader(_FrameReader(stream, request.get('stdin', False))))
+        stdout = io.TextIOWrapper(io.BufferedWriter(_FrameWriter(connection, FRAME_STDOUT)), line_buffering=True)
+        stderr = io.TextIOWrapper(io.BufferedWriter(_FrameWriter(connection, FRAME_STDERR)), line_buffering=True)
+
+        try:
+            exit_code = self._run(request, stdin, stdout, stderr)
+            stdout.flush()
+            stderr.flush()
+            send_frame(connection, FRAME_EXIT, str(exit_code).encode())
+        except OSError as exc:
+            _LOG.debug("Client disconnected: %s", str(exc))
+
+    def _run(self, request: dict, stdin: typing.TextIO, stdout: typing.TextIO, stderr: typing.TextIO) -> int:
+        """Run command of a request with redirected standard streams, return exit code of the command."""
+        saved_stdin = sys.stdin
+        sys.stdin = stdin
+        try:
+            with _client_environment(request), contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+                try:
+                    self.cli.main(args=request['argv'], prog_name='githubcap-cli')
+                except SystemExit as exc:
+                    return _get_exit_code(exc.code)
+                except Exception:  # pylint: disable=broad-except
+                    traceback.print_exc()
+                    return 1
+        finally:
+            sys.stdin = saved_stdin
+
+        return 0
@@ -34,3 +34,7 @@ class SchemaValidationError(GithubcapException):
 
 class UserInputError(GithubcapException):
     """Raised on wrong parameters supplied on user calls."""
+
+
+class MissingDependency(GithubcapException):
+    """Raised when an optional dependency required by the requested functionality is not installed."""
@@ -0,0 +1,238 @@
+"""Helpers for paginated listings."""
+
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+import heapq
+import json
+import logging
+import os
+import typing
+
+from .exceptions import UserInputError
+from .utils import last_pagination_page
+from .utils import next_pagination_page
+
+_LOG = logging.getLogger(__name__)
+
+
+class ListingCheckpoint(object):
+    """Position of a paginated listing persisted in a state file so an interrupted listing can be resumed."""
+
+    def __init__(self, path: str, uri: str, query_string: typing.Optional[str], per_page: int):
+        """Initialize checkpoint of listing of the given URI, query and page size stored in a state file."""
+        self.path = path
+        self.uri = uri
+        self.query_string = query_string or ''
+        self.per_page = per_page
+
+    def load(self) -> typing.Optional[dict]:
+        """Load checkpointed listing state, return None if there is no checkpoint to resume from."""
+        try:
+            with open(self.path) as state_file:
+                state = json.load(state_file)
+        except FileNotFoundError:
+            return None
+
+        if state.get('uri') != self.uri or state.get('query_string') != self.query_string:
+            raise UserInputError("State file {!r} checkpoints a different listing ({!s}?{!s}), cannot resume".format(
+                self.path, state.get('uri'), state.get('query_string')))
+
+        if state.get('per_page') != self.per_page:
+            raise UserInputError("State file {!r} checkpoints a listing with page size {!r}, not {!r}, cannot "
+                                 "resume".format(self.path, state.get('per_page'), self.per_page))
+
+        _LOG.debug("Resuming listing of %s from page %s (last completed page %s)",
+                   self.uri, state['page'], state['last_completed_page'])
+        return state
+
+    def save(self, page: int, last_completed_page: int, last_item: typing.Any) -> None:
+        """Atomically store listing position - the next page to be retrieved and the last item seen."""
+        state = {
+            'uri': self.uri,
+            'query_string': self.query_string,
+            'per_page': self.per_page,
+            'page': page,
+            'last_completed_page': last_completed_page,
+            'last_item': last_item,
+        }
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as state_file:
+            json.dump(state, state_file)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Remove checkpoint once the listing is done."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class PaginatedList(Sequence):
+    """A lazy random-access sequence of listing entries retrieved page by page.
+
+    Only pages needed for the requested index or slice are retrieved, retrieved pages are kept in a bounded LRU
+    cache. Length is computed only once requested (len(), negative index or slice) from the last page number
+    stated by the first page (rel="last" in Link header), so it costs retrieving the last page. The last page is
+    never evicted from cache, so list() - which asks for length to preallocate - retrieves each page once, as
+    iterating does. Entries can be added or removed remotely while pages are retrieved, so (as with any paginated
+    listing) entries on page boundaries can be seen twice or missed.
+
+    >>> from githubcap.classes import Issue
+    >>> issues = Issue.list_project_issues('fridex', 'githubcap')
+    >>> len(issues), issues[4321], issues[-50:]
+    """
+
+    DEFAULT_MAX_CACHED_PAGES = 16
+
+    def __init__(self, fetch_page: typing.Callable[[int, int], typing.Tuple[list, dict]], per_page: int,
+                 transform: typing.Callable[[typing.Any], typing.Any] = None, first_page: int = 1,
+                 paginate: bool = True, max_cached_pages: int = DEFAULT_MAX_CACHED_PAGES):
+        """Initialize a lazy listing.
+
+        :param fetch_page: a function retrieving the given page of the given size, it returns a tuple of entries
+                           and response headers
+        :param per_page: number of entries requested per page
+        :param transform: a function applied on each entry retrieved (e.g. constructing a resource object)
+        :param first_page: page the sequence starts on (pages are numbered from 1)
+        :param paginate: if False, the sequence consists only of the first page
+        :param max_cached_pages: maximum number of pages kept in memory
+        """
+        self._fetch_page = fetch_page
+        self.per_page = per_page
+        self._transform = transform
+        self.first_page = max(first_page, 1)
+        self.paginate = paginate
+        self.max_cached_pages = max(max_cached_pages, 1)
+        self._pages = OrderedDict()
+        self._next_pages = {}
+        self._length = None
+        # The last page number as stated by headers of the first page (None if there is no other page).
+        self._last_page = None
+        self._first_page_retrieved = False
+
+    def _get_page(self, page: int) -> list:
+        """Get entries of the given page, retrieve the page if it is not cached."""
+        entries = self._pages.get(page)
+        if entries is not None:
+            self._pages.move_to_end(page)
+            return entries
+
+        _LOG.debug("Retrieving page %d of paginated listing", page)
+        response, headers = self._fetch_page(page, self.per_page)
+        entries = [self._transform(entry) for entry in response] if self._transform else list(response)
+        self._next_pages[page] = next_pagination_page(headers) if self.paginate else None
+
+        if page == self.first_page and not self._first_page_retrieved:
+            # Length is computed only once requested, iteration does not need it.
+            self._last_page = last_pagination_page(headers) if self.paginate else None
+            self._first_page_retrieved = True
+
+        self._pages[page] = entries
+        if len(self._pages) > self.max_cached_pages:
+            if next(iter(self._pages)) == self._last_page:
+                # Retrieved for length, kept so iterating to the end does not retrieve it again.
+                self._pages.move_to_end(self._last_page)
+            self._pages.popitem(last=False)
+
+        return entries
+
+    def __len__(self) -> int:
+        """Get number of entries, at most the first and the last page are retrieved.
+
+        The number of pages is stated in headers of the first page (rel="last"), only the last page has to be
+        retrieved to count entries on it.
+        """
+        if self._length is None:
+            first_entries = self._get_page(self.first_page)
+            if self._last_page is None or self._last_page <= self.first_page:
+                self._length = len(first_entries)
+            else:
+                self._length = (self._last_page - self.first_page) * self.per_page + \
+                    len(self._get_page(self._last_page))
+        return self._length
+
+    def _get_entry(self, index: int) -> typing.Any:
+        """Get entry on the given non-negative index."""
+        page, offset = divmod(index, self.per_page)
+        entries = self._get_page(self.first_page + page)
+        if offset >= len(entries):
+            raise IndexError("Paginated listing index out of range")
+        return entries[offset]
+
+    def __getitem__(self, index: typing.Union[int, slice]) -> typing.Any:
+        """Get entry on the given index or a list of entries for a slice, only pages needed are retrieved."""
+        if isinstance(index, slice):
+            return [self._get_entry(item) for item in range(*index.indices(len(self)))]
+
+        if index < 0:
+            # Length is needed only to index from the end.
+            index += len(self)
+            if index < 0:
+                raise IndexError("Paginated listing index out of range")
+
+        return self._get_entry(index)
+
+    def __iter__(self) -> typing.Generator[typing.Any, None, None]:
+        """Iterate over entries page by page, length is not needed to be known upfront."""
+        page = self.first_page
+        while page is not None:
+            # Entries are referenced directly so the page can be evicted from cache during iteration.
+            yield from self._get_page(page)
+            page = self._next_pages.get(page)
+
+    def __reversed__(self) -> typing.Generator[typing.Any, None, None]:
+        """Iterate over entries from the last one, pages are retrieved from the last one."""
+        for index in range(len(self) - 1, -1, -1):
+            yield self._get_entry(index)
+
+    def __repr__(self) -> str:
+        """Get representation of the listing without retrieving any page."""
+        return '<{} of {} entries, {} pages cached>'.format(
+            self.__class__.__name__, self._length if self._length is not None else 'unknown', len(self._pages)
+        )
+
+
+class _PrefetchedListing(object):
+    """Entries of a listing retrieved in background, the next page is requested once the current one arrives."""
+
+    def __init__(self, executor: ThreadPoolExecutor,
+                 fetch_page: typing.Callable[[int], typing.Tuple[list, typing.Optional[int]]], first_page: int):
+        """Request the first page of the listing."""
+        self._executor = executor
+        self._fetch_page = fetch_page
+        self.future = executor.submit(fetch_page, first_page)
+
+    def __iter__(self) -> typing.Generator[typing.Any, None, None]:
+        """Iterate over entries, blocks only if the page needed was not retrieved yet."""
+        while self.future is not None:
+            entries, next_page = self.future.result()
+            self.future = self._executor.submit(self._fetch_page, next_page) if next_page is not None else None
+            yield from entries
+
+
+def merge_listings(fetchers: typing.Sequence[typing.Callable[[int], typing.Tuple[list, typing.Optional[int]]]],
+                   key: typing.Callable[[typing.Any], typing.Any], reverse: bool = False, first_page: int = 1,
+                   max_workers: int = 8) -> typing.Generator[typing.Any, None, None]:
+    """Lazily merge sorted paginated listings into a single sorted stream.
+
+    Pages of all listings are retrieved concurrently - the first page of each listing is requested right away and
+    the following page once the previous one arrives, so at most two pages per listing are held in memory. Pages
+    still pending are cancelled when the stream is closed (e.g. the consumer stops iterating).
+
+    :param fetchers: functions retrieving the given page of a listing, returning entries and the next page number
+    :param key: a function computing sort key of entries, each listing has to be sorted by the key
+    :param reverse: True if listings are sorted in descending order
+    :param first_page: page each listing starts on
+    :param max_workers: maximum number of pages retrieved at once
+    """
+    with ThreadPoolExecutor(max_workers=max(min(max_workers, len(fetchers)), 1)) as executor:
+        listings = [_PrefetchedListing(executor, fetch_page, first_page) for fetch_page in fetchers]
+        try:
+            yield from heapq.merge(*listings, key=key, reverse=reverse)
+        finally:
+            for listing in listings:
+                if listing.future is not None:
+                    listing.future.cancel()
@@ -0,0 +1,191 @@
+"""Per-phase profiling of githubcap calls - where the time goes when a command is slow.
+
+Time is accounted to phases - HTTP requests, rate limit sleeps, JSON parsing, schema validation, construction of
+resource objects and output serialization. Phases can nest (e.g. resources are retrieved while output is being
+streamed), time of a phase is exclusive - time spent in nested phases is accounted only to the nested phases.
+
+    >>> profile = Profile()
+    >>> with profile:
+    >>>     issues = [issue for issue in Issue.list_project_issues('fridex', 'githubcap')]
+    >>> print(profile.format_report())
+
+Phases are recorded only while a profile is active, otherwise recording is a no-op.
+"""
+
+import threading
+import time
+import typing
+
+PHASE_HTTP = 'http'
+PHASE_RATE_LIMIT = 'rate-limit'
+PHASE_JSON = 'json'
+PHASE_VALIDATION = 'validation'
+PHASE_CONSTRUCTION = 'construction'
+PHASE_OUTPUT = 'output'
+_PHASES = (PHASE_HTTP, PHASE_RATE_LIMIT, PHASE_JSON, PHASE_VALIDATION, PHASE_CONSTRUCTION, PHASE_OUTPUT)
+
+# Per-thread CPU time is available in Python 3.7+.
+_cpu_time = getattr(time, 'thread_time', time.process_time)
+
+# The profile being recorded, None if profiling is not active.
+_ACTIVE = None
+
+
+class _PhaseTimer(object):
+    """Time a phase, time spent in nested phases is subtracted."""
+
+    __slots__ = ('profile', 'name', 'stack', 'wall_start', 'cpu_start', 'nested_wall', 'nested_cpu')
+
+    def __init__(self, profile: 'Profile', name: str):
+        """Initialize timer of a phase recorded in the given profile."""
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self) -> '_PhaseTimer':
+        """Start timing the phase."""
+        self.stack = self.profile.get_stack()
+        self.stack.append(self)
+        self.nested_wall = self.nested_cpu = 0.0
+        self.wall_start = time.perf_counter()
+        self.cpu_start = _cpu_time()
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Stop timing the phase and record exclusive time spent in it."""
+        wall = time.perf_counter() - self.wall_start
+        cpu = _cpu_time() - self.cpu_start
+        self.stack.pop()
+        if self.stack:
+            parent = self.stack[-1]
+            parent.nested_wall += wall
+            parent.nested_cpu += cpu
+
+        self.profile.add_phase(self.name, wall - self.nested_wall, cpu - self.nested_cpu)
+
+
+class _NoPhaseTimer(object):
+    """A no-op phase timer used if profiling is not active."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoPhaseTimer':
+        """Do nothing, profiling is not active."""
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Do nothing, profiling is not active."""
+
+
+_NO_PHASE_TIMER = _NoPhaseTimer()
+
+
+def phase(name: str) -> typing.Union[_PhaseTimer, _NoPhaseTimer]:
+    """Get a context manager timing the given phase in the active profile."""
+    if _ACTIVE is None:
+        return _NO_PHASE_TIMER
+    return _PhaseTimer(_ACTIVE, name)
+
+
+def record_request(sent: int, received: int) -> None:
+    """Record an HTTP request and number of bytes sent and received in the active profile."""
+    if _ACTIVE is not None:
+        _ACTIVE.add_request(sent, received)
+
+
+def _format_size(size: int) -> str:
+    """Format number of bytes in a human readable form."""
+    for unit in ('B', 'KiB', 'MiB'):
+        if size < 1024:
+            return '{:.0f} {}'.format(size, unit) if unit == 'B' else '{:.1f} {}'.format(size, unit)
+        size /= 1024
+    return '{:.1f} GiB'.format(size)
+
+
+class Profile(object):
+    """Wall and CPU time per phase, HTTP requests and bytes transferred while the profile is active."""
+
+    def __init__(self):
+        """Initialize an empty profile."""
+        self._lock = threading.Lock()
+        self._threads = threading.local()
+        # Phase name -> [number of times the phase was entered, wall time, CPU time].
+        self.phases = {}
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self._wall_start = None
+        self._cpu_start = None
+
+    def get_stack(self) -> typing.List[_PhaseTimer]:
+        """Get stack of phases being timed in the current thread."""
+        stack = getattr(self._threads, 'stack', None)
+        if stack is None:
+            stack = self._threads.stack = []
+        return stack
+
+    def add_phase(self, name: str, wall: float, cpu: float) -> None:
+        """Account time spent in a phase."""
+        with self._lock:
+            entry = self.phases.get(name)
+            if entry is None:
+                entry = self.phases[name] = [0, 0.0, 0.0]
+            entry[0] += 1
+            entry[1] += wall
+            entry[2] += cpu
+
+    def add_request(self, sent: int, received: int) -> None:
+        """Account an HTTP request."""
+        with self._lock:
+            self.requests += 1
+            self.bytes_sent += sent
+            self.bytes_received += received
+
+    def start(self) -> None:
+        """Activate profile, phases are recorded until the profile is stopped."""
+        global _ACTIVE  # pylint: disable=global-statement
+        _ACTIVE = self
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    def stop(self) -> None:
+        """Deactivate profile."""
+        global _ACTIVE  # pylint: disable=global-statement
+        _ACTIVE = None
+        self.wall_time += time.perf_counter() - self._wall_start
+        self.cpu_time += time.process_time() - self._cpu_start
+
+    def __enter__(self) -> 'Profile':
+        """Activate profile for the context."""
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        """Deactivate profile."""
+        self.stop()
+
+    def format_report(self) -> str:
+        """Format a compact breakdown of recorded phases.
+
+        Time not spent in any phase (e.g. argument parsing, filtering) is reported as other. CPU time of the whole
+        profile is process CPU time, so it includes CPU time of all threads; phases run concurrently in threads
+        (e.g. merged listings) can sum up to more than the total.
+        """
+        lines = ["{:<14s} {:>8s} {:>11s} {:>10s}".format('phase', 'calls', 'wall [ms]', 'cpu [ms]')]
+        phases_wall = phases_cpu = 0.0
+        for name in _PHASES + tuple(sorted(set(self.phases) - set(_PHASES))):
+            if name not in self.phases:
+                continue
+            count, wall, cpu = self.phases[name]
+            phases_wall += wall
+            phases_cpu += cpu
+            lines.append("{:<14s} {:>8d} {:>11.1f} {:>10.1f}".format(name, count, wall * 1000, cpu * 1000))
+
+        lines.append("{:<14s} {:>8s} {:>11.1f} {:>10.1f}".format(
+            'other', '', max(self.wall_time - phases_wall, 0.0) * 1000, max(self.cpu_time - phases_cpu, 0.0) * 1000))
+        lines.append("{:<14s} {:>8s} {:>11.1f} {:>10.1f}".format(
+            'total', '', self.wall_time * 1000, self.cpu_time * 1000))
+        lines.append("requests: {:d}, sent {}, received {}".format(
+            self.requests, _format_size(self.bytes_sent), _format_size(self.bytes_received)))
+        return '\n'.join(lines)
@@ -0,0 +1,295 @@
+"""Streaming JSON and CSV serialization of resources without building intermediate dictionaries."""
+
+import csv
+from datetime import datetime
+import enum
+import io
+import json
+import typing
+
+from . import profiling
+from .base import GitHubBase
+from .utils import serialize_datetime
+
+try:
+    from json.encoder import c_encode_basestring_ascii as _encode_string
+except ImportError:  # pragma: no cover
+    from json.encoder import py_encode_basestring_ascii as _encode_string
+
+_INDENT = '  '
+# Separators of items and of keys and values.
+_PRETTY_SEPARATORS = (',', ': ')
+_COMPACT_SEPARATORS = (',', ':')
+# Encoded keys of resource attributes - computed once per resource class and output mode.
+_RESOURCE_KEYS = {}
+
+
+def _get_resource_keys(resource_class: type, pretty: bool) -> typing.Tuple[typing.Tuple[str, str], ...]:
+    """Get attribute names and their JSON encoded keys for the given resource class."""
+    keys = _RESOURCE_KEYS.get((resource_class, pretty))
+    if keys is None:
+        # pylint: disable=protected-access
+        names = [name for name, _ in resource_class._get_serializers()]
+        if pretty:
+            names.sort()
+        key_separator = _PRETTY_SEPARATORS[1] if pretty else _COMPACT_SEPARATORS[1]
+        keys = tuple((name, _encode_string(name) + key_separator) for name in names)
+        _RESOURCE_KEYS[(resource_class, pretty)] = keys
+
+    return keys
+
+
+def _encode_key(key: typing.Any) -> str:
+    """Encode a dictionary key the same way json module does."""
+    if isinstance(key, str):
+        return _encode_string(key)
+    elif key is True:
+        return '"true"'
+    elif key is False:
+        return '"false"'
+    elif key is None:
+        return '"null"'
+    elif isinstance(key, (int, float)):
+        return '"{}"'.format(json.dumps(key))
+
+    raise TypeError("keys must be str, int, float, bool or None, not {}".format(key.__class__.__name__))
+
+
+def _encode(value: typing.Any, parts: list, pretty: bool, level: int) -> None:
+    """Encode value to JSON, append encoded parts to the parts list."""
+    # pylint: disable=too-many-branches
+    value_class = value.__class__
+    if value is None:
+        parts.append('null')
+    elif value_class is str:
+        parts.append(_encode_string(value))
+    elif value is True:
+        parts.append('true')
+    elif value is False:
+        parts.append('false')
+    elif value_class is int:
+        parts.append(int.__repr__(value))
+    elif value_class is datetime:
+        parts.append('"' + serialize_datetime(value) + '"')
+    elif isinstance(value, GitHubBase):
+        _encode_items(
+            ((key, getattr(value, name)) for name, key in _get_resource_keys(value_class, pretty)),
+            parts, pretty, level, '{', '}'
+        )
+    elif isinstance(value, (list, tuple)):
+        _encode_items(((None, item) for item in value), parts, pretty, level, '[', ']')
+    elif isinstance(value, dict):
+        items = sorted(value.items()) if pretty else value.items()
+        key_separator = _PRETTY_SEPARATORS[1] if pretty else _COMPACT_SEPARATORS[1]
+        _encode_items(((_encode_key(key) + key_separator, item) for key, item in items), parts, pretty, level, '{', '}')
+    elif isinstance(value, enum.Enum):
+        _encode(value.value, parts, pretty, level)
+    elif isinstance(value, str):
+        parts.append(_encode_string(value))
+    elif isinstance(value, (int, float)):
+        parts.append(json.dumps(value))
+    else:
+        raise TypeError("Object of type {} is not JSON serializable".format(value_class.__name__))
+
+
+def _encode_items(items: typing.Iterable[typing.Tuple[typing.Optional[str], typing.Any]],
+                  parts: list, pretty: bool, level: int, opening: str, closing: str) -> None:
+    """Encode a JSON array or a JSON object, items are tuples of (encoded key or None, value)."""
+    if pretty:
+        separator = ',\n' + _INDENT * (level + 1)
+        parts.append(opening + '\n' + _INDENT * (level + 1))
+    else:
+        separator = _COMPACT_SEPARATORS[0]
+        parts.append(opening)
+
+    empty_length = len(parts)
+    first = True
+    for key, item in items:
+        if not first:
+            parts.append(separator)
+        first = False
+
+        if key is not None:
+            parts.append(key)
+        _encode(item, parts, pretty, level + 1)
+
+    if first:
+        # Nothing was added, empty structures are encoded without whitespaces.
+        parts[empty_length - 1] = opening + closing
+        return
+
+    if pretty:
+        parts.append('\n' + _INDENT * level + closing)
+    else:
+        parts.append(closing)
+
+
+def to_json(value: typing.Any, pretty: bool = True) -> str:
+    """Serialize a resource (or any JSON serializable value containing resources) to JSON.
+
+    The output is the same as when serializing result of to_dict() using dict2json(), but no intermediate
+    dictionaries are created. Compact output has no whitespaces between items, keys and values.
+    """
+    parts = []
+    _encode(value, parts, pretty, 0)
+    return ''.join(parts)
+
+
+def _get_text_writer(stream: typing.IO, encoding: str = 'ascii') -> typing.Callable[[str], typing.Any]:
+    """Get a function writing text to the given text or binary stream, binary streams get encoded text."""
+    if isinstance(stream, io.TextIOBase):
+        return stream.write
+
+    if isinstance(stream, (io.RawIOBase, io.BufferedIOBase)) or 'b' in getattr(stream, 'mode', ''):
+        # JSON output is always ASCII as non-ASCII characters are escaped.
+        return lambda text: stream.write(text.encode(encoding))
+
+    return stream.write
+
+
+def dump_json(value: typing.Any, stream: typing.IO, pretty: bool = True) -> None:
+    """Serialize a resource or an iterable of resources to JSON directly to a text or binary stream.
+
+    Iterables (such as generators returned by listings) are written as a JSON array item by item, so the whole
+    listing is never held in memory.
+
+    >>> from githubcap.classes import Issue
+    >>> dump_json(Issue.list_project_issues('fridex', 'githubcap'), sys.stdout)
+    """
+    write = _get_text_writer(stream)
+
+    if isinstance(value, (GitHubBase, dict, str)) or not hasattr(value, '__iter__'):
+        with profiling.phase(profiling.PHASE_OUTPUT):
+            write(to_json(value, pretty))
+        return
+
+    first = True
+    # Items are retrieved while iterating, only their serialization is accounted as output.
+    for item in value:
+        with profiling.phase(profiling.PHASE_OUTPUT):
+            parts = ['[\n' + _INDENT if pretty else '['] if first else [',\n' + _INDENT if pretty else ',']
+            first = False
+            _encode(item, parts, pretty, 1 if pretty else 0)
+            write(''.join(parts))
+
+    if first:
+        write('[]')
+    else:
+        write('\n]' if pretty else ']')
+
+
+def dump_ndjson(values: typing.Iterable[typing.Any], stream: typing.IO, flush_every: int = 1) -> int:
+    """Serialize values (e.g. resources from a listing) to newline delimited JSON - one compact JSON per line.
+
+    Each value is written as soon as it is available and the stream is flushed regularly, so consumers (such as jq)
+    can process values while the listing is still being retrieved.
+
+    :param values: values to be serialized
+    :param stream: a text or binary stream to write to
+    :param flush_every: flush stream after the given number of values
+    :return: number of values written
+    """
+    write = _get_text_writer(stream)
+    flush = getattr(stream, 'flush', None)
+
+    count = 0
+    for value in values:
+        with profiling.phase(profiling.PHASE_OUTPUT):
+            parts = []
+            _encode(value, parts, False, 0)
+            parts.append('\n')
+            write(''.join(parts))
+            count += 1
+            if flush and count % flush_every == 0:
+                flush()
+
+    if flush:
+        flush()
+
+    return count
+
+
+class _TextWriter(object):
+    """A file-like object writing text using the given function, as required by csv module."""
+
+    __slots__ = ('write',)
+
+    def __init__(self, write: typing.Callable[[str], typing.Any]):
+        """Initialize writer."""
+        self.write = write
+
+
+def _get_column_value(value: typing.Any, path: typing.Tuple[str, ...]) -> typing.Any:
+    """Get value of a column (a path of attribute names) of a resource or its dictionary representation.
+
+    Paths are followed through lists, e.g. 'labels.name' gives a list of label names.
+    """
+    for position, name in enumerate(path):
+        if value is None:
+            return None
+        if isinstance(value, list):
+            return [_get_column_value(item, path[position:]) for item in value]
+        value = value.get(name) if isinstance(value, dict) else getattr(value, name, None)
+
+    return value
+
+
+def _format_cell(value: typing.Any, list_delimiter: str) -> str:
+    """Format a column value as a table cell, lists are joined using the delimiter, nested resources are JSON."""
+    if value is None:
+        return ''
+    if value.__class__ is str:
+        return value
+    if value is True or value is False:
+        return 'true' if value else 'false'
+    if isinstance(value, datetime):
+        return serialize_datetime(value)
+    if isinstance(value, enum.Enum):
+        return str(value.value)
+    if isinstance(value, list):
+        return list_delimiter.join(_format_cell(item, list_delimiter) for item in value if item is not None)
+    if isinstance(value, (GitHubBase, dict)):
+        return to_json(value, pretty=False)
+    return str(value)
+
+
+def dump_csv(values: typing.Iterable[typing.Any], stream: typing.IO, columns: typing.Sequence[str],
+             delimiter: str = ',', list_delimiter: str = ';', header: bool = True, flush_every: int = 1) -> int:
+    """Write values (e.g. resources from a listing) as CSV rows with the given columns, one row per value.
+
+    Rows are written as values come, so a listing is never held in memory. Columns are attribute names, nested
+    attributes are delimited by a dot (e.g. 'user.login' or 'milestone.title'); lists are flattened by joining their
+    items (e.g. 'labels.name' gives label names joined by list delimiter).
+
+    >>> from githubcap.classes import Issue
+    >>> dump_csv(Issue.list_project_issues('fridex', 'githubcap'), sys.stdout, ['number', 'title', 'labels.name'])
+
+    :param values: resources or their dictionary representations
+    :param stream: a text or binary stream to write to, binary streams get UTF-8 encoded output
+    :param columns: columns to be written
+    :param delimiter: field delimiter, use '\\t' for TSV
+    :param list_delimiter: delimiter of list items in a cell
+    :param header: write a header row with column names
+    :param flush_every: flush stream after the given number of rows
+    :return: number of rows written, the header row is not counted
+    """
+    writer = csv.writer(_TextWriter(_get_text_writer(stream, 'utf-8')), delimiter=delimiter,
+                        lineterminator='\n')
+    flush = getattr(stream, 'flush', None)
+    paths = [tuple(column.split('.')) for column in columns]
+
+    if header:
+        writer.writerow(columns)
+
+    count = 0
+    for value in values:
+        with profiling.phase(profiling.PHASE_OUTPUT):
+            writer.writerow([_format_cell(_get_column_value(value, path), list_delimiter) for path in paths])
+            count += 1
+            if flush and count % flush_every == 0:
+                flush()
+
+    if flush:
+        flush()
+
+    return count
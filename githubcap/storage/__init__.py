@@ -0,0 +1,8 @@
+"""Local storage of resources retrieved from GitHub API v3."""
+
+from .fulltext import IssueIndex
+from .mirror import Mirror
+from .ndjson import ResourceLogReader
+from .ndjson import ResourceLogWriter
+from .sqlite import IssueStore
+from .sync import IssueSync
@@ -0,0 +1,338 @@
+"""A local full-text inverted index over issue titles, bodies and comments.
+
+Query syntax:
+
+    bug crash          issues containing both words (AND is implicit)
+    bug OR crash       issues containing any of the words (OR binds tighter than AND)
+    "null pointer"     issues containing the phrase
+    -wontfix           issues not containing the word (NOT wontfix works as well)
+
+Results are ranked using BM25, matches in titles weigh more than matches in bodies and comments.
+"""
+
+import bisect
+import heapq
+import json
+import logging
+import math
+import re
+import typing
+
+import githubcap.enums as enums
+from githubcap.base import GitHubBase
+from githubcap.exceptions import UserInputError
+from githubcap.utils import serialize_datetime
+
+from .sqlite import IssueStore
+
+_LOG = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+_QUERY_RE = re.compile(r'(-?)"([^"]*)"|(\S+)', re.UNICODE)
+# Positions of sections (title, body and comments) are separated by a gap so phrases never span sections.
+_SECTION_GAP = 1 << 20
+_TITLE = 'title'
+_BODY = 'body'
+_TITLE_BOOST = 3
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+
+
+def tokenize(text: typing.Optional[str]) -> typing.List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def _get_text(item: typing.Union[GitHubBase, dict, str, None], attribute: str) -> typing.Optional[str]:
+    """Get text attribute of a resource given as an object or as a dict, strings are taken as they are."""
+    if item is None or isinstance(item, str):
+        return item
+    if isinstance(item, dict):
+        return item.get(attribute)
+    return getattr(item, attribute)
+
+
+class _Clause(object):
+    """A query clause - alternatives (terms or phrases, each a tuple of tokens) out of which at least one matches."""
+
+    __slots__ = ('alternatives', 'negated')
+
+    def __init__(self, negated: bool):
+        """Initialize an empty clause."""
+        self.alternatives = []
+        self.negated = negated
+
+
+class IssueIndex(object):
+    """An in-memory inverted index of issues of a repository, documents are keyed by issue numbers.
+
+    Each issue is indexed in sections - title, body and individual comments (keyed by comment id), so an issue
+    can be updated incrementally (e.g. just its title and body when it was synced) without losing its comments.
+
+    >>> index = IssueIndex('fridex/githubcap')
+    >>> with IssueStore('issues.sqlite3') as store:
+    >>>     index.update_from_store(store)
+    >>> index.search('"rate limit" -wontfix', limit=10)
+    """
+
+    def __init__(self, repository: str):
+        """Initialize an empty index of issues of the given repository (owner/name).
+
+        Documents are keyed by issue numbers, so an index holds issues of a single repository.
+        """
+        if not isinstance(repository, str) or repository.count('/') != 1:
+            raise UserInputError("Repository has to be stated as owner/name, got {!r}".format(repository))
+
+        self.repository = repository
+        # The most recent issue update time (ISO-8601) seen, used for incremental updates from a store.
+        self.high_water_mark = None
+        # term -> {number -> [positions]}
+        self._postings = {}
+        # number -> {section -> tokens}
+        self._sections = {}
+        # number -> number of tokens
+        self._lengths = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        """Get number of issues indexed."""
+        return len(self._sections)
+
+    def __contains__(self, number: int) -> bool:
+        """Check whether an issue is indexed."""
+        return number in self._sections
+
+    def _unindex(self, number: int) -> None:
+        """Remove postings of an issue."""
+        sections = self._sections.get(number)
+        if not sections:
+            return
+
+        for tokens in sections.values():
+            for token in tokens:
+                postings = self._postings.get(token)
+                if postings is not None and postings.pop(number, None) is not None and not postings:
+                    del self._postings[token]
+
+        self._total_length -= self._lengths.pop(number)
+
+    def _index(self, number: int) -> None:
+        """Add postings of an issue based on its sections."""
+        sections = self._sections[number]
+        comments = sorted(section for section in sections if section not in (_TITLE, _BODY))
+        length = 0
+        for order, section in enumerate([_TITLE, _BODY] + comments):
+            start = order * _SECTION_GAP
+            for position, token in enumerate(sections.get(section, ()), start):
+                self._postings.setdefault(token, {}).setdefault(number, []).append(position)
+                length += 1
+
+        self._lengths[number] = length
+        self._total_length += length
+
+    def _update_sections(self, number: int, sections: dict) -> None:
+        """Replace the given sections of an issue and reindex it."""
+        self._unindex(number)
+        self._sections.setdefault(number, {}).update(sections)
+        self._index(number)
+
+    def add(self, issue: typing.Union[GitHubBase, dict],
+            comments: typing.Iterable[typing.Union[GitHubBase, dict]] = None) -> None:
+        """Index an issue (an issue object or its dict representation), an already indexed issue is reindexed.
+
+        :param issue: issue to be indexed
+        :param comments: all comments of the issue; if not given, comments indexed previously are kept
+        """
+        if isinstance(issue, dict):
+            number = issue['number']
+            updated_at = issue.get('updated_at')
+        else:
+            number = issue.number
+            updated_at = serialize_datetime(issue.updated_at) if issue.updated_at else None
+
+        if comments is not None:
+            self.remove(number)
+
+        self._update_sections(number, {
+            _TITLE: tokenize(_get_text(issue, 'title')),
+            _BODY: tokenize(_get_text(issue, 'body')),
+        })
+
+        if comments is not None:
+            self.add_comments(number, comments)
+
+        if updated_at and (self.high_water_mark is None or updated_at > self.high_water_mark):
+            self.high_water_mark = updated_at
+
+    def add_comments(self, number: int, comments: typing.Iterable[typing.Union[GitHubBase, dict]]) -> None:
+        """Index (or reindex edited) comments of an issue, comments are objects or dicts with 'id' and 'body'."""
+        sections = {}
+        for comment in comments:
+            comment_id = comment['id'] if isinstance(comment, dict) else comment.id
+            sections[comment_id] = tokenize(_get_text(comment, 'body'))
+
+        if sections:
+            self._update_sections(number, sections)
+
+    def remove(self, number: int) -> None:
+        """Remove an issue from the index."""
+        self._unindex(number)
+        self._sections.pop(number, None)
+
+    def update_from_store(self, store: IssueStore) -> int:
+        """Index issues updated in the store since the last update (all issues on the first update).
+
+        :param store: issue store, typically kept up to date using IssueSync
+        :return: number of issues indexed
+        """
+        count = 0
+        for issue in store.query(repository=self.repository, updated_since=self.high_water_mark,
+                                 sort=enums.Sorting.UPDATED, direction=enums.SortingDirection.ASC, raw=True):
+            self.add(issue)
+            count += 1
+
+        _LOG.debug("Indexed %d issues updated since %s", count, self.high_water_mark)
+        return count
+
+    @staticmethod
+    def _parse_query(query: str) -> typing.List[_Clause]:
+        """Parse query into clauses, see module documentation for query syntax."""
+        clauses = []
+        alternative = False
+        negate_next = False
+        for match in _QUERY_RE.finditer(query):
+            phrase_negated, phrase, word = match.groups()
+            if word == 'OR':
+                alternative = True
+                continue
+            if word == 'NOT':
+                negate_next = True
+                continue
+
+            if word is not None:
+                negated = word.startswith('-') and len(word) > 1
+                tokens = tuple(tokenize(word[1:] if negated else word))
+            else:
+                negated = bool(phrase_negated)
+                tokens = tuple(tokenize(phrase))
+
+            negated = negated or negate_next
+            if tokens:
+                if alternative and clauses and not clauses[-1].negated and not negated:
+                    clauses[-1].alternatives.append(tokens)
+                else:
+                    clause = _Clause(negated)
+                    clause.alternatives.append(tokens)
+                    clauses.append(clause)
+
+            alternative = False
+            negate_next = False
+
+        return clauses
+
+    def _match(self, tokens: typing.Tuple[str, ...]) -> typing.Set[int]:
+        """Get numbers of issues containing the given term or phrase (a tuple of tokens)."""
+        postings = [self._postings.get(token) for token in tokens]
+        if not all(postings):
+            return set()
+
+        numbers = set(min(postings, key=len))
+        if len(tokens) == 1:
+            return numbers
+
+        matched = set()
+        for number in numbers.intersection(*postings):
+            following = [set(term_postings[number]) for term_postings in postings[1:]]
+            for position in postings[0][number]:
+                if all(position + offset in positions for offset, positions in enumerate(following, 1)):
+                    matched.add(number)
+                    break
+
+        return matched
+
+    def _score(self, numbers: typing.Iterable[int], tokens: typing.Iterable[str]) -> typing.Dict[int, float]:
+        """Compute BM25 scores of issues for the given query tokens."""
+        document_count = len(self._sections)
+        average_length = (self._total_length or 1) / document_count
+        scores = dict.fromkeys(numbers, 0.0)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+
+            idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for number in scores:
+                positions = postings.get(number)
+                if positions is None:
+                    continue
+
+                # Positions are sorted, title positions come first.
+                frequency = len(positions) + (_TITLE_BOOST - 1) * bisect.bisect_left(positions, _SECTION_GAP)
+                length_norm = 1 - _BM25_B + _BM25_B * self._lengths[number] / average_length
+                scores[number] += idf * frequency * (_BM25_K1 + 1) / (frequency + _BM25_K1 * length_norm)
+
+        return scores
+
+    def search(self, query: str, limit: int = None,
+               scores: bool = False) -> typing.List[typing.Union[int, typing.Tuple[int, float]]]:
+        """Search indexed issues.
+
+        :param query: query, see module documentation for query syntax
+        :param limit: maximum number of results returned
+        :param scores: return tuples of issue number and its score instead of issue numbers
+        :return: numbers of issues matching the query, the best matching issues first
+        """
+        clauses = self._parse_query(query)
+        if not clauses:
+            raise UserInputError("Query {!r} contains no words to search for".format(query))
+
+        if not self._sections:
+            return []
+
+        positive = []
+        excluded = set()
+        for clause in clauses:
+            matched = set().union(*(self._match(tokens) for tokens in clause.alternatives))
+            if clause.negated:
+                excluded |= matched
+            else:
+                positive.append(matched)
+
+        if positive:
+            positive.sort(key=len)
+            numbers = positive[0].intersection(*positive[1:])
+        else:
+            numbers = set(self._sections)
+        numbers -= excluded
+
+        tokens = {token for clause in clauses if not clause.negated
+                  for alternative in clause.alternatives for token in alternative}
+        ranked = ((score, number) for number, score in self._score(numbers, tokens).items())
+        ranked = heapq.nlargest(limit, ranked) if limit is not None else sorted(ranked, reverse=True)
+        return [(number, score) if scores else number for score, number in ranked]
+
+    def save(self, path: str) -> None:
+        """Store index to a file, only indexed tokens are stored so the index is rebuilt on load."""
+        with open(path, 'w') as index_file:
+            json.dump({
+                'repository': self.repository,
+                'high_water_mark': self.high_water_mark,
+                'issues': [
+                    [number, [[section, tokens] for section, tokens in sections.items()]]
+                    for number, sections in self._sections.items()
+                ]
+            }, index_file)
+
+    @classmethod
+    def load(cls, path: str) -> 'IssueIndex':
+        """Load index stored using save()."""
+        with open(path) as index_file:
+            content = json.load(index_file)
+
+        index = cls(content['repository'])
+        index.high_water_mark = content['high_water_mark']
+        for number, sections in content['issues']:
+            index._sections[number] = {section: tokens for section, tokens in sections}
+            index._index(number)
+
+        return index
@@ -0,0 +1,260 @@
+"""A local directory snapshot of issues (and optionally labels, milestones and comments) of GitHub repositories.
+
+The snapshot directory has the following layout:
+
+    manifest.json                      - high-water marks and ETags of listings per repository
+    <owner>/<repo>/issues.ndjson       - issues appended as they are updated, the latest version of an issue wins
+    <owner>/<repo>/comments.ndjson     - issue comments appended as they are updated
+    <owner>/<repo>/labels.json         - all labels of the repository
+    <owner>/<repo>/milestones.json     - all milestones of the repository
+
+NDJSON logs are indexed (see ResourceLogReader) - issues by number, comments by id. Issues and comments are
+retrieved incrementally - only the ones updated since the high-water mark of the previous run. Each listing page
+is revalidated using its ETag, so a repository with no changes costs only requests that were not modified, which
+GitHub does not count against rate limit. The manifest is updated atomically once data of a repository are written,
+an interrupted run is simply started over.
+
+    >>> mirror = Mirror('snapshot', comments=True)
+    >>> for result in mirror.mirror_organization('fridex'):
+    >>>     print(result)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import json
+import logging
+import os
+import threading
+import typing
+
+import requests
+
+from githubcap.classes import Issue
+from githubcap.classes import IssueComment
+from githubcap.classes import Label
+from githubcap.classes import Milestone
+from githubcap.classes import Repository
+from githubcap.exceptions import GithubcapException
+from githubcap.exceptions import HTTPError
+from githubcap.exceptions import UserInputError
+
+from .ndjson import ResourceLogWriter
+
+_LOG = logging.getLogger(__name__)
+
+# Pages are revalidated by their ETags, so each listing has to be retrieved with the same page size on each run.
+_PER_PAGE = 100
+_MANIFEST_VERSION = 1
+
+
+def _write_json(path: str, content: typing.Any) -> None:
+    """Atomically write JSON to a file - readers see either the previous or the new content."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as output_file:
+        json.dump(content, output_file, sort_keys=True, indent=2)
+        output_file.flush()
+        os.fsync(output_file.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str, default: typing.Any = None) -> typing.Any:
+    """Read JSON from a file, return default if the file does not exist."""
+    try:
+        with open(path) as input_file:
+            return json.load(input_file)
+    except FileNotFoundError:
+        return default
+
+
+def _merge_pages(pages: typing.List[typing.Optional[list]], previous: typing.List[typing.Any]) -> list:
+    """Merge retrieved listing pages, content of pages that were not modified is taken from the previous listing."""
+    entries = []
+    for index, page in enumerate(pages):
+        entries.extend(previous[index * _PER_PAGE:(index + 1) * _PER_PAGE] if page is None else page)
+    return entries
+
+
+class Mirror(object):
+    """Keep a local directory snapshot of repositories up to date."""
+
+    MANIFEST_FILE = 'manifest.json'
+
+    def __init__(self, directory: str, labels: bool = False, milestones: bool = False, comments: bool = False,
+                 max_workers: int = 4):
+        """Initialize mirror into the given directory, the directory is created if it does not exist.
+
+        :param labels: mirror labels of repositories
+        :param milestones: mirror milestones of repositories
+        :param comments: mirror issue comments of repositories
+        :param max_workers: maximum number of repositories mirrored at once and maximum number of requests in flight
+                            (pages of listings of all repositories mirrored at once are retrieved concurrently)
+        """
+        self.directory = directory
+        self.labels = labels
+        self.milestones = milestones
+        self.comments = comments
+        self.max_workers = max_workers
+        # Shared by all listings, so concurrent repositories do not multiply concurrent requests.
+        self._request_slots = threading.BoundedSemaphore(max_workers)
+
+        os.makedirs(directory, exist_ok=True)
+        self.manifest = _read_json(self.manifest_path, {'version': _MANIFEST_VERSION})
+        if self.manifest.get('version') != _MANIFEST_VERSION:
+            raise UserInputError("Unsupported manifest version {!r} in {!r}".format(
+                self.manifest.get('version'), self.manifest_path))
+        self.manifest.setdefault('organizations', {})
+        self.manifest.setdefault('repositories', {})
+
+    @property
+    def manifest_path(self) -> str:
+        """Path to the manifest of the snapshot."""
+        return os.path.join(self.directory, self.MANIFEST_FILE)
+
+    def get_repository_directory(self, organization: str, project: str) -> str:
+        """Get directory holding snapshot of a repository."""
+        return os.path.join(self.directory, organization, project)
+
+    def list_organization_repositories(self, organization: str) -> typing.List[str]:
+        """List names of repositories of an organization, the listing is revalidated against the previous run."""
+        state = self.manifest['organizations'].get(organization, {})
+        # pylint: disable=protected-access
+        pages, etags = Repository._do_conditional_listing(
+            '/orgs/{!s}/repos'.format(organization), 'type=all', state.get('etags'),
+            per_page=_PER_PAGE, max_workers=self.max_workers, request_slots=self._request_slots
+        )
+        repositories = _merge_pages(
+            [None if page is None else [entry['name'] for entry in page] for page in pages],
+            state.get('repositories', [])
+        )
+        self.manifest['organizations'][organization] = {'etags': etags, 'repositories': repositories}
+        _write_json(self.manifest_path, self.manifest)
+        return repositories
+
+    def _mirror_updated(self, resource_class: type, uri: str, query_string: str, state: dict, path: str,
+                        key: str) -> typing.Tuple[dict, dict]:
+        """Append resources updated since the high-water mark to an NDJSON log.
+
+        :return: new state of the listing and statistics
+        """
+        if not os.path.isfile(path):
+            # The log was removed, start over.
+            state = {}
+
+        high_water_mark = state.get('high_water_mark')
+        if high_water_mark:
+            # Resources updated exactly at the high-water mark are listed again, none is missed.
+            query_string += '&since={!s}'.format(high_water_mark)
+
+        # ETags are valid only for the very same listing.
+        etags = state.get('etags') if state.get('query_string') == query_string else None
+        # pylint: disable=protected-access
+        pages, etags = resource_class._do_conditional_listing(uri, query_string, etags, per_page=_PER_PAGE,
+                                                              max_workers=self.max_workers,
+                                                              request_slots=self._request_slots)
+        entries = [entry for page in pages if page is not None for entry in page]
+        if entries:
+            with ResourceLogWriter(path, key) as log:
+                log.extend(entries)
+            high_water_mark = max([entry['updated_at'] for entry in entries] + [high_water_mark or ''])
+
+        new_state = {'high_water_mark': high_water_mark, 'query_string': query_string, 'etags': etags}
+        stats = {'updated': len(entries), 'requests': len(pages), 'not_modified': pages.count(None)}
+        return new_state, stats
+
+    def _mirror_all(self, resource_class: type, uri: str, query_string: str, state: dict,
+                    path: str) -> typing.Tuple[dict, dict]:
+        """Write all resources of a listing to a JSON file, the file is rewritten only if the listing changed.
+
+        :return: new state of the listing and statistics
+        """
+        etags = state.get('etags') if os.path.isfile(path) else None
+        # pylint: disable=protected-access
+        pages, etags = resource_class._do_conditional_listing(uri, query_string, etags, per_page=_PER_PAGE,
+                                                              max_workers=self.max_workers,
+                                                              request_slots=self._request_slots)
+        modified = any(page is not None for page in pages)
+        count = None
+        if modified:
+            entries = _merge_pages(pages, _read_json(path, []) if None in pages else [])
+            _write_json(path, entries)
+            count = len(entries)
+
+        stats = {'modified': modified, 'requests': len(pages), 'not_modified': pages.count(None)}
+        if count is not None:
+            stats['count'] = count
+        return {'etags': etags}, stats
+
+    def _mirror_repository(self, organization: str, project: str, state: dict) -> typing.Tuple[dict, dict]:
+        """Mirror a repository given its state from the manifest, return its new state and statistics."""
+        directory = self.get_repository_directory(organization, project)
+        os.makedirs(directory, exist_ok=True)
+        uri = '/repos/{!s}/{!s}'.format(organization, project)
+
+        new_state = {}
+        stats = {}
+        new_state['issues'], stats['issues'] = self._mirror_updated(
+            Issue, uri + '/issues', 'state=all&sort=updated&direction=desc', state.get('issues', {}),
+            os.path.join(directory, 'issues.ndjson'), 'number'
+        )
+        if self.comments:
+            new_state['comments'], stats['comments'] = self._mirror_updated(
+                IssueComment, uri + '/issues/comments', 'sort=updated&direction=desc', state.get('comments', {}),
+                os.path.join(directory, 'comments.ndjson'), 'id'
+            )
+        if self.labels:
+            new_state['labels'], stats['labels'] = self._mirror_all(
+                Label, uri + '/labels', '', state.get('labels', {}),
+                os.path.join(directory, 'labels.json')
+            )
+        if self.milestones:
+            new_state['milestones'], stats['milestones'] = self._mirror_all(
+                Milestone, uri + '/milestones', 'state=all', state.get('milestones', {}),
+                os.path.join(directory, 'milestones.json')
+            )
+
+        return new_state, stats
+
+    def mirror_repositories(self, repositories: typing.Iterable[typing.Tuple[str, str]]) -> \
+            typing.Generator[dict, None, None]:
+        """Mirror repositories concurrently, a result is yielded for each repository once it is mirrored.
+
+        Errors of a repository are reported in its result, other repositories are mirrored regardless.
+
+        :param repositories: repositories given by owner and name
+        :return: a generator of results - repository, statistics per listing or an error
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for organization, project in repositories:
+                full_name = '{!s}/{!s}'.format(organization, project)
+                # Each repository is handed a copy of its state, the manifest is manipulated only in this thread.
+                state = dict(self.manifest['repositories'].get(full_name, {}))
+                futures.append((full_name, executor.submit(self._mirror_repository, organization, project, state)))
+
+            for full_name, future in futures:
+                try:
+                    new_state, stats = future.result()
+                except (GithubcapException, requests.RequestException) as exc:
+                    _LOG.debug("Failed to mirror repository %s: %s", full_name, str(exc))
+                    result = {'repository': full_name, 'error': str(exc)}
+                    if isinstance(exc, HTTPError):
+                        result['status_code'] = exc.status_code
+                    yield result
+                    continue
+
+                new_state['synced_at'] = datetime.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+                self.manifest['repositories'][full_name] = new_state
+                # Data of the repository are written, the manifest can point past them.
+                _write_json(self.manifest_path, self.manifest)
+                yield dict(stats, repository=full_name)
+
+    def mirror_repository(self, organization: str, project: str) -> dict:
+        """Mirror a single repository, return its result (see mirror_repositories)."""
+        result, = self.mirror_repositories([(organization, project)])
+        return result
+
+    def mirror_organization(self, organization: str) -> typing.Generator[dict, None, None]:
+        """Mirror all repositories of an organization, see mirror_repositories for results."""
+        return self.mirror_repositories(
+            (organization, project) for project in self.list_organization_repositories(organization)
+        )
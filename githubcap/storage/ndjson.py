@@ -0,0 +1,426 @@
+"""Append-only NDJSON log of resources with a memory mapped offset index for random access.
+
+A log consists of two files - the log itself storing one resource per line in its JSON representation and a binary
+index (log path with '.idx' suffix) mapping resource keys (such as ids or numbers) to byte offsets in the log. The
+index is an open addressing hash table, so lookups done by readers cost O(1) and opening a log does not require
+parsing it.
+
+The index refers only to entries persisted in the log - the log is synced before entries are indexed and the index
+header then records the size of the log the index covers. Entries past it are indexed again once the log is opened
+for writing. A writer rebuilding the index (when it grows) marks it in the header generation, readers wait for the
+rebuild to finish and remap the index then.
+"""
+
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import typing
+
+from githubcap.base import GitHubBase
+from githubcap.exceptions import UserInputError
+from githubcap.serialization import to_json
+
+_LOG = logging.getLogger(__name__)
+
+# Header - magic, number of slots, number of keys stored, size of log covered by index and generation of the index
+# (incremented when index rebuild starts and when it finishes, so it is odd while the index is being rebuilt).
+_HEADER = struct.Struct('<8sQQQQ')
+_GENERATION = struct.Struct('<Q')
+_GENERATION_OFFSET = _HEADER.size - _GENERATION.size
+# Slot - key and offset incremented by one (zero denotes an empty slot).
+_SLOT = struct.Struct('<qQ')
+_MAGIC = b'GHCAPIX2'
+_INITIAL_SLOTS = 1024
+_MAX_LOAD_FACTOR = 0.6
+_HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+# Number of appended entries after which the log is flushed and the entries indexed.
+_MAX_PENDING = 65536
+_UINT64_MASK = 0xFFFFFFFFFFFFFFFF
+_MIN_KEY = -2 ** 63
+_MAX_KEY = 2 ** 63 - 1
+# Time readers wait for a writer to finish index rebuild, a longer rebuild is considered interrupted by a crash.
+_REBUILD_TIMEOUT = 10.0
+_REBUILD_POLL_INTERVAL = 0.001
+
+
+def get_index_path(log_path: str) -> str:
+    """Get path to index file of the given log."""
+    return log_path + '.idx'
+
+
+class _OffsetIndex(object):
+    """A memory mapped hash table mapping integer keys to log offsets.
+
+    There is at most one writer of an index, readers (see sync()) can read it while the writer updates it.
+    """
+
+    def __init__(self, path: str, writable: bool = False):
+        """Open index stored in the given file, a writable index is created if it does not exist."""
+        self.path = path
+        self.writable = writable
+
+        if writable and not os.path.isfile(path):
+            self._create(path, _INITIAL_SLOTS)
+
+        self._file = open(path, 'r+b' if writable else 'rb')
+        self._map = None
+        try:
+            self._map_index()
+        except UserInputError:
+            self._file.close()
+            raise
+
+    @staticmethod
+    def _create(path: str, slots: int) -> None:
+        """Create an empty index file with the given number of slots."""
+        with open(path, 'wb') as index_file:
+            index_file.write(_HEADER.pack(_MAGIC, slots, 0, 0, 0))
+            index_file.truncate(_HEADER.size + slots * _SLOT.size)
+
+    def _map_index(self) -> None:
+        """Memory map the index file and read its header."""
+        if self._map is not None:
+            self._map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE if self.writable else mmap.ACCESS_READ)
+
+        magic, self.slots, self.count, self.indexed_size, self.generation = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC:
+            self._map.close()
+            raise UserInputError("File {!r} is not a resource log index".format(self.path))
+
+        self._shift = 64 - self.slots.bit_length() + 1
+
+    def _get_generation(self) -> int:
+        """Get generation of the index as stated in its header now."""
+        return _GENERATION.unpack_from(self._map, _GENERATION_OFFSET)[0]
+
+    def sync(self) -> int:
+        """Synchronize a reader with the writer - wait for an index rebuild to finish, remap a rebuilt index.
+
+        :return: generation of the index, a read is consistent if the generation did not change meanwhile
+        """
+        deadline = None
+        while True:
+            generation = self._get_generation()
+            if generation % 2:
+                deadline = deadline or time.monotonic() + _REBUILD_TIMEOUT
+                if time.monotonic() > deadline:
+                    raise UserInputError("Index {!r} was not rebuilt completely, open log for writing to "
+                                         "rebuild it".format(self.path))
+                time.sleep(_REBUILD_POLL_INTERVAL)
+            elif generation != self.generation:
+                _LOG.debug("Index %r was rebuilt, remapping it", self.path)
+                self._map_index()
+            else:
+                _, _, self.count, self.indexed_size, _ = _HEADER.unpack_from(self._map, 0)
+                return generation
+
+    def read(self, func: typing.Callable[[], typing.Any]) -> typing.Any:
+        """Run a read of the index consistent with index rebuilds done by a writer meanwhile."""
+        while True:
+            generation = self.sync()
+            result = func()
+            if self._get_generation() == generation:
+                return result
+
+    def _get_slot(self, key: int) -> int:
+        """Get the first slot to be probed for the given key."""
+        return ((key * _HASH_MULTIPLIER) & _UINT64_MASK) >> self._shift
+
+    def get(self, key: int) -> typing.Optional[int]:
+        """Get log offset of the given key, return None if the key is not indexed."""
+        if not self.writable:
+            return self.read(lambda: self._lookup(key))
+        return self._lookup(key)
+
+    def _lookup(self, key: int) -> typing.Optional[int]:
+        """Look up log offset of the given key in slots."""
+        mask = self.slots - 1
+        slot = self._get_slot(key)
+        while True:
+            slot_key, offset = _SLOT.unpack_from(self._map, _HEADER.size + slot * _SLOT.size)
+            if offset == 0:
+                return None
+            if slot_key == key:
+                return offset - 1
+            slot = (slot + 1) & mask
+
+    def put(self, key: int, offset: int) -> None:
+        """Store log offset for the given key, offset of an already indexed key is replaced."""
+        if self.count + 1 > self.slots * _MAX_LOAD_FACTOR:
+            self._grow()
+
+        mask = self.slots - 1
+        slot = self._get_slot(key)
+        while True:
+            position = _HEADER.size + slot * _SLOT.size
+            slot_key, slot_offset = _SLOT.unpack_from(self._map, position)
+            if slot_offset == 0 or slot_key == key:
+                _SLOT.pack_into(self._map, position, key, offset + 1)
+                if slot_offset == 0:
+                    self.count += 1
+                return
+            slot = (slot + 1) & mask
+
+    def _get_items(self) -> typing.List[typing.Tuple[int, int]]:
+        """Get indexed keys and their offsets."""
+        slots = _SLOT.iter_unpack(self._map[_HEADER.size:_HEADER.size + self.slots * _SLOT.size])
+        return [(key, offset - 1) for key, offset in slots if offset != 0]
+
+    def items(self) -> typing.List[typing.Tuple[int, int]]:
+        """Get indexed keys and their offsets."""
+        if not self.writable:
+            return self.read(self._get_items)
+        return self._get_items()
+
+    @property
+    def rebuilding(self) -> bool:
+        """Check whether the index was left in the middle of a rebuild (the writer crashed)."""
+        return bool(self.generation % 2)
+
+    def _rebuild(self, slots: int, items: typing.List[typing.Tuple[int, int]]) -> None:
+        """Rebuild the index with the given number of slots (never shrunk) holding the given items."""
+        # Readers wait until the rebuild is finished.
+        self.generation += 1 - self.generation % 2
+        self.flush(self.indexed_size)
+
+        if slots != self.slots:
+            self._map.close()
+            self._file.truncate(_HEADER.size + slots * _SLOT.size)
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_WRITE)
+        self._map[_HEADER.size:] = bytes(slots * _SLOT.size)
+
+        self.slots = slots
+        self.count = 0
+        self._shift = 64 - self.slots.bit_length() + 1
+        for key, offset in items:
+            self.put(key, offset)
+
+        self.generation += 1
+        self.flush(self.indexed_size)
+
+    def _grow(self) -> None:
+        """Double number of slots, all indexed keys are rehashed."""
+        _LOG.debug("Growing index %r to %d slots", self.path, self.slots * 2)
+        self._rebuild(self.slots * 2, self.items())
+
+    def clear(self) -> None:
+        """Remove all keys, the index covers no part of log then."""
+        self.indexed_size = 0
+        self._rebuild(self.slots, [])
+
+    def flush(self, indexed_size: int) -> None:
+        """Persist index, the index covers log up to the given size."""
+        self.indexed_size = indexed_size
+        _HEADER.pack_into(self._map, 0, _MAGIC, self.slots, self.count, indexed_size, self.generation)
+        self._map.flush()
+
+    def close(self) -> None:
+        """Close index file."""
+        self._map.close()
+        self._file.close()
+
+
+class ResourceLogWriter(object):
+    """Append resources to an NDJSON log and maintain its offset index.
+
+    >>> from githubcap.classes import Issue
+    >>> with ResourceLogWriter('issues.ndjson') as log:
+    >>>     log.extend(Issue.list_project_issues('fridex', 'githubcap'))
+    """
+
+    def __init__(self, path: str, key: str = 'id'):
+        """Open log for appending, resources are indexed by the given (integer) attribute."""
+        self.path = path
+        self.key = key
+        self._log = open(path, 'ab')
+        self._size = self._log.tell()
+        self._index = _OffsetIndex(get_index_path(path), writable=True)
+        # Index updates of entries not flushed yet, the index refers only to entries persisted in the log.
+        self._pending = {}
+
+        if self._index.indexed_size > self._size:
+            self._index.close()
+            self._log.close()
+            raise UserInputError("Index of log {!r} covers more than the log itself".format(path))
+
+        if self._index.rebuilding:
+            _LOG.warning("Index of log %r was not rebuilt completely, indexing the whole log", path)
+            self._index.clear()
+
+        # Entries indexed by an interrupted flush are persisted in the log already, the tail is indexed again.
+        if self._index.indexed_size < self._size:
+            self._index_tail()
+
+    def _index_tail(self) -> None:
+        """Index log entries that were appended but not indexed (e.g. on an interrupted write)."""
+        _LOG.debug("Indexing log %r from offset %d", self.path, self._index.indexed_size)
+        offset = self._index.indexed_size
+        # Entries read could be still only in page cache, they are indexed once persisted.
+        os.fsync(self._log.fileno())
+        with open(self.path, 'rb') as log_file:
+            log_file.seek(offset)
+            for line in log_file:
+                if not line.endswith(b'\n'):
+                    break
+                self._index.put(json.loads(line.decode('utf-8'))[self.key], offset)
+                offset += len(line)
+
+        if offset != self._size:
+            _LOG.warning("Discarding incomplete entry at the end of log %r (offset %d)", self.path, offset)
+            self._log.truncate(offset)
+            self._size = offset
+
+        self._index.flush(self._size)
+
+    def append(self, resource: typing.Union[GitHubBase, dict]) -> int:
+        """Append a resource (or its dict representation) to the log, return its offset."""
+        key = getattr(resource, self.key) if isinstance(resource, GitHubBase) else resource[self.key]
+        if not isinstance(key, int) or isinstance(key, bool) or not _MIN_KEY <= key <= _MAX_KEY:
+            raise UserInputError("Key {!r} ({!r}) of resource appended to log {!r} is not a 64-bit integer".format(
+                self.key, key, self.path))
+
+        line = to_json(resource, pretty=False) if isinstance(resource, GitHubBase) else json.dumps(resource, separators=(',', ':'))
+
+        data = line.encode('ascii') + b'\n'
+        offset = self._size
+        self._log.write(data)
+        self._size += len(data)
+        self._pending[key] = offset
+        if len(self._pending) >= _MAX_PENDING:
+            self.flush()
+        return offset
+
+    def extend(self, resources: typing.Iterable[typing.Union[GitHubBase, dict]]) -> int:
+        """Append all resources from an iterable (e.g. a listing) to the log, return number of resources appended."""
+        count = 0
+        for resource in resources:
+            self.append(resource)
+            count += 1
+        return count
+
+    def flush(self) -> None:
+        """Flush log and then index so the index never refers to data not written to the log."""
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        for key, offset in self._pending.items():
+            self._index.put(key, offset)
+        self._pending = {}
+        self._index.flush(self._size)
+
+    def close(self) -> None:
+        """Flush and close log."""
+        self.flush()
+        self._index.close()
+        self._log.close()
+
+    def __enter__(self):
+        """Use log writer as a context manager, the log is closed on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close log on context manager exit."""
+        self.close()
+
+
+class ResourceLogReader(object):
+    """Read resources from an NDJSON log - by key in O(1) using its offset index or sequentially.
+
+    Both log and its index are memory mapped, nothing is parsed on open.
+
+    >>> from githubcap.classes import Issue
+    >>> with ResourceLogReader('issues.ndjson', Issue) as log:
+    >>>     issue = log.get(1234)
+    """
+
+    def __init__(self, path: str, resource_class: type = None):
+        """Open log, resources are returned as instances of resource class if given, as dicts otherwise."""
+        self.path = path
+        self.resource_class = resource_class
+
+        index_path = get_index_path(path)
+        if not os.path.isfile(index_path):
+            raise UserInputError("No index found for log {!r}, open log for writing to create one".format(path))
+
+        self._index = _OffsetIndex(index_path)
+        self._log = open(path, 'rb')
+        self._map = b''
+        size = self._map_log()
+
+        if self._index.indexed_size != size:
+            _LOG.warning("Index of log %r covers %d bytes out of %d, open log for writing to update index",
+                         path, self._index.indexed_size, size)
+
+    def _map_log(self) -> int:
+        """Memory map the log as it is now (a writer could append to it since it was mapped), return its size."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        size = os.fstat(self._log.fileno()).st_size
+        self._map = mmap.mmap(self._log.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        return size
+
+    def _parse(self, line: bytes) -> typing.Union[GitHubBase, dict]:
+        """Parse a log entry."""
+        resource = json.loads(line.decode('utf-8'))
+        return self.resource_class.from_dict(resource) if self.resource_class else resource
+
+    def get(self, key: int) -> typing.Optional[typing.Union[GitHubBase, dict]]:
+        """Get the most recently appended resource with the given key, return None if not present in the log."""
+        offset = self._index.get(key)
+        if offset is None:
+            return None
+
+        end = self._map.find(b'\n', offset)
+        if end == -1:
+            # The entry was flushed by a writer after the log was mapped.
+            self._map_log()
+            end = self._map.find(b'\n', offset)
+            if end == -1:
+                raise UserInputError("Entry of key {!r} at offset {:d} of log {!r} is incomplete".format(
+                    key, offset, self.path))
+
+        return self._parse(self._map[offset:end])
+
+    def __contains__(self, key: int) -> bool:
+        """Check whether a resource with the given key is present in the log."""
+        return self._index.get(key) is not None
+
+    def __len__(self) -> int:
+        """Get number of distinct keys in the log."""
+        self._index.sync()
+        return self._index.count
+
+    def keys(self) -> typing.Generator[int, None, None]:
+        """Iterate over distinct keys present in the log (in no particular order)."""
+        for key, _ in self._index.items():
+            yield key
+
+    def __iter__(self) -> typing.Generator[typing.Union[GitHubBase, dict], None, None]:
+        """Stream all entries in the order they were appended (including resources appended multiple times)."""
+        offset = 0
+        size = len(self._map)
+        while offset < size:
+            end = self._map.find(b'\n', offset)
+            if end == -1:
+                # An incomplete entry that is being written.
+                return
+            yield self._parse(self._map[offset:end])
+            offset = end + 1
+
+    def close(self) -> None:
+        """Close log and its index."""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._log.close()
+        self._index.close()
+
+    def __enter__(self):
+        """Use log reader as a context manager, the log is closed on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close log on context manager exit."""
+        self.close()
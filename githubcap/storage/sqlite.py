@@ -0,0 +1,364 @@
+"""A local SQLite store of issues mirrored from GitHub."""
+
+from datetime import datetime
+import json
+import logging
+import sqlite3
+import typing
+
+import githubcap.enums as enums
+from githubcap.base import GitHubBase
+from githubcap.classes import Issue
+from githubcap.exceptions import UserInputError
+from githubcap.utils import serialize_datetime
+
+_LOG = logging.getLogger(__name__)
+
+# Version of database schema stored in user_version pragma, databases of older versions are migrated on open.
+# Version 0 stored issues only with their update time and data (no indexed columns, labels and assignees).
+_SCHEMA_VERSION = 1
+_UNMIGRATED_TABLE = 'issues_unmigrated'
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS issues (
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    comments INTEGER NOT NULL,
+    milestone_number INTEGER,
+    milestone_title TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repository, number)
+);
+CREATE INDEX IF NOT EXISTS issues_state ON issues (state);
+CREATE INDEX IF NOT EXISTS issues_created_at ON issues (created_at);
+CREATE INDEX IF NOT EXISTS issues_updated_at ON issues (updated_at);
+CREATE INDEX IF NOT EXISTS issues_milestone_number ON issues (milestone_number);
+CREATE INDEX IF NOT EXISTS issues_milestone_title ON issues (milestone_title);
+CREATE TABLE IF NOT EXISTS issue_labels (
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    label TEXT NOT NULL,
+    PRIMARY KEY (repository, number, label)
+);
+CREATE INDEX IF NOT EXISTS issue_labels_label ON issue_labels (label);
+CREATE TABLE IF NOT EXISTS issue_assignees (
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    login TEXT NOT NULL,
+    PRIMARY KEY (repository, number, login)
+);
+CREATE INDEX IF NOT EXISTS issue_assignees_login ON issue_assignees (login);
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    high_water_mark TEXT NOT NULL
+);
+"""
+
+
+class IssueStore(object):
+    """A local store of issues backed by SQLite database.
+
+    Issues are stored as returned by GitHub API (in their JSON representation), keyed by repository full name and
+    issue number. Attributes used for querying (state, labels, assignees, milestone, creation and update time) are
+    stored in indexed columns and tables. Besides issues, the store keeps high-water marks (the most recent issue
+    update time seen) for synchronized scopes so subsequent synchronizations can retrieve only updated issues.
+    """
+
+    _SORT_COLUMNS = {
+        enums.Sorting.CREATED: 'created_at',
+        enums.Sorting.UPDATED: 'updated_at',
+        enums.Sorting.COMMENTS: 'comments',
+    }
+
+    def __init__(self, path: str = ':memory:'):
+        """Open (and create if needed) the store in the given SQLite database file."""
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        try:
+            self._create_schema()
+        except Exception:
+            self._connection.close()
+            raise
+        _LOG.debug("Opened issue store %r", path)
+
+    def _get_columns(self, table: str) -> typing.Set[str]:
+        """Get column names of a table, an empty set if there is no such table."""
+        return {row[1] for row in self._connection.execute('PRAGMA table_info({})'.format(table))}
+
+    def _create_schema(self) -> None:
+        """Create database schema, a database created by an older version of the store is migrated."""
+        version = self._connection.execute('PRAGMA user_version').fetchone()[0]
+        if version > _SCHEMA_VERSION:
+            raise UserInputError("Issue store {!r} was created by a newer version (schema version {:d})".format(
+                self.path, version))
+
+        if version < _SCHEMA_VERSION:
+            columns = self._get_columns('issues')
+            if columns and 'state' not in columns:
+                _LOG.info("Migrating issue store %r from schema version %d", self.path, version)
+                with self._connection:
+                    self._connection.execute('ALTER TABLE issues RENAME TO {}'.format(_UNMIGRATED_TABLE))
+
+        self._connection.executescript(_SCHEMA_SQL)
+
+        if self._get_columns(_UNMIGRATED_TABLE):
+            # Issues are stored in their JSON representation, indexed columns are derived from it. Continued
+            # if a previous migration was interrupted.
+            issues = (json.loads(row[0]) for row in
+                      self._connection.execute('SELECT data FROM {}'.format(_UNMIGRATED_TABLE)).fetchall())
+            count = self.upsert(issues)
+            with self._connection:
+                self._connection.execute('DROP TABLE {}'.format(_UNMIGRATED_TABLE))
+            _LOG.info("Migrated %d issues of issue store %r", count, self.path)
+
+        if version != _SCHEMA_VERSION:
+            with self._connection:
+                self._connection.execute('PRAGMA user_version = {:d}'.format(_SCHEMA_VERSION))
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._connection.close()
+
+    def __enter__(self):
+        """Use store as a context manager, the store is closed on exit."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close store on context manager exit."""
+        self.close()
+
+    @staticmethod
+    def get_repository_name(issue: dict) -> str:
+        """Get full name of repository (owner/name) the given issue (in its dict representation) belongs to."""
+        return '/'.join(issue['repository_url'].rsplit('/', maxsplit=2)[-2:])
+
+    @staticmethod
+    def _to_rows(issue: typing.Union[dict, Issue]) -> typing.Tuple[tuple, list, list]:
+        """Convert an issue to database rows - issue row, label rows and assignee rows."""
+        if isinstance(issue, GitHubBase):
+            issue = issue.to_dict()
+
+        repository = IssueStore.get_repository_name(issue)
+        number = issue['number']
+        milestone = issue.get('milestone') or {}
+        issue_row = (
+            repository,
+            number,
+            issue['id'],
+            issue['state'],
+            issue['created_at'],
+            issue['updated_at'],
+            issue['comments'],
+            milestone.get('number'),
+            milestone.get('title'),
+            json.dumps(issue, separators=(',', ':'))
+        )
+        label_rows = [(repository, number, label['name']) for label in issue.get('labels') or ()]
+        assignee_rows = [(repository, number, user['login']) for user in issue.get('assignees') or ()]
+        return issue_row, label_rows, assignee_rows
+
+    def upsert(self, issues: typing.Iterable[typing.Union[dict, Issue]], scope: str = None,
+               high_water_mark: str = None) -> int:
+        """Insert or update issues, optionally move high-water mark of a scope in the same transaction.
+
+        :param issues: issues to be stored, either raw (dicts) as returned by GitHub API or issue objects
+        :param scope: synchronization scope the high-water mark should be adjusted for
+        :param high_water_mark: the new high-water mark for the scope, it is never moved backwards
+        :return: number of issues stored
+        """
+        issue_rows = []
+        label_rows = []
+        assignee_rows = []
+        for issue in issues:
+            issue_row, issue_label_rows, issue_assignee_rows = self._to_rows(issue)
+            issue_rows.append(issue_row)
+            label_rows.extend(issue_label_rows)
+            assignee_rows.extend(issue_assignee_rows)
+
+        keys = [issue_row[:2] for issue_row in issue_rows]
+        with self._connection:
+            self._connection.executemany('DELETE FROM issue_labels WHERE repository = ? AND number = ?', keys)
+            self._connection.executemany('DELETE FROM issue_assignees WHERE repository = ? AND number = ?', keys)
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', issue_rows
+            )
+            self._connection.executemany('INSERT OR IGNORE INTO issue_labels VALUES (?, ?, ?)', label_rows)
+            self._connection.executemany('INSERT OR IGNORE INTO issue_assignees VALUES (?, ?, ?)', assignee_rows)
+            if scope is not None and high_water_mark is not None:
+                self._connection.execute('INSERT OR IGNORE INTO sync_state VALUES (?, ?)', (scope, high_water_mark))
+                self._connection.execute(
+                    'UPDATE sync_state SET high_water_mark = ? WHERE scope = ? AND high_water_mark < ?',
+                    (high_water_mark, scope, high_water_mark)
+                )
+
+        return len(issue_rows)
+
+    def get_high_water_mark(self, scope: str) -> typing.Optional[str]:
+        """Get high-water mark (ISO-8601 datetime of the most recent issue update) for the given scope."""
+        row = self._connection.execute(
+            'SELECT high_water_mark FROM sync_state WHERE scope = ?', (scope,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def get(self, repository: str, number: int, raw: bool = False) -> typing.Optional[typing.Union[dict, Issue]]:
+        """Get a stored issue, return None if the given issue is not present in the store."""
+        row = self._connection.execute(
+            'SELECT data FROM issues WHERE repository = ? AND number = ?', (repository, number)
+        ).fetchone()
+
+        if row is None:
+            return None
+
+        issue = json.loads(row[0])
+        return issue if raw else Issue.from_dict(issue)
+
+    def iter_issues(self, repository: str = None,
+                    raw: bool = False) -> typing.Generator[typing.Union[dict, Issue], None, None]:
+        """Iterate over stored issues, optionally only issues of the given repository."""
+        if repository is None:
+            cursor = self._connection.execute('SELECT data FROM issues ORDER BY repository, number')
+        else:
+            cursor = self._connection.execute(
+                'SELECT data FROM issues WHERE repository = ? ORDER BY number', (repository,)
+            )
+
+        for row in cursor:
+            issue = json.loads(row[0])
+            yield issue if raw else Issue.from_dict(issue)
+
+    def count(self, repository: str = None) -> int:
+        """Get number of stored issues, optionally only issues of the given repository."""
+        if repository is None:
+            return self._connection.execute('SELECT COUNT(*) FROM issues').fetchone()[0]
+
+        return self._connection.execute(
+            'SELECT COUNT(*) FROM issues WHERE repository = ?', (repository,)
+        ).fetchone()[0]
+
+    @staticmethod
+    def _get_enum(enum_class: type, value: typing.Any, parameter: str) -> typing.Any:
+        """Get enum member given as a member, its value or its name - None stands for the default one."""
+        if value is None:
+            return enum_class.get_default()
+        if isinstance(value, enum_class):
+            return value
+        if isinstance(value, str):
+            if value in enum_class.all_values():
+                return enum_class.from_value(value)
+            if value.upper() in enum_class.all_names():
+                return enum_class.from_str(value.upper())
+
+        raise UserInputError("Invalid {} {!r}, expected one of: {}".format(
+            parameter, value, ', '.join(enum_class.all_values())))
+
+    @staticmethod
+    def _datetime_condition(column: str, since: typing.Union[datetime, str, None],
+                            until: typing.Union[datetime, str, None],
+                            conditions: list, parameters: list) -> None:
+        """Add conditions restricting datetime column to the given (inclusive) range."""
+        if since is not None:
+            conditions.append('{} >= ?'.format(column))
+            parameters.append(serialize_datetime(since) if isinstance(since, datetime) else since)
+        if until is not None:
+            conditions.append('{} <= ?'.format(column))
+            parameters.append(serialize_datetime(until) if isinstance(until, datetime) else until)
+
+    def query(self, repository: str = None, state: enums.IssueState = None, labels: typing.List[str] = None,
+              assignee: str = None, milestone: typing.Union[int, str] = None,
+              created_since: typing.Union[datetime, str] = None, created_until: typing.Union[datetime, str] = None,
+              updated_since: typing.Union[datetime, str] = None, updated_until: typing.Union[datetime, str] = None,
+              number: typing.Union[int, typing.Iterable[int]] = None, sort: enums.Sorting = None,
+              direction: enums.SortingDirection = None, limit: int = None,
+              raw: bool = False) -> typing.Generator[typing.Union[dict, Issue], None, None]:
+        """Query stored issues, results are streamed as they are read from the store.
+
+        All the filters supplied have to match (filters are combined using AND), filters are backed by indexes.
+
+        :param repository: full name of repository (owner/name) issues belong to
+        :param state: issue state, all issues are matched on None or IssueState.ALL
+        :param labels: names of labels issues have to be labeled with (all of them)
+        :param assignee: login of a user issues are assigned to, '*' for any assigned issue, 'none' for unassigned
+        :param milestone: milestone number (int) or title (str), '*' for any milestone, 'none' for no milestone
+        :param created_since: match issues created at or after the given time
+        :param created_until: match issues created at or before the given time
+        :param updated_since: match issues updated at or after the given time
+        :param updated_until: match issues updated at or before the given time
+        :param number: issue number or an iterable of issue numbers
+        :param sort: sorting criteria (a Sorting member, its value or name), defaults to creation time
+        :param direction: sorting direction (a SortingDirection member, its value or name), defaults to descending
+        :param limit: maximum number of issues returned
+        :param raw: yield issues as dicts (as returned by GitHub API) instead of issue objects
+        """
+        # pylint: disable=too-many-arguments,too-many-locals,too-many-branches
+        conditions = []
+        parameters = []
+
+        if repository is not None:
+            conditions.append('issues.repository = ?')
+            parameters.append(repository)
+
+        if state is not None and str(state) != str(enums.IssueState.ALL):
+            conditions.append('issues.state = ?')
+            parameters.append(str(state))
+
+        for label in labels or ():
+            conditions.append('EXISTS (SELECT 1 FROM issue_labels WHERE issue_labels.repository = issues.repository '
+                              'AND issue_labels.number = issues.number AND issue_labels.label = ?)')
+            parameters.append(label)
+
+        if assignee is not None:
+            subquery = 'EXISTS (SELECT 1 FROM issue_assignees WHERE issue_assignees.repository = issues.repository ' \
+                       'AND issue_assignees.number = issues.number{})'
+            if assignee == 'none':
+                conditions.append('NOT ' + subquery.format(''))
+            elif assignee == Issue.ANY_USER:
+                conditions.append(subquery.format(''))
+            else:
+                conditions.append(subquery.format(' AND issue_assignees.login = ?'))
+                parameters.append(assignee)
+
+        if milestone == 'none':
+            conditions.append('issues.milestone_number IS NULL')
+        elif milestone == '*':
+            conditions.append('issues.milestone_number IS NOT NULL')
+        elif isinstance(milestone, int):
+            conditions.append('issues.milestone_number = ?')
+            parameters.append(milestone)
+        elif milestone is not None:
+            conditions.append('issues.milestone_title = ?')
+            parameters.append(milestone)
+
+        self._datetime_condition('issues.created_at', created_since, created_until, conditions, parameters)
+        self._datetime_condition('issues.updated_at', updated_since, updated_until, conditions, parameters)
+
+        if isinstance(number, int):
+            conditions.append('issues.number = ?')
+            parameters.append(number)
+        elif number is not None:
+            number = list(number)
+            conditions.append('issues.number IN ({})'.format(', '.join('?' * len(number))))
+            parameters.extend(number)
+
+        statement = 'SELECT issues.data FROM issues'
+        if conditions:
+            statement += ' WHERE ' + ' AND '.join(conditions)
+
+        # Both are validated, they are part of the statement.
+        sort = self._get_enum(enums.Sorting, sort, 'sort')
+        direction = self._get_enum(enums.SortingDirection, direction, 'direction')
+        statement += ' ORDER BY issues.{} {}, issues.repository, issues.number'.format(
+            self._SORT_COLUMNS[sort], str(direction).upper()
+        )
+
+        if limit is not None:
+            statement += ' LIMIT ?'
+            parameters.append(limit)
+
+        _LOG.debug("Querying issue store: %s %r", statement, parameters)
+        for row in self._connection.execute(statement, parameters):
+            issue = json.loads(row[0])
+            yield issue if raw else Issue.from_dict(issue)
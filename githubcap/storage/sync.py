@@ -0,0 +1,85 @@
+"""Incremental synchronization of issues into a local store."""
+
+import logging
+import typing
+
+import githubcap.enums as enums
+from githubcap.classes import Issue
+
+from .sqlite import IssueStore
+
+_LOG = logging.getLogger(__name__)
+
+
+class IssueSync(object):
+    """Mirror issues into a local store.
+
+    The first synchronization of a scope (a project or an organization) retrieves all issues, subsequent ones
+    retrieve only issues updated since the stored high-water mark (using 'since' and sorting by update time).
+
+    >>> with IssueStore('issues.sqlite3') as store:
+    >>>     IssueSync(store).sync_project('fridex', 'githubcap')
+    """
+
+    def __init__(self, store: IssueStore, batch_size: int = Issue.DEFAULT_PER_PAGE):
+        """Initialize synchronization into the given store, issues are stored in batches of the given size."""
+        self.store = store
+        self.batch_size = batch_size
+
+    @staticmethod
+    def get_project_scope(organization: str, project: str) -> str:
+        """Get synchronization scope name for a project."""
+        return 'repos/{!s}/{!s}'.format(organization, project)
+
+    @staticmethod
+    def get_organization_scope(organization: str) -> str:
+        """Get synchronization scope name for an organization."""
+        return 'orgs/{!s}'.format(organization)
+
+    def sync_project(self, organization: str, project: str) -> int:
+        """Synchronize issues of the given project, return number of issues stored."""
+        return self._sync(
+            self.get_project_scope(organization, project),
+            lambda **query: Issue.list_project_issues(organization, project, **query)
+        )
+
+    def sync_organization(self, organization: str) -> int:
+        """Synchronize issues of the given organization, return number of issues stored."""
+        return self._sync(
+            self.get_organization_scope(organization),
+            lambda **query: Issue.list_organization_issues(organization, **query)
+        )
+
+    def _is_stored(self, issue: dict) -> bool:
+        """Check whether the given issue is stored as it is."""
+        return self.store.get(self.store.get_repository_name(issue), issue['number'], raw=True) == issue
+
+    def _sync(self, scope: str, listing: typing.Callable[..., typing.Iterable[dict]]) -> int:
+        """Retrieve issues updated since the last synchronization of the scope and store them."""
+        since = self.store.get_high_water_mark(scope)
+        _LOG.debug("Synchronizing issues in scope %r since %s", scope, since or 'beginning')
+
+        # Issues are listed from the most recently updated ones. Issues updated during synchronization can only
+        # shift listing (so some issues are retrieved twice), no issue is skipped. The high-water mark is moved
+        # once the whole listing is stored so an interrupted synchronization is simply started over.
+        high_water_mark = None
+        count = 0
+        batch = []
+        for issue in listing(state=enums.IssueState.ALL, sort=enums.Sorting.UPDATED,
+                             direction=enums.SortingDirection.DESC, since=since, raw=True):
+            if high_water_mark is None or issue['updated_at'] > high_water_mark:
+                high_water_mark = issue['updated_at']
+
+            # Listing since the high-water mark includes issues updated at the mark, these were most likely
+            # stored by the previous synchronization already.
+            if issue['updated_at'] == since and self._is_stored(issue):
+                continue
+
+            batch.append(issue)
+            if len(batch) >= self.batch_size:
+                count += self.store.upsert(batch)
+                batch = []
+
+        count += self.store.upsert(batch, scope, high_water_mark)
+        _LOG.debug("Synchronized %d issues in scope %r, high-water mark is %s", count, scope, high_water_mark)
+        return count
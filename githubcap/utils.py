@@ -1,29 +1,65 @@
 """Utilities for githubcap project."""
 import datetime
+import functools
 import json
 import logging
 import re
+import sys
 import typing
 
-import click
-
 import attr
-import daiquiri
 
 _DATETIME_ISO_8601 = "%Y-%m-%dT%H:%M:%SZ"
-_PAGINATION_RE = re.compile(r'.*[?!]page=(\d+).*')
+_DATETIME_ISO_8601_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z\Z', re.ASCII)
+_DATETIME_ISO_8601_SERIALIZE = "%04d-%02d-%02dT%02d:%02d:%02dZ"
+_DATETIME_CACHE_SIZE = 4096
+# Available in Python 3.7+, considerably faster than constructing datetime from parsed parts.
+_DATETIME_FROM_ISO_FORMAT = getattr(datetime.datetime, 'fromisoformat', None)
+_PAGINATION_RE = re.compile(r'.*[?&]page=(\d+).*')
 _DEFAULT_NO_COLOR_FORMAT = "%(asctime)s [%(process)d] %(levelname)-8.8s %(name)s: %(message)s"
 _DEFAULT_COLOR_FORMAT = "%(asctime)s [%(process)d] %(color)s%(levelname)-8.8s %(name)s: %(message)s%(color_stop)s"
 
 
+@functools.lru_cache(maxsize=_DATETIME_CACHE_SIZE)
+def _parse_datetime(datetime_string: str) -> datetime.datetime:
+    """Parse ISO-8601 datetime representation, results are memoized as timestamps tend to repeat in listings."""
+    # Fast path for the canonical form GitHub uses, anything else (or anything invalid) goes
+    # through strptime so results and error reporting stay the same.
+    matched = _DATETIME_ISO_8601_RE.match(datetime_string)
+    if matched:
+        try:
+            if _DATETIME_FROM_ISO_FORMAT is not None:
+                return _DATETIME_FROM_ISO_FORMAT(datetime_string[:19])
+            return datetime.datetime(*map(int, matched.groups()))
+        except ValueError:
+            pass
+
+    return datetime.datetime.strptime(datetime_string, _DATETIME_ISO_8601)
+
+
 def parse_datetime(datetime_string: str) -> datetime.datetime:
     """Parse ISO-8601 datetime representation."""
-    return datetime.datetime.strptime(datetime_string, _DATETIME_ISO_8601) if datetime_string is not None else None
+    return _parse_datetime(datetime_string) if datetime_string is not None else None
+
+
+def clear_datetime_cache() -> None:
+    """Clear memoized results of datetime parsing, e.g. to measure parsing itself."""
+    _parse_datetime.cache_clear()
 
 
 def serialize_datetime(datetime_instance: datetime.datetime) -> str:
     """Serialize ISO-8601 datetime representation."""
-    return datetime_instance.strftime(_DATETIME_ISO_8601) if datetime_instance is not None else None
+    if datetime_instance is None:
+        return None
+
+    if datetime_instance.year < 1000:
+        # strftime does not zero-pad years before 1000 on all platforms, keep its behaviour.
+        return datetime_instance.strftime(_DATETIME_ISO_8601)
+
+    return _DATETIME_ISO_8601_SERIALIZE % (
+        datetime_instance.year, datetime_instance.month, datetime_instance.day,
+        datetime_instance.hour, datetime_instance.minute, datetime_instance.second
+    )
 
 
 def setup_logging(verbose: int, no_color: bool) -> None:
@@ -38,12 +74,16 @@ def setup_logging(verbose: int, no_color: bool) -> None:
     elif verbose > 1:
         level = logging.DEBUG
 
+    # Imported here as logging is set up only by CLI, library users do not pay for importing daiquiri.
+    import daiquiri
+
     formatter = daiquiri.formatter.ColorFormatter(fmt=_DEFAULT_COLOR_FORMAT)
     if no_color:
         formatter = logging.Formatter(fmt=_DEFAULT_NO_COLOR_FORMAT)
 
+    # Current standard error is passed explicitly, it can be redirected (e.g. when run in githubcap daemon).
     daiquiri.setup(level=level, outputs=(
-        daiquiri.output.Stream(formatter=formatter),
+        daiquiri.output.Stream(sys.stderr, formatter=formatter),
     ))
 
 
@@ -54,7 +94,7 @@ def dict2json(dict_: dict, pretty: bool = True) -> str:
     :param pretty: if True, nice formatting will be used
     :return: formatted dict in json
     """
-    kwargs = {}
+    kwargs = {'separators': (',', ':')}
     if pretty:
         kwargs['sort_keys'] = True
         kwargs['separators'] = (',', ': ')
@@ -63,12 +103,8 @@ def dict2json(dict_: dict, pretty: bool = True) -> str:
     return json.dumps(dict_, **kwargs)
 
 
-def next_pagination_page(headers: dict) -> typing.Optional[int]:
-    """Parse next paginated page from HTTP headers.
-
-    :param headers: response headers that were returned by GitHub
-    :return: next pagination page or None if no other page remains
-    """
+def _get_pagination_page(headers: dict, relation: str) -> typing.Optional[int]:
+    """Parse page of the given relation (e.g. 'next') from Link HTTP header."""
     link = headers.get('Link')
     if link is None:
         # If there is no next page, GitHub does not provide 'Link'
@@ -76,7 +112,7 @@ def next_pagination_page(headers: dict) -> typing.Optional[int]:
 
     parts = link.split(',')
     for part in parts:
-        if not part.endswith('rel="next"'):
+        if not part.endswith('rel="{!s}"'.format(relation)):
             continue
 
         matched = _PAGINATION_RE.match(part)
@@ -85,6 +121,24 @@ def next_pagination_page(headers: dict) -> typing.Optional[int]:
     return None
 
 
+def next_pagination_page(headers: dict) -> typing.Optional[int]:
+    """Parse next paginated page from HTTP headers.
+
+    :param headers: response headers that were returned by GitHub
+    :return: next pagination page or None if no other page remains
+    """
+    return _get_pagination_page(headers, 'next')
+
+
+def last_pagination_page(headers: dict) -> typing.Optional[int]:
+    """Parse the last paginated page from HTTP headers.
+
+    :param headers: response headers that were returned by GitHub
+    :return: the last pagination page or None if the current page is the last one
+    """
+    return _get_pagination_page(headers, 'last')
+
+
 def print_command_result(result: dict, pretty=True) -> None:
     """Print results.
 
@@ -92,8 +146,13 @@ def print_command_result(result: dict, pretty=True) -> None:
     :param pretty: print result in a pretty way
     :type pretty: bool
     """
-    result = dict2json(result, pretty=pretty)
-    click.echo("{!s}".format(result))
+    import click
+
+    from githubcap import profiling
+
+    with profiling.phase(profiling.PHASE_OUTPUT):
+        result = dict2json(result, pretty=pretty)
+        click.echo("{!s}".format(result))
 
 
 def get_attr_type(class_: type, attr_name: str) -> type:
@@ -0,0 +1,244 @@
+"""Low-cost polling of repositories for issue changes.
+
+Each repository is polled by listing issues updated since a fixed point in time (most recently updated first),
+the first page of the listing is revalidated using its ETag. A repository with no changes costs a single request
+that was not modified (HTTP 304), which GitHub does not count against rate limit - so only repositories that
+changed consume the rate limit budget. The point in time the listing starts at is moved forward only once the
+first page of the listing is full, so the listing stays short and is not changed just by polling.
+
+Issues listed are compared with their versions seen before, an event is emitted for each created or changed
+issue:
+
+    {"event": "created", "repository": "fridex/githubcap", "number": 42, "updated_at": "...", "issue": {...}}
+    {"event": "changed", "repository": "fridex/githubcap", "number": 7, "updated_at": "...",
+     "changes": {"state": {"old": "open", "new": "closed"}}, "issue": {...}}
+
+Changes are not known for issues changed for the first time since polling started (the previous version was not
+seen), "changes" is omitted then. Removed and transferred issues are not reported.
+
+    >>> poller = IssuePoller(['fridex/githubcap'], interval=60)
+    >>> for event in poller.watch():
+    >>>     print(event)
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+import logging
+import time
+import typing
+
+import attr
+import requests
+
+import githubcap.enums as enums
+from .classes import Issue
+from .configuration import Configuration
+from .exceptions import GithubcapException
+from .exceptions import HTTPError
+from .exceptions import UserInputError
+from .utils import next_pagination_page
+from .utils import serialize_datetime
+
+_LOG = logging.getLogger(__name__)
+
+EVENT_CREATED = 'created'
+EVENT_CHANGED = 'changed'
+EVENT_ERROR = 'error'
+
+# Watched issue fields and functions extracting comparable values out of issues as returned by GitHub API.
+WATCHED_FIELDS = {
+    'title': lambda issue: issue.get('title'),
+    'body': lambda issue: issue.get('body'),
+    'state': lambda issue: issue.get('state'),
+    'locked': lambda issue: issue.get('locked'),
+    'comments': lambda issue: issue.get('comments'),
+    'closed_at': lambda issue: issue.get('closed_at'),
+    'milestone': lambda issue: (issue.get('milestone') or {}).get('title'),
+    'labels': lambda issue: sorted(label['name'] for label in issue.get('labels') or []),
+    'assignees': lambda issue: sorted(user['login'] for user in issue.get('assignees') or []),
+}
+
+# Issues updated shortly before polling started are listed on the first poll, local clock can differ from GitHub's.
+_CLOCK_SKEW = datetime.timedelta(minutes=1)
+
+
+@attr.s(slots=True)
+class _RepositoryState(object):
+    """Polling state of a repository."""
+
+    organization = attr.ib(type=str)
+    project = attr.ib(type=str)
+    since = attr.ib(type=str)
+    # Report changes found on the next poll, False for the first poll of a baseline.
+    report = attr.ib(type=bool)
+    etag = attr.ib(type=str, default=None)
+    next_poll = attr.ib(type=float, default=0.0)
+    # Issue number -> (updated_at, watched field values) of the last version seen.
+    seen = attr.ib(type=dict, default=attr.Factory(dict))
+
+    @property
+    def full_name(self) -> str:
+        """Get full name of the repository - owner/project."""
+        return '{}/{}'.format(self.organization, self.project)
+
+
+class IssuePoller(object):
+    """Poll repositories for created and changed issues."""
+
+    def __init__(self, repositories: typing.Iterable[str], interval: float = 60.0,
+                 since: typing.Union[datetime.datetime, str] = None, fields: typing.Iterable[str] = None,
+                 max_workers: int = 8):
+        """Initialize poller.
+
+        :param repositories: full names of polled repositories (owner/project)
+        :param interval: minimum number of seconds between polls of a repository, a longer interval requested by
+                         GitHub (X-Poll-Interval) is respected
+        :param since: report issues updated since the given time, if omitted, issues updated before the first poll
+                      are taken as a baseline and only changes made after it are reported
+        :param fields: watched issue fields (see WATCHED_FIELDS), an issue update that does not change any of them
+                       is not reported; all fields are watched by default
+        :param max_workers: maximum number of repositories polled at once
+        """
+        self.interval = interval
+        self.fields = tuple(fields) if fields else tuple(WATCHED_FIELDS)
+        self.max_workers = max_workers
+
+        unknown = set(self.fields) - set(WATCHED_FIELDS)
+        if unknown:
+            raise UserInputError("Unknown watched fields: {}".format(', '.join(sorted(unknown))))
+
+        report = since is not None
+        if since is None:
+            since = datetime.datetime.utcnow() - _CLOCK_SKEW
+        if isinstance(since, datetime.datetime):
+            since = serialize_datetime(since)
+
+        self._repositories = []
+        for repository in repositories:
+            if repository.count('/') != 1:
+                raise UserInputError("Repository has to be stated as owner/name, got {!r}".format(repository))
+            organization, project = repository.split('/')
+            self._repositories.append(_RepositoryState(organization, project, since=since, report=report))
+
+        if not self._repositories:
+            raise UserInputError("No repositories to poll")
+
+    def _get_values(self, issue: dict) -> tuple:
+        """Get values of watched fields of an issue."""
+        return tuple(WATCHED_FIELDS[field](issue) for field in self.fields)
+
+    def _get_event(self, state: _RepositoryState, issue: dict) -> typing.Optional[dict]:
+        """Get event for a listed issue, None if the issue did not change since the last version seen."""
+        seen = state.seen.get(issue['number'])
+        if seen is not None and seen[0] == issue['updated_at']:
+            # Listed again, the listing starts at the same point in time.
+            return None
+
+        values = self._get_values(issue)
+        state.seen[issue['number']] = (issue['updated_at'], values)
+        event = {
+            'event': EVENT_CHANGED,
+            'repository': state.full_name,
+            'number': issue['number'],
+            'updated_at': issue['updated_at'],
+        }
+
+        if seen is not None:
+            changes = {field: {'old': old, 'new': new}
+                       for field, old, new in zip(self.fields, seen[1], values) if old != new}
+            if not changes:
+                # Updated, but none of the watched fields changed.
+                return None
+            event['changes'] = changes
+        elif issue['created_at'] >= state.since:
+            event['event'] = EVENT_CREATED
+
+        event['issue'] = issue
+        return event
+
+    def _list_issues(self, state: _RepositoryState) -> typing.Tuple[typing.Optional[list], dict]:
+        """List issues updated since the listing start, return None if nothing changed since the last poll."""
+        query_attrs = {
+            'cls': Issue, 'filter': None, 'state': enums.IssueState.ALL, 'labels': None,
+            'sort': enums.Sorting.UPDATED, 'direction': enums.SortingDirection.DESC, 'since': state.since,
+            'milestone': None, 'assignee': None, 'creator': None, 'mentioned': None,
+        }
+        # pylint: disable=protected-access
+        uri = '/repos/{!s}/{!s}/issues?page=1&per_page={!s}&{!s}'.format(
+            state.organization, state.project, Configuration().per_page_listing,
+            Issue._get_issues_query_string(query_attrs)
+        )
+        # The first page is revalidated, it changes whenever any issue in the listing changes.
+        response, headers = Issue._call(uri, method='GET',
+                                        headers={'If-None-Match': state.etag} if state.etag else None)
+        if response is None:
+            return None, headers
+
+        issues = list(response)
+        if next_pagination_page(headers) is not None and Configuration().pagination:
+            listing = Issue.list_project_issues(state.organization, state.project, page=2,
+                                                state=enums.IssueState.ALL, sort=enums.Sorting.UPDATED,
+                                                direction=enums.SortingDirection.DESC, since=state.since, raw=True)
+            # Iterated explicitly, list.extend() would ask for length of the listing and so retrieve its last page.
+            issues.extend(iter(listing))
+        return issues, headers
+
+    def _poll_repository(self, state: _RepositoryState) -> typing.List[dict]:
+        """Poll a repository, return events of issues created or changed since the last poll."""
+        _LOG.debug("Polling repository %s for issues updated since %s", state.full_name, state.since)
+        try:
+            issues, headers = self._list_issues(state)
+        except (GithubcapException, requests.RequestException) as exc:
+            _LOG.debug("Failed to poll repository %s: %s", state.full_name, str(exc))
+            state.next_poll = time.monotonic() + self.interval
+            event = {'event': EVENT_ERROR, 'repository': state.full_name, 'error': str(exc)}
+            if isinstance(exc, HTTPError):
+                event['status_code'] = exc.status_code
+            return [event]
+
+        poll_interval = max(self.interval, float(headers.get('X-Poll-Interval', 0)))
+        state.next_poll = time.monotonic() + poll_interval
+        if issues is None:
+            _LOG.debug("No issue changed in repository %s", state.full_name)
+            return []
+
+        # The listing is revalidated only once it was retrieved completely, so no change is missed on failures.
+        state.etag = headers.get('ETag')
+
+        events = []
+        for issue in reversed(issues):
+            # Events are reported in the order issues were updated.
+            event = self._get_event(state, issue)
+            if event is not None and state.report:
+                events.append(event)
+
+        state.report = True
+        if len(issues) >= Configuration().per_page_listing:
+            # Keep the listing short, issues updated before the last one seen are not listed anymore.
+            state.since = max(issue['updated_at'] for issue in issues)
+            state.etag = None
+            state.seen = {number: seen for number, seen in state.seen.items() if seen[0] >= state.since}
+
+        return events
+
+    def poll(self) -> typing.List[dict]:
+        """Poll repositories that are due (all of them on the first poll), return events found."""
+        now = time.monotonic()
+        due = [state for state in self._repositories if state.next_poll <= now]
+        with ThreadPoolExecutor(max_workers=max(min(self.max_workers, len(due)), 1)) as executor:
+            return [event for events in executor.map(self._poll_repository, due) for event in events]
+
+    def watch(self, cycles: int = None) -> typing.Generator[dict, None, None]:
+        """Poll repositories repeatedly, events are yielded as they are found.
+
+        :param cycles: number of polling cycles, repositories are polled until the generator is closed if None
+        """
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            if cycle:
+                sleep_time = min(state.next_poll for state in self._repositories) - time.monotonic()
+                if sleep_time > 0:
+                    time.sleep(sleep_time)
+
+            yield from self.poll()
+            cycle += 1
@@ -33,10 +33,17 @@ setup(
     name='githubcap',
     version=get_version(),
     entry_points={
-        'console_scripts': ['githubcap-cli=githubcap.cli:cli']
+        'console_scripts': [
+            'githubcap-cli=githubcap.cli:cli',
+            'githubcap-client=githubcap.client:main',
+        ]
     },
     packages=find_packages(exclude=['test', 'test.*']),
     install_requires=get_requirements(),
+    python_requires='>=3.6',
+    extras_require={
+        'analytics': ['numpy'],
+    },
     author='Fridolin Pokorny',
     author_email='fridolin.pokorny@gmail.com',
     maintainer='Fridolin Pokorny',
@@ -49,8 +56,8 @@ setup(
     classifiers=[
         "Development Status :: 4 - Beta",
         "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.4",
-        "Programming Language :: Python :: 3.5",
+        "Programming Language :: Python :: 3.6",
+        "Programming Language :: Python :: 3.7",
         "Environment :: Console",
         "Intended Audience :: Developers",
         "License :: OSI Approved :: Apache Software License",
@@ -0,0 +1,71 @@
+"""Fixtures shared by tests - default configuration and a stubbed GitHub API."""
+
+import datetime
+import json
+import typing
+
+import pytest
+import requests
+
+import githubcap.base
+from githubcap.configuration import Configuration
+from githubcap.configuration import _ConfigurationSingleton
+
+
+class GitHubStub(object):
+    """A stub of GitHub API answering requests using a handler instead of sending them.
+
+    The handler is called with method, URL (without API prefix), request headers and JSON payload and returns
+    a tuple - status code, body (JSON serializable or bytes) and response headers.
+    """
+
+    def __init__(self, handler: typing.Callable = None):
+        """Initialize stub, requests are recorded as tuples of method and URL without API prefix."""
+        self.handler = handler
+        self.requests = []
+
+    def request(self, method: str, url: str, headers: dict = None, json: typing.Any = None,  # noqa: A002
+                **_: typing.Any) -> requests.Response:
+        """Answer a request using the handler."""
+        # pylint: disable=redefined-outer-name
+        uri = url[len(Configuration().github_api):]
+        self.requests.append((method, uri))
+        status_code, body, response_headers = self.handler(method, uri, headers or {}, json)
+        return make_response(status_code, body, response_headers, method=method, url=url)
+
+    def __getattr__(self, name: str) -> typing.Callable:
+        """Provide methods of requests session - get, post, patch, ..."""
+        if name not in ('get', 'post', 'patch', 'put', 'delete'):
+            raise AttributeError(name)
+        return lambda url, **kwargs: self.request(name.upper(), url, **kwargs)
+
+
+def make_response(status_code: int, body: typing.Any = None, headers: dict = None, method: str = 'GET',
+                  url: str = 'https://api.github.com/') -> requests.Response:
+    """Create an HTTP response as returned by requests."""
+    # pylint: disable=protected-access
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = body if isinstance(body, bytes) else json.dumps(body).encode()
+    response.headers.update(headers or {})
+    response.url = url
+    response.request = requests.Request(method, url).prepare()
+    response.elapsed = datetime.timedelta(0)
+    return response
+
+
+@pytest.fixture
+def configuration():
+    """Use default configuration (no configuration file is read) for the time of a test."""
+    saved_configuration = Configuration._instance  # pylint: disable=protected-access
+    Configuration._instance = _ConfigurationSingleton()  # pylint: disable=protected-access
+    yield Configuration()
+    Configuration._instance = saved_configuration  # pylint: disable=protected-access
+
+
+@pytest.fixture
+def github(monkeypatch, configuration):  # pylint: disable=redefined-outer-name,unused-argument
+    """Send requests of resources to a GitHub API stub, set handler of the returned stub to answer them."""
+    stub = GitHubStub()
+    monkeypatch.setattr(githubcap.base, '_get_session', lambda: stub)
+    return stub
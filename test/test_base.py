@@ -0,0 +1,50 @@
+"""Tests of base resource functionality."""
+
+import attr
+
+from githubcap.base import GitHubBase
+from githubcap.base import derived_urls
+
+
+@derived_urls(
+    events_url=('url', '/events'),
+    html_url=('login', '', 'https://github.com/'),
+)
+@attr.s
+class _Resource(GitHubBase):
+    """A resource with derived URLs."""
+
+    events_url = attr.ib(type=str)
+    html_url = attr.ib(type=str)
+    login = attr.ib(type=str)
+    url = attr.ib(type=str)
+
+
+def test_derived_urls_compacted():
+    """Test that URLs that can be derived are not stored, other values are kept as they are."""
+    resource = _Resource(events_url='https://api.github.com/users/fridex/events', html_url=None,
+                         login='fridex', url='https://api.github.com/users/fridex')
+    assert 'events_url' not in resource.__dict__
+    assert resource.events_url == 'https://api.github.com/users/fridex/events'
+    assert resource.html_url is None
+    assert attr.asdict(resource) == {
+        'events_url': 'https://api.github.com/users/fridex/events',
+        'html_url': None,
+        'login': 'fridex',
+        'url': 'https://api.github.com/users/fridex',
+    }
+
+
+def test_derived_urls_kept_on_base_change():
+    """Test that changing a base attribute does not change URLs derived from it."""
+    resource = _Resource(events_url='https://api.github.com/users/fridex/events',
+                         html_url='https://github.com/fridex', login='fridex', url='https://api.github.com/users/fridex')
+    resource.url = resource.url
+    assert resource.events_url == 'https://api.github.com/users/fridex/events'
+
+    resource.url = 'https://api.github.com/users/other'
+    resource.login = 'other'
+    assert resource.url == 'https://api.github.com/users/other'
+    assert resource.login == 'other'
+    assert resource.events_url == 'https://api.github.com/users/fridex/events'
+    assert resource.html_url == 'https://github.com/fridex'
@@ -0,0 +1,114 @@
+"""Tests of bulk issue operations and rate limit handling of API calls."""
+
+import time
+
+import pytest
+
+from githubcap.base import _get_rate_limit_wait
+from githubcap.batch import run_issue_batch
+from githubcap.bench import sample_response
+from githubcap.classes import Issue
+from githubcap.exceptions import HTTPError
+
+from .conftest import make_response
+
+
+@pytest.mark.parametrize('status_code,body,headers,expected', [
+    (200, {}, {}, None),
+    (404, {'message': 'Not Found'}, {}, None),
+    (403, {'message': 'You have exceeded a secondary rate limit.'}, {'Retry-After': '30'}, 30.0),
+    (429, b'', {'Retry-After': '5'}, 5.0),
+    (403, {'message': 'Resource not accessible by integration'}, {}, None),
+    # Bodies that are not JSON objects with message do not fail.
+    (403, b'<html>Forbidden</html>', {}, None),
+    (403, {'documentation_url': 'https://developer.github.com/v3'}, {}, None),
+    (403, ['API rate limit exceeded'], {}, None),
+    (429, b'', {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}, None),
+    # Rate limit exceeded, but no valid reset time.
+    (403, {'message': 'API rate limit exceeded for 127.0.0.1.'}, {}, None),
+    (403, {'message': 'API rate limit exceeded for 127.0.0.1.'}, {'X-RateLimit-Reset': 'soon'}, None),
+])
+def test_rate_limit_wait(status_code, body, headers, expected):
+    """Test that wait time is computed only for responses hitting rate limit."""
+    assert _get_rate_limit_wait(make_response(status_code, body, headers)) == expected
+
+
+def test_rate_limit_wait_reset():
+    """Test that wait time for primary rate limit is computed from reset time."""
+    response = make_response(403, {'message': 'API rate limit exceeded for 127.0.0.1.'},
+                             {'X-RateLimit-Reset': str(int(time.time()) + 60)})
+    assert 50 < _get_rate_limit_wait(response) <= 60
+
+    response.headers['X-RateLimit-Reset'] = str(int(time.time()) - 60)
+    assert _get_rate_limit_wait(response) == 0
+
+
+def test_rate_limit_retry(github, configuration, monkeypatch):
+    """Test that a request hitting rate limit is retried after waiting if configured so."""
+    sleeps = []
+    monkeypatch.setattr(time, 'sleep', sleeps.append)
+    responses = [
+        (403, {'message': 'You have exceeded a secondary rate limit.'}, {'Retry-After': '3'}),
+        (201, sample_response(Issue), {}),
+    ]
+    github.handler = lambda *_: responses.pop(0)
+
+    with pytest.raises(HTTPError) as exc_info:
+        Issue.create_by_attributes('fridex', 'githubcap', {'title': 'foo'}, raw=True)
+    assert exc_info.value.status_code == 403
+    assert 'secondary rate limit' in str(exc_info.value)
+
+    responses.insert(0, (403, {'message': 'You have exceeded a secondary rate limit.'}, {'Retry-After': '3'}))
+    configuration.omit_rate_limiting = True
+    issue = Issue.create_by_attributes('fridex', 'githubcap', {'title': 'foo'}, raw=True)
+    assert issue['number'] == sample_response(Issue)['number']
+    assert sleeps == [3.0]
+
+
+def test_http_error_not_json(github):
+    """Test that an error response that is not JSON is reported as HTTP error."""
+    github.handler = lambda *_: (502, b'Bad Gateway', {})
+    with pytest.raises(HTTPError) as exc_info:
+        Issue.create_by_attributes('fridex', 'githubcap', {'title': 'foo'}, raw=True)
+    assert exc_info.value.status_code == 502
+    assert str(exc_info.value) == 'Bad Gateway'
+
+
+def test_batch_error_per_operation(github, monkeypatch):
+    """Test that errors (including unexpected ones) are reported per operation and other operations are run."""
+    def handler(method, uri, headers, payload):
+        # pylint: disable=unused-argument
+        if payload.get('title') == 'forbidden':
+            return 403, {'message': 'Must have admin rights to Repository.'}, {}
+        if payload.get('title') == 'broken':
+            # A response that does not conform to issue schema.
+            return 201, {'number': 'x'}, {}
+        response = sample_response(Issue)
+        response['number'] = len(github.requests)
+        return 201, response, {}
+
+    github.handler = handler
+    original_create = Issue.create_by_attributes.__func__
+
+    def create_by_attributes(cls, organization, project, attributes, raw=False):
+        if attributes['title'] == 'unexpected':
+            raise RuntimeError("unexpected failure")
+        return original_create(cls, organization, project, attributes, raw=raw)
+
+    monkeypatch.setattr(Issue, 'create_by_attributes', classmethod(create_by_attributes))
+    lines = [
+        '{"title": "first"}',
+        '{"title": "forbidden"}',
+        'not json',
+        '{"title": "unexpected"}',
+        '{"title": "broken"}',
+        '{"title": "last"}',
+    ]
+    results = list(run_issue_batch(lines, repository='fridex/githubcap', max_workers=2))
+
+    assert [result['line'] for result in results] == [1, 2, 3, 4, 5, 6]
+    assert 'error' not in results[0] and 'error' not in results[5]
+    assert results[1]['status_code'] == 403
+    assert results[2]['error'].startswith('Invalid JSON')
+    assert results[3]['error'] == "Unexpected error: RuntimeError('unexpected failure')"
+    assert 'error' in results[4]
@@ -0,0 +1,13 @@
+"""Tests of benchmarks of hot paths."""
+
+from githubcap.bench import run_micro_benchmarks
+
+
+def test_micro_benchmarks():
+    """Test that micro benchmarks are run, resources not matching their schema are reported as skipped."""
+    results = run_micro_benchmarks(pattern='^(parse_datetime|from_response/(Issue|Team))$', repeat=1,
+                                   min_time=0.001)
+    assert set(results) == {'parse_datetime', 'from_response/Issue', 'skipped'}
+    assert results['parse_datetime']['number'] >= 1000
+    assert results['from_response/Issue']['min_us'] > 0
+    assert results['skipped']['from_response/Team'].startswith('SchemaValidationError')
@@ -0,0 +1,55 @@
+"""Tests of githubcap-cli command registration."""
+
+import os
+import subprocess
+import sys
+
+import click
+from click.testing import CliRunner
+import pytest
+
+import githubcap.commands
+from githubcap.cli import cli
+from githubcap.commands import COMMANDS
+
+# Interpreters without module __getattr__ (PEP 562) are simulated by faking version info before the first import.
+_OLD_INTERPRETER_IMPORT = """
+import collections
+import sys
+
+sys.version_info = collections.namedtuple('version_info', 'major minor micro releaselevel serial')(3, 6, 0, 'final', 0)
+
+import githubcap
+import githubcap.commands
+
+assert 'Configuration' in vars(githubcap)
+assert all(function_name in vars(githubcap.commands) for _, function_name, _ in githubcap.commands.COMMANDS.values())
+from githubcap.cli import cli
+"""
+
+
+@pytest.mark.parametrize('name', sorted(COMMANDS))
+def test_command_resolved(name):
+    """Test that each registered command is resolved by the CLI and available as a module attribute."""
+    with click.Context(cli) as ctx:
+        command = cli.get_command(ctx, name)
+
+    assert isinstance(command, click.Command)
+    assert command is getattr(githubcap.commands, COMMANDS[name][1])
+    result = CliRunner().invoke(cli, [name, '--help'])
+    assert result.exit_code == 0, result.output
+
+
+def test_commands_listed():
+    """Test that all registered commands are listed in help."""
+    result = CliRunner().invoke(cli, ['--help'])
+    assert result.exit_code == 0
+    for name in COMMANDS:
+        assert name in result.output
+
+
+def test_import_without_module_getattr():
+    """Test that the package and the CLI are importable on interpreters without module __getattr__."""
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join([os.getcwd()] + sys.path)
+    subprocess.run([sys.executable, '-c', _OLD_INTERPRETER_IMPORT], env=environment, check=True)
@@ -0,0 +1,126 @@
+"""Tests of githubcap-client forwarding commands to githubcap daemon."""
+
+import os
+import socket
+import threading
+
+import pytest
+
+from githubcap import client
+
+
+def _serve_once(server: socket.socket, received: list) -> None:
+    """Accept a connection, record frames received and report exit code 42 if a request was received."""
+    connection, _ = server.accept()
+    with connection:
+        stream = connection.makefile('rb')
+        frame_type, payload = client.receive_frame(stream)
+        received.append((frame_type, payload))
+        if frame_type == client.FRAME_REQUEST:
+            client.send_frame(connection, client.FRAME_STDOUT, b'output\n')
+            client.send_frame(connection, client.FRAME_EXIT, b'42')
+
+
+def _start_server(socket_path: str, received: list) -> threading.Thread:
+    """Start a fake daemon serving a single connection in a thread."""
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+
+    def serve():
+        with server:
+            _serve_once(server, received)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_frames():
+    """Test that frames are received as sent, a truncated frame is reported as a closed connection."""
+    sender, receiver = socket.socketpair()
+    with sender, receiver:
+        stream = receiver.makefile('rb')
+        client.send_frame(sender, client.FRAME_STDOUT, b'x' * 100000)
+        client.send_frame(sender, client.FRAME_STDIN)
+        assert client.receive_frame(stream) == (client.FRAME_STDOUT, b'x' * 100000)
+        assert client.receive_frame(stream) == (client.FRAME_STDIN, b'')
+
+        sender.sendall(b'O\x00\x00\x00\x10abc')
+        sender.shutdown(socket.SHUT_WR)
+        assert client.receive_frame(stream) == (None, b'')
+
+
+def test_forward(tmpdir, capfdbinary, monkeypatch):
+    """Test that a command is forwarded to a daemon of the current user together with its environment."""
+    monkeypatch.setenv('GITHUB_TOKEN', 'secret')
+    socket_path = str(tmpdir.join('daemon.sock'))
+    received = []
+    thread = _start_server(socket_path, received)
+
+    assert client.forward(['issues', 'fridex', 'githubcap'], socket_path=socket_path) == 42
+    thread.join()
+    assert received[0][0] == client.FRAME_REQUEST
+    assert b'"GITHUB_TOKEN": "secret"' in received[0][1]
+    assert capfdbinary.readouterr().out == b'output\n'
+
+
+def test_forward_foreign_socket(tmpdir, capsys, monkeypatch):
+    """Test that nothing is sent to a socket owned by another user."""
+    monkeypatch.setenv('GITHUB_TOKEN', 'secret')
+    socket_path = str(tmpdir.join('daemon.sock'))
+    received = []
+    thread = _start_server(socket_path, received)
+
+    uid = os.getuid()
+    monkeypatch.setattr(os, 'getuid', lambda: uid + 1)
+    assert client.forward(['issues', 'fridex', 'githubcap'], socket_path=socket_path) is None
+    thread.join()
+    # The connection was closed without sending any frame.
+    assert received == [(None, b'')]
+    assert 'owned by another user' in capsys.readouterr().err
+
+
+def test_forward_foreign_daemon(tmpdir, capsys, monkeypatch):
+    """Test that nothing is sent to a daemon run by another user."""
+    socket_path = str(tmpdir.join('daemon.sock'))
+    received = []
+    thread = _start_server(socket_path, received)
+
+    sender, receiver = socket.socketpair()
+    with sender, receiver:
+        assert client.get_peer_uid(sender) in (os.getuid(), None)
+
+    monkeypatch.setattr(client, 'get_peer_uid', lambda sock: os.getuid() + 1)
+    assert client.forward(['issues', 'fridex', 'githubcap'], socket_path=socket_path) is None
+    thread.join()
+    assert received == [(None, b'')]
+    assert 'served by another user' in capsys.readouterr().err
+
+
+def test_fallback_socket_path(monkeypatch):
+    """Test that the socket is placed in a per-user directory if there is no runtime directory."""
+    monkeypatch.delenv('GITHUBCAP_DAEMON_SOCKET', raising=False)
+    monkeypatch.delenv('XDG_RUNTIME_DIR', raising=False)
+    socket_path = client.get_socket_path()
+    assert socket_path == client.get_fallback_socket_path()
+    assert os.path.basename(os.path.dirname(socket_path)) == 'githubcap-{:d}'.format(os.getuid())
+
+
+def test_ensure_private_directory(tmpdir):
+    """Test that only a directory accessible solely by the current user is accepted for the socket."""
+    path = str(tmpdir.join('private'))
+    client.ensure_private_directory(path)
+    assert os.stat(path).st_mode & 0o777 == 0o700
+    # An existing private directory is fine.
+    client.ensure_private_directory(path)
+
+    os.chmod(path, 0o755)
+    with pytest.raises(PermissionError):
+        client.ensure_private_directory(path)
+
+    link = str(tmpdir.join('link'))
+    os.chmod(path, 0o700)
+    os.symlink(path, link)
+    with pytest.raises(PermissionError):
+        client.ensure_private_directory(link)
@@ -0,0 +1,78 @@
+"""Tests of columnar representation of issue listings."""
+
+import pytest
+
+from githubcap.bench import sample_response
+from githubcap.classes import Issue
+
+numpy = pytest.importorskip('numpy')
+
+# pylint: disable=wrong-import-position
+from githubcap.analytics import IssueColumns  # noqa: E402
+from githubcap.analytics import time_to_close  # noqa: E402
+from githubcap.analytics.columnar import MISSING  # noqa: E402
+
+
+def _issue(repository: str, number: int, milestone: tuple = None) -> dict:
+    """Create an issue as returned by GitHub API in the given repository, milestone is given by number and title."""
+    issue = sample_response(Issue)
+    issue.update({
+        'repository_url': 'https://api.github.com/repos/{}'.format(repository),
+        'number': number,
+        'id': 1000 + number,
+        'created_at': '2018-01-01T00:00:00Z',
+        'updated_at': '2018-01-02T00:00:00Z',
+        'closed_at': '2018-01-0{:d}T00:00:00Z'.format(number + 1),
+        'state': 'closed',
+    })
+    if milestone is None:
+        issue['milestone'] = None
+    else:
+        issue['milestone'] = dict(issue['milestone'], number=milestone[0], title=milestone[1])
+    return issue
+
+
+@pytest.mark.parametrize('raw', [True, False])
+def test_milestones_of_repositories(raw):
+    """Test that milestones sharing a title in different repositories are distinct."""
+    issues = [
+        _issue('fridex/githubcap', 1, (1, 'v1.0')),
+        _issue('fridex/other', 2, (1, 'v1.0')),
+        _issue('fridex/githubcap', 3, (1, 'v1.0')),
+        _issue('fridex/githubcap', 4, (2, 'v2.0')),
+        _issue('fridex/githubcap', 5),
+    ]
+    columns = IssueColumns.from_issues(issues if raw else (Issue.from_response(issue) for issue in issues))
+
+    assert columns.milestone.tolist() == [0, 1, 0, 2, MISSING]
+    assert columns.milestones.tolist() == ['v1.0', 'v1.0', 'v2.0']
+    assert columns.milestone_numbers.tolist() == [1, 1, 2]
+    assert columns.repositories[columns.milestone_repositories].tolist() == [
+        'fridex/githubcap', 'fridex/other', 'fridex/githubcap'
+    ]
+    assert columns.milestone_names.tolist() == ['fridex/githubcap: v1.0', 'fridex/other: v1.0', 'v2.0']
+
+    stats = time_to_close(columns, group_by='milestone').to_dict()
+    assert {name: value['count'] for name, value in stats.items()} == {
+        'fridex/githubcap: v1.0': 2, 'fridex/other: v1.0': 1, 'v2.0': 1
+    }
+
+
+def test_save_load(tmpdir):
+    """Test that columns are stored and loaded as they are."""
+    columns = IssueColumns.from_issues([_issue('fridex/githubcap', 1, (1, 'v1.0')), _issue('fridex/githubcap', 2)])
+    path = str(tmpdir.join('columns.npz'))
+    columns.save(path)
+    loaded = IssueColumns.load(path)
+    for name in IssueColumns.ARRAYS:
+        assert numpy.array_equal(getattr(loaded, name), getattr(columns, name))
+
+
+@pytest.mark.parametrize('raw', [True, False])
+def test_projected_issues_without_state(raw):
+    """Test that issues built using a projection without state have state missing."""
+    fields = ('repository_url', 'number', 'id', 'comments', 'created_at', 'updated_at', 'closed_at')
+    issues = [Issue.from_response(_issue('fridex/githubcap', 1), fields=fields, raw=raw)]
+    columns = IssueColumns.from_issues(issues)
+    assert columns.state.tolist() == [MISSING]
+    assert columns.number.tolist() == [1]
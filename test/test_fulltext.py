@@ -0,0 +1,55 @@
+"""Tests of local full-text index of issues."""
+
+import pytest
+
+from githubcap.exceptions import UserInputError
+from githubcap.storage import IssueIndex
+from githubcap.storage import IssueStore
+
+
+def _issue(repository: str, number: int, title: str) -> dict:
+    """Create an issue as returned by GitHub API, only attributes needed by the store are stated."""
+    return {
+        'repository_url': 'https://api.github.com/repos/{}'.format(repository),
+        'number': number,
+        'id': hash((repository, number)),
+        'state': 'open',
+        'title': title,
+        'body': None,
+        'comments': 0,
+        'created_at': '2018-01-01T00:00:00Z',
+        'updated_at': '2018-01-0{:d}T00:00:00Z'.format(number),
+    }
+
+
+def test_search_empty_index():
+    """Test that searching an empty index finds nothing."""
+    assert IssueIndex('fridex/githubcap').search('foo') == []
+
+
+def test_search():
+    """Test that issues are ranked, titles weigh more than bodies."""
+    index = IssueIndex('fridex/githubcap')
+    index.add({'number': 1, 'title': 'Crash on start', 'body': 'null pointer'})
+    index.add({'number': 2, 'title': 'Null pointer dereference', 'body': 'crash'})
+    index.add({'number': 3, 'title': 'Documentation', 'body': None})
+    assert index.search('"null pointer"') == [2, 1]
+    assert index.search('crash -documentation') == [1, 2]
+    assert index.search('documentation') == [3]
+
+
+def test_index_requires_repository():
+    """Test that documents keyed by issue numbers cannot mix repositories."""
+    with pytest.raises(UserInputError):
+        IssueIndex(None)
+
+
+def test_update_from_store():
+    """Test that only issues of the indexed repository are taken from a store holding multiple repositories."""
+    with IssueStore() as store:
+        store.upsert([_issue('fridex/githubcap', 1, 'Crash on start'), _issue('fridex/other', 1, 'Typo in docs')])
+        index = IssueIndex('fridex/githubcap')
+        assert index.update_from_store(store) == 1
+
+    assert index.search('crash') == [1]
+    assert index.search('typo') == []
@@ -0,0 +1,56 @@
+"""Tests of vectorized issue lifecycle metrics."""
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+# pylint: disable=wrong-import-position
+from githubcap.analytics import IssueColumns  # noqa: E402
+from githubcap.analytics import burndown  # noqa: E402
+from githubcap.analytics import label_throughput  # noqa: E402
+
+
+def _issue(number: int, created_at: str, updated_at: str, closed_at: str = None, labels: list = None) -> dict:
+    """Create an issue as returned by GitHub API, only attributes needed by columns are stated."""
+    return {
+        'repository_url': 'https://api.github.com/repos/fridex/githubcap',
+        'number': number,
+        'id': 1000 + number,
+        'state': 'closed' if closed_at else 'open',
+        'comments': 0,
+        'created_at': created_at,
+        'updated_at': updated_at,
+        'closed_at': closed_at,
+        'labels': [{'name': label} for label in labels or ()],
+    }
+
+
+def test_burndown_closed_after_last_update():
+    """Test that issues closed after their last update (inconsistent data) are accounted as closed."""
+    columns = IssueColumns.from_issues([
+        _issue(1, '2018-01-01T00:00:00Z', '2018-01-01T00:00:00Z', closed_at='2018-01-03T00:00:00Z'),
+        _issue(2, '2018-01-02T00:00:00Z', '2018-01-02T00:00:00Z'),
+    ])
+    series = burndown(columns, bucket='day')
+    assert series.to_dict() == {'all': {'2018-01-01': 1, '2018-01-02': 2, '2018-01-03': 1}}
+
+
+def test_burndown_closed_before_created():
+    """Test that an issue closed before it was created (clock skew) does not stay open."""
+    columns = IssueColumns.from_issues([
+        _issue(1, '2018-01-02T00:00:00Z', '2018-01-03T00:00:00Z', closed_at='2018-01-01T23:59:59Z'),
+    ])
+    series = burndown(columns, bucket='day')
+    assert series.times[0] == numpy.datetime64('2018-01-01')
+    assert series.values[0, -1] == 0
+
+
+def test_label_throughput():
+    """Test that issues opened and closed are counted per label in each time bucket."""
+    columns = IssueColumns.from_issues([
+        _issue(1, '2018-01-01T00:00:00Z', '2018-01-02T00:00:00Z', closed_at='2018-01-02T00:00:00Z', labels=['bug']),
+        _issue(2, '2018-01-01T00:00:00Z', '2018-01-01T00:00:00Z', closed_at='2018-01-03T00:00:00Z', labels=['bug']),
+    ])
+    opened, closed = label_throughput(columns, bucket='day')
+    assert opened.to_dict() == {'bug': {'2018-01-01': 2, '2018-01-02': 0, '2018-01-03': 0}}
+    assert closed.to_dict() == {'bug': {'2018-01-01': 0, '2018-01-02': 1, '2018-01-03': 1}}
@@ -0,0 +1,187 @@
+"""Tests of local directory snapshots of repositories."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.parse
+
+import pytest
+
+from githubcap.storage import mirror as mirror_module
+from githubcap.storage.mirror import Mirror
+from githubcap.storage.ndjson import ResourceLogReader
+
+_PER_PAGE = mirror_module._PER_PAGE  # pylint: disable=protected-access
+
+
+class _Listings(object):
+    """Listings served by GitHub API stub page by page with ETags, concurrent requests are tracked."""
+
+    def __init__(self, delay: float = 0):
+        """Initialize with no listings, each request takes the given time."""
+        self.listings = {}
+        self.failing = set()
+        self.delay = delay
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, method, uri, headers, payload):
+        """Answer a request for a listing page, the page is not modified if its ETag matches."""
+        # pylint: disable=unused-argument
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            return self._get_page(uri, headers)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _get_page(self, uri, headers):
+        """Get page of a listing, entries updated before 'since' are not listed."""
+        path, _, query_string = uri.partition('?')
+        query = dict(urllib.parse.parse_qsl(query_string))
+        if path in self.failing:
+            return 500, {'message': 'Server Error'}, {}
+
+        entries = [entry for entry in self.listings.get(path, [])
+                   if 'since' not in query or entry['updated_at'] >= query['since']]
+        page = int(query['page'])
+        per_page = int(query['per_page'])
+        last_page = max((len(entries) + per_page - 1) // per_page, 1)
+        content = entries[(page - 1) * per_page:page * per_page]
+        etag = '"{}"'.format(hashlib.sha1(json.dumps(content).encode()).hexdigest())
+        response_headers = {'ETag': etag}
+        if page < last_page:
+            response_headers['Link'] = '<https://api.github.com{0}?page={1}>; rel="next", ' \
+                                       '<https://api.github.com{0}?page={2}>; rel="last"'.format(path, page + 1,
+                                                                                                 last_page)
+        with self._lock:
+            self.requests.append((path, page, headers.get('If-None-Match') == etag))
+        if headers.get('If-None-Match') == etag:
+            return 304, b'', response_headers
+        return 200, content, response_headers
+
+
+def _issue(number: int, updated_at: str = None, title: str = None) -> dict:
+    """Create an issue, only attributes needed for mirroring are stated, issues are updated in order of numbers."""
+    return {
+        'number': number,
+        'updated_at': updated_at or '2018-01-01T{:02d}:{:02d}:00Z'.format(number // 60, number % 60),
+        'title': title or 'Issue {:d}'.format(number),
+    }
+
+
+@pytest.fixture
+def listings(github):
+    """Serve listings by GitHub API stub."""
+    github.handler = _Listings()
+    return github.handler
+
+
+def test_mirror_not_modified(listings, tmpdir):  # pylint: disable=redefined-outer-name
+    """Test that an unchanged repository costs only requests that were not modified."""
+    listings.listings['/repos/fridex/githubcap/issues'] = [_issue(number) for number in range(1, 151)]
+    directory = str(tmpdir.join('snapshot'))
+
+    result = Mirror(directory).mirror_repository('fridex', 'githubcap')
+    assert result == {'repository': 'fridex/githubcap', 'issues': {'updated': 150, 'requests': 2, 'not_modified': 0}}
+
+    # Only issues updated since the high-water mark are listed - the one updated at the mark.
+    result = Mirror(directory).mirror_repository('fridex', 'githubcap')
+    assert result['issues'] == {'updated': 1, 'requests': 1, 'not_modified': 0}
+
+    issues_path = os.path.join(directory, 'fridex', 'githubcap', 'issues.ndjson')
+    size = os.path.getsize(issues_path)
+    result = Mirror(directory).mirror_repository('fridex', 'githubcap')
+    assert result['issues'] == {'updated': 0, 'requests': 1, 'not_modified': 1}
+    assert listings.requests[-1] == ('/repos/fridex/githubcap/issues', 1, True)
+    assert os.path.getsize(issues_path) == size
+
+    listings.listings['/repos/fridex/githubcap/issues'][0] = _issue(1, '2018-01-02T00:00:00Z', title='Changed')
+    result = Mirror(directory).mirror_repository('fridex', 'githubcap')
+    assert result['issues'] == {'updated': 2, 'requests': 1, 'not_modified': 0}
+    with ResourceLogReader(issues_path) as log:
+        assert len(log) == 150
+        assert log.get(1)['title'] == 'Changed'
+
+    manifest = json.load(open(os.path.join(directory, Mirror.MANIFEST_FILE)))
+    assert manifest['repositories']['fridex/githubcap']['issues']['high_water_mark'] == '2018-01-02T00:00:00Z'
+
+
+def test_mirror_merge_pages(listings, tmpdir):  # pylint: disable=redefined-outer-name
+    """Test that pages that were not modified are taken from the previous snapshot."""
+    labels = [{'id': i, 'name': 'label-{:d}'.format(i)} for i in range(_PER_PAGE + 50)]
+    listings.listings['/repos/fridex/githubcap/labels'] = labels
+    directory = str(tmpdir.join('snapshot'))
+    labels_path = os.path.join(directory, 'fridex', 'githubcap', 'labels.json')
+
+    result = Mirror(directory, labels=True).mirror_repository('fridex', 'githubcap')
+    assert result['labels'] == {'modified': True, 'requests': 2, 'not_modified': 0, 'count': len(labels)}
+
+    labels[-1] = {'id': 1000, 'name': 'renamed'}
+    labels.append({'id': 1001, 'name': 'added'})
+    result = Mirror(directory, labels=True).mirror_repository('fridex', 'githubcap')
+    assert result['labels'] == {'modified': True, 'requests': 2, 'not_modified': 1, 'count': len(labels)}
+    assert json.load(open(labels_path)) == labels
+
+    result = Mirror(directory, labels=True).mirror_repository('fridex', 'githubcap')
+    assert result['labels'] == {'modified': False, 'requests': 2, 'not_modified': 2}
+
+    # The listing shrunk to a single page.
+    del labels[_PER_PAGE:]
+    labels[0] = {'id': 0, 'name': 'first'}
+    result = Mirror(directory, labels=True).mirror_repository('fridex', 'githubcap')
+    assert result['labels']['count'] == _PER_PAGE
+    assert json.load(open(labels_path)) == labels
+
+
+def test_mirror_manifest_atomic(listings, tmpdir, monkeypatch):  # pylint: disable=redefined-outer-name
+    """Test that manifest states only repositories mirrored and it is never left partially written."""
+    listings.listings['/repos/fridex/githubcap/issues'] = [_issue(1)]
+    listings.listings['/repos/fridex/other/issues'] = [_issue(1)]
+    listings.failing.add('/repos/fridex/broken/issues')
+    directory = str(tmpdir.join('snapshot'))
+    manifest_path = os.path.join(directory, Mirror.MANIFEST_FILE)
+
+    results = list(Mirror(directory).mirror_repositories([('fridex', 'githubcap'), ('fridex', 'broken')]))
+    assert results[1] == {'repository': 'fridex/broken', 'error': 'Server Error', 'status_code': 500}
+    manifest = json.load(open(manifest_path))
+    assert set(manifest['repositories']) == {'fridex/githubcap'}
+
+    original_dump = json.dump
+
+    def failing_dump(content, output_file, **kwargs):
+        original_dump(content, output_file, **kwargs)
+        output_file.seek(output_file.tell() // 2)
+        output_file.truncate()
+        raise OSError("No space left on device")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(mirror_module.json, 'dump', failing_dump)
+        with pytest.raises(OSError):
+            Mirror(directory).mirror_repository('fridex', 'other')
+
+    # Readers see the previous manifest, an interrupted run is started over.
+    assert json.load(open(manifest_path)) == manifest
+    assert Mirror(directory).mirror_repository('fridex', 'other')['issues']['updated'] == 1
+    assert set(json.load(open(manifest_path))['repositories']) == {'fridex/githubcap', 'fridex/other'}
+
+
+def test_mirror_shared_request_bound(listings, tmpdir):  # pylint: disable=redefined-outer-name
+    """Test that repositories mirrored at once share one bound of concurrent requests."""
+    listings.delay = 0.01
+    repositories = [('fridex', 'project{:d}'.format(i)) for i in range(4)]
+    for organization, project in repositories:
+        listings.listings['/repos/{}/{}/issues'.format(organization, project)] = [
+            _issue(number) for number in range(1, 4 * _PER_PAGE + 1)
+        ]
+
+    results = list(Mirror(str(tmpdir.join('snapshot')), max_workers=3).mirror_repositories(repositories))
+    assert [result['issues']['updated'] for result in results] == [4 * _PER_PAGE] * 4
+    assert listings.max_in_flight <= 3
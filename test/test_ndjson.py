@@ -0,0 +1,152 @@
+"""Tests of append-only NDJSON resource log."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from githubcap.exceptions import UserInputError
+from githubcap.storage import ndjson
+from githubcap.storage import ResourceLogReader
+from githubcap.storage import ResourceLogWriter
+from githubcap.storage.ndjson import get_index_path
+
+_CRASHING_WRITER = """
+import os
+import sys
+
+from githubcap.storage import ResourceLogWriter
+
+log = ResourceLogWriter(sys.argv[1])
+log.extend({'id': i, 'value': 'x' * (i % 50)} for i in range(10))
+log.flush()
+log.extend({'id': i, 'value': 'y' * (i % 50)} for i in range(5, 2000))
+# Crash without flushing, entries are left partially written in the log.
+log._log.write(b'{"id": 3000, "val')
+log._log.flush()
+os._exit(1)
+"""
+
+
+def _run_crashing_writer(path: str) -> None:
+    """Run a writer that crashes in the middle of appending in a separate process."""
+    environment = dict(os.environ)
+    environment['PYTHONPATH'] = os.pathsep.join([os.getcwd()] + sys.path)
+    process = subprocess.run([sys.executable, '-c', _CRASHING_WRITER, path], env=environment)
+    assert process.returncode == 1
+
+
+def test_log_crash_recovery(tmpdir):
+    """Test that a log is consistent with its index after a writer crashed without flushing."""
+    path = str(tmpdir.join('log.ndjson'))
+    _run_crashing_writer(path)
+
+    # Opening the log for writing indexes entries written before the crash.
+    ResourceLogWriter(path).close()
+
+    with ResourceLogReader(path) as log:
+        entries = list(log)
+        latest = {}
+        for entry in entries:
+            latest[entry['id']] = entry
+
+        assert len(log) == len(latest)
+        assert set(log.keys()) == set(latest)
+        for key, entry in latest.items():
+            assert log.get(key) == entry
+
+    # The incomplete entry at the end of the log was discarded.
+    with open(path, 'rb') as log_file:
+        assert log_file.read().endswith(b'\n')
+
+
+def test_log_index_refers_only_to_flushed_entries(tmpdir):
+    """Test that appended entries are indexed once they are flushed to the log."""
+    path = str(tmpdir.join('log.ndjson'))
+    with ResourceLogWriter(path) as writer:
+        writer.append({'id': 1, 'value': 'a'})
+        writer.flush()
+        writer.append({'id': 1, 'value': 'b'})
+        writer.append({'id': 2, 'value': 'c'})
+
+        with ResourceLogReader(path) as reader:
+            assert reader.get(1) == {'id': 1, 'value': 'a'}
+            assert reader.get(2) is None
+
+            writer.flush()
+            # The log is remapped once the reader gets an entry flushed after the log was opened.
+            assert reader.get(1) == {'id': 1, 'value': 'b'}
+            assert reader.get(2) == {'id': 2, 'value': 'c'}
+
+
+def test_log_get_incomplete_entry(tmpdir):
+    """Test that an entry without a trailing newline is not returned truncated."""
+    path = str(tmpdir.join('log.ndjson'))
+    with ResourceLogWriter(path) as writer:
+        writer.append({'id': 1, 'value': 'a'})
+
+    # Corrupt the log - strip newline of the last entry.
+    with open(path, 'rb+') as log_file:
+        log_file.truncate(os.path.getsize(path) - 1)
+
+    assert os.path.isfile(get_index_path(path))
+    with ResourceLogReader(path) as reader:
+        with pytest.raises(UserInputError):
+            reader.get(1)
+
+
+def test_log_reader_index_grown(tmpdir):
+    """Test that a reader opened before a writer grew the index reads the grown index."""
+    path = str(tmpdir.join('log.ndjson'))
+    with ResourceLogWriter(path) as writer:
+        writer.append({'id': 1, 'value': 'a'})
+        writer.flush()
+
+        with ResourceLogReader(path) as reader:
+            assert len(reader) == 1
+            generation = reader._index.generation  # pylint: disable=protected-access
+
+            writer.extend({'id': i, 'value': str(i)} for i in range(2, 5000))
+            writer.flush()
+
+            assert reader._index.generation == generation  # pylint: disable=protected-access
+            assert len(reader) == 4999
+            assert reader.get(4321) == {'id': 4321, 'value': '4321'}
+            assert reader.get(1) == {'id': 1, 'value': 'a'}
+            assert 5000 not in reader
+            assert set(reader.keys()) == set(range(1, 5000))
+            assert reader._index.generation > generation  # pylint: disable=protected-access
+
+
+@pytest.mark.parametrize('key', ['1', 1.0, True, None, 2 ** 63])
+def test_log_append_invalid_key(tmpdir, key):
+    """Test that a resource with a key that cannot be indexed is not appended to the log."""
+    path = str(tmpdir.join('log.ndjson'))
+    with ResourceLogWriter(path) as writer:
+        writer.append({'id': 1, 'value': 'a'})
+        with pytest.raises(UserInputError):
+            writer.append({'id': key, 'value': 'b'})
+
+    with ResourceLogReader(path) as reader:
+        assert list(reader) == [{'id': 1, 'value': 'a'}]
+
+
+def test_log_interrupted_index_rebuild(tmpdir, monkeypatch):
+    """Test that an index left in the middle of a rebuild is not read and it is rebuilt by a writer."""
+    path = str(tmpdir.join('log.ndjson'))
+    with ResourceLogWriter(path) as writer:
+        writer.extend({'id': i, 'value': str(i)} for i in range(10))
+        # Simulate a writer crashed while rebuilding the index.
+        writer._index.generation += 1  # pylint: disable=protected-access
+        writer._index.count = 0  # pylint: disable=protected-access
+
+    monkeypatch.setattr(ndjson, '_REBUILD_TIMEOUT', 0.01)
+    with ResourceLogReader(path) as reader:
+        with pytest.raises(UserInputError):
+            reader.get(1)
+
+    ResourceLogWriter(path).close()
+    with ResourceLogReader(path) as reader:
+        assert len(reader) == 10
+        assert reader.get(7) == {'id': 7, 'value': '7'}
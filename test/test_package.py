@@ -0,0 +1,15 @@
+"""Tests of lazily imported package namespace."""
+
+import os
+import pkgutil
+
+import githubcap
+
+
+def test_submodules_lazily_accessible():
+    """Test that all submodules are accessible as attributes of the package namespace."""
+    names = {module.name for module in pkgutil.iter_modules([os.path.dirname(githubcap.__file__)])}
+    # pylint: disable=protected-access
+    assert names == githubcap._LAZY_SUBMODULES
+    for name in names:
+        assert getattr(githubcap, name).__name__ == 'githubcap.' + name
@@ -0,0 +1,118 @@
+"""Tests of paginated listing helpers."""
+
+import pytest
+
+from githubcap.classes import Issue
+from githubcap.pagination import ListingCheckpoint
+from githubcap.pagination import PaginatedList
+
+
+class _Pages(object):
+    """Pages of a listing of the given size, retrieved pages are recorded."""
+
+    def __init__(self, size: int, per_page: int):
+        """Initialize listing of integers 0..size-1."""
+        self.size = size
+        self.last_page = max((size + per_page - 1) // per_page, 1)
+        self.requested = []
+
+    def __call__(self, page: int, per_page: int):
+        """Retrieve a page, pagination is stated in Link header as GitHub does."""
+        self.requested.append(page)
+        headers = {}
+        if page < self.last_page:
+            headers['Link'] = '<https://api.github.com/x?page={}>; rel="next", ' \
+                              '<https://api.github.com/x?page={}>; rel="last"'.format(page + 1, self.last_page)
+        return list(range((page - 1) * per_page, min(page * per_page, self.size))), headers
+
+
+def test_paginated_list_iteration_does_not_compute_length():
+    """Test that iteration retrieves each page once, in order."""
+    pages = _Pages(45, 10)
+    listing = PaginatedList(pages, per_page=10)
+    assert [entry for entry in listing] == list(range(45))
+    assert pages.requested == [1, 2, 3, 4, 5]
+
+
+def test_paginated_list_length():
+    """Test that length is computed out of the first and the last page."""
+    pages = _Pages(45, 10)
+    listing = PaginatedList(pages, per_page=10)
+    assert listing[3] == 3
+    assert pages.requested == [1]
+    assert len(listing) == 45
+    assert pages.requested == [1, 5]
+    assert listing[-1] == 44
+    assert listing[-12:-9] == [33, 34, 35]
+    assert pages.requested == [1, 5, 4]
+
+
+def test_paginated_list_index_out_of_range():
+    """Test indexing past the end of listing."""
+    pages = _Pages(5, 10)
+    listing = PaginatedList(pages, per_page=10)
+    with pytest.raises(IndexError):
+        listing[5]  # pylint: disable=pointless-statement
+    with pytest.raises(IndexError):
+        listing[-6]  # pylint: disable=pointless-statement
+    assert len(listing) == 5
+
+
+def test_paginated_list_to_list():
+    """Test that list() retrieves each page once even if pages do not fit into cache."""
+    pages = _Pages(95, 5)
+    listing = PaginatedList(pages, per_page=5, max_cached_pages=4)
+    assert list(listing) == list(range(95))
+    assert sorted(pages.requested) == list(range(1, 20))
+
+
+def test_listings_page_size(github, configuration):
+    """Test that generator listings and lazy listings request the same page size, so pages line up."""
+    # pylint: disable=protected-access
+    configuration.per_page_listing = 2
+
+    def handler(method, uri, headers, payload):
+        # pylint: disable=unused-argument
+        page = int(uri.split('page=')[1].split('&')[0])
+        link = '<https://api.github.com/x?page={}>; rel="next", <https://api.github.com/x?page=3>; rel="last"'
+        return 200, [{'id': page * 10 + i} for i in range(2 if page < 3 else 1)], \
+            {'Link': link.format(page + 1)} if page < 3 else {}
+
+    github.handler = handler
+    entries = [entry for entry, _ in Issue._do_listing('/repos/fridex/githubcap/issues', 'state=all', page=1)]
+    listing = Issue._do_paginated_listing('/repos/fridex/githubcap/issues', 'state=all', page=1)
+    assert [entry for entry in listing] == entries
+    assert len(listing) == len(entries) == 5
+    assert all('per_page=2&' in uri for _, uri in github.requests)
+
+
+def test_listing_resume(github, configuration, tmpdir):
+    """Test that a resumed listing skips items seen before and keeps its position on pages with no new items."""
+    # pylint: disable=protected-access
+    configuration.per_page_listing = 2
+    # Two items were added to the beginning of the listing since the checkpoint, so the resumed page holds
+    # only items seen before.
+    items = [{'id': item_id} for item_id in (8, 9, 1, 2, 3, 4, 5)]
+
+    def handler(method, uri, headers, payload):
+        # pylint: disable=unused-argument
+        page = int(uri.split('page=')[1].split('&')[0])
+        link = '<https://api.github.com/x?page={}>; rel="next", <https://api.github.com/x?page=4>; rel="last"'
+        return 200, items[(page - 1) * 2:page * 2], {'Link': link.format(page + 1)} if page < 4 else {}
+
+    github.handler = handler
+    resume = str(tmpdir.join('listing.json'))
+    checkpoint = ListingCheckpoint(resume, '/repos/fridex/githubcap/issues', 'state=all', 2)
+    checkpoint.save(page=2, last_completed_page=1, last_item=2)
+
+    listing = Issue._do_listing('/repos/fridex/githubcap/issues', 'state=all', page=1, resume=resume)
+    assert next(listing)[0] == {'id': 3}
+    # The resumed page 2 yields nothing new, the checkpoint still refers to the last item seen.
+    assert checkpoint.load()['last_item'] == 2
+    assert checkpoint.load()['page'] == 3
+    listing.close()
+
+    # Resuming again from page 3 sees items that were not yielded before the interruption.
+    assert [entry for entry, _ in Issue._do_listing('/repos/fridex/githubcap/issues', 'state=all',
+                                                    resume=resume)] == [{'id': 3}, {'id': 4}, {'id': 5}]
+    assert checkpoint.load() is None
@@ -0,0 +1,121 @@
+"""Tests of projections of resources to requested fields."""
+
+import pytest
+
+from githubcap.bench import sample_response
+from githubcap.classes import Issue
+from githubcap.exceptions import SchemaValidationError
+from githubcap.exceptions import UserInputError
+
+_FIELDS = ('number', 'user.login', 'labels.name', 'milestone.creator.login')
+
+
+def test_compile_projection():
+    """Test that nested fields are compiled to a tree of attributes, a whole attribute wins over its parts."""
+    # pylint: disable=protected-access
+    assert Issue._compile_projection(_FIELDS) == {
+        'number': None,
+        'user': {'login': None},
+        'labels': {'name': None},
+        'milestone': {'creator': {'login': None}},
+    }
+    assert Issue._compile_projection(('user.login', 'user', 'user.id')) == {'user': None}
+    assert Issue._compile_projection((' number ',)) == {'number': None}
+    assert Issue._get_projection('number,user.login') == {'number': None, 'user': {'login': None}}
+    assert Issue._get_projection(None) is None
+
+
+@pytest.mark.parametrize('field', [
+    'unknown',
+    'user.unknown',
+    # Not a resource, no nested fields can be requested.
+    'number.foo',
+    'labels.name.foo',
+    'user..login',
+    '',
+])
+def test_compile_projection_invalid(field):
+    """Test that invalid field paths are reported."""
+    with pytest.raises(UserInputError):
+        Issue._compile_projection(('number', field))  # pylint: disable=protected-access
+
+
+def test_from_response_projected(configuration):  # pylint: disable=unused-argument
+    """Test that only requested fields are parsed, nested ones included."""
+    response = sample_response(Issue)
+    issue = Issue.from_response(response, fields=_FIELDS)
+
+    assert issue.number == response['number']
+    assert issue.title is None
+    assert issue.user.login == response['user']['login']
+    assert issue.user.id is None
+    assert [label.name for label in issue.labels] == [label['name'] for label in response['labels']]
+    assert issue.labels[0].color is None
+    assert issue.milestone.creator.login == response['milestone']['creator']['login']
+    assert issue.milestone.title is None
+    assert issue.to_dict(_FIELDS) == {
+        'number': response['number'],
+        'user': {'login': response['user']['login']},
+        'labels': [{'name': label['name']} for label in response['labels']],
+        'milestone': {'creator': {'login': response['milestone']['creator']['login']}},
+    }
+
+
+def test_validation_projected(configuration):  # pylint: disable=unused-argument
+    """Test that only requested fields are validated."""
+    response = sample_response(Issue)
+    response['title'] = 42
+    response['user']['id'] = 'not a number'
+    del response['body']
+
+    with pytest.raises(SchemaValidationError):
+        Issue.from_response(response)
+
+    # Fields not requested are neither validated, nor required.
+    Issue.validate_response(response, _FIELDS)
+    Issue.validate_response({'number': 1, 'user': {'login': 'fridex'}}, 'number,user.login')
+    assert Issue.from_response(response, fields=_FIELDS).user.login == response['user']['login']
+
+    for field in ('title', 'user.id', 'user'):
+        with pytest.raises(SchemaValidationError):
+            Issue.validate_response(response, ('number', field))
+
+    response['user']['login'] = None
+    with pytest.raises(SchemaValidationError):
+        Issue.from_response(response, fields=_FIELDS)
+
+
+def test_from_response_raw(configuration):  # pylint: disable=unused-argument
+    """Test that raw output is the validated response restricted to requested fields."""
+    response = sample_response(Issue)
+    assert Issue.from_response(response, raw=True) is response
+
+    raw = Issue.from_response(response, fields=_FIELDS, raw=True)
+    assert raw == {
+        'number': response['number'],
+        'user': {'login': response['user']['login']},
+        'labels': [{'name': label['name']} for label in response['labels']],
+        'milestone': {'creator': {'login': response['milestone']['creator']['login']}},
+    }
+    assert raw == Issue.from_response(response, fields=_FIELDS).to_dict(_FIELDS)
+
+    response['milestone'] = None
+    assert Issue.from_response(response, fields='number,milestone.title', raw=True) == {
+        'number': response['number'], 'milestone': None
+    }
+
+
+def test_from_response_raw_validated(configuration):
+    """Test that raw output is validated, unless validation is turned off."""
+    response = sample_response(Issue)
+    response['user']['login'] = 42
+
+    for fields in (None, _FIELDS):
+        with pytest.raises(SchemaValidationError):
+            Issue.from_response(response, fields=fields, raw=True)
+
+    # Fields that were not requested are not validated.
+    assert Issue.from_response(response, fields='number', raw=True) == {'number': response['number']}
+
+    configuration.validate_schemas = False
+    assert Issue.from_response(response, fields=_FIELDS, raw=True)['user'] == {'login': 42}
@@ -0,0 +1,115 @@
+"""Tests of streaming JSON serialization of resources."""
+
+import copy
+import datetime
+import enum
+import io
+import json
+import typing
+
+import attr
+import pytest
+
+from githubcap import classes
+from githubcap.base import GitHubBase
+from githubcap.bench import sample_response
+from githubcap.classes import Issue
+from githubcap.serialization import dump_json
+from githubcap.serialization import dump_ndjson
+from githubcap.serialization import to_json
+from githubcap.utils import dict2json
+from githubcap.utils import serialize_datetime
+
+
+def test_to_json_compact():
+    """Test that compact JSON has no whitespaces between items, keys and values."""
+    assert to_json({'a': [1, 2], 'b': {}}, pretty=False) == '{"a":[1,2],"b":{}}'
+    assert to_json({'a': [1, 2], 'b': {}}, pretty=False) == dict2json({'a': [1, 2], 'b': {}}, pretty=False)
+
+
+def test_dump_json_compact():
+    """Test that a compact JSON array is written item by item without whitespaces."""
+    stream = io.StringIO()
+    dump_json(iter([{'a': 1}, [2, 3]]), stream, pretty=False)
+    assert stream.getvalue() == '[{"a":1},[2,3]]'
+
+
+def test_dump_ndjson():
+    """Test exact bytes written as newline delimited JSON."""
+    stream = io.BytesIO()
+    assert dump_ndjson(iter([{'a': [1, 2], 'b': 'x y'}, [], None]), stream) == 3
+    assert stream.getvalue() == b'{"a":[1,2],"b":"x y"}\n[]\nnull\n'
+
+# Resources with nested resources, enums, datetimes and lists of them.
+_RESOURCE_CLASSES = (
+    classes.GitTree,
+    classes.Hook,
+    classes.Issue,
+    classes.IssueComment,
+    classes.Migration,
+    classes.Milestone,
+    classes.Release,
+    classes.Repository,
+    classes.SearchResults,
+)
+
+
+def _to_dict_generic(value: typing.Any) -> typing.Any:
+    """Create a dictionary representation of a resource by generic type dispatching on each value."""
+    if isinstance(value, GitHubBase):
+        return {attribute.name: _to_dict_generic(getattr(value, attribute.name))
+                for attribute in attr.fields(value.__class__)}
+    elif isinstance(value, datetime.datetime):
+        return serialize_datetime(value)
+    elif isinstance(value, enum.Enum):
+        return value.value
+    elif isinstance(value, list):
+        return [_to_dict_generic(item) for item in value]
+
+    return value
+
+
+def _get_resources(resource_class: type) -> typing.List[GitHubBase]:
+    """Get resources of the given class - a complete one, one with values missing and one with values of other types."""
+    complete = resource_class.from_response(sample_response(resource_class))
+    missing = resource_class(**{attribute.name: None for attribute in attr.fields(resource_class)})
+    # Values that do not match declared types are serialized the same way as by generic dispatching.
+    other_types = copy.copy(complete)
+    for attribute in attr.fields(resource_class):
+        value = getattr(complete, attribute.name)
+        if isinstance(value, (list, datetime.datetime, enum.Enum, GitHubBase)):
+            setattr(other_types, attribute.name, _to_dict_generic(value))
+    return [complete, missing, other_types]
+
+
+@pytest.mark.parametrize('resource_class', _RESOURCE_CLASSES, ids=lambda resource_class: resource_class.__name__)
+def test_serialization_equivalence(resource_class):
+    """Test that compiled to_dict() and streamed JSON give the same output as generic serialization."""
+    resources = _get_resources(resource_class)
+    for resource in resources:
+        expected = _to_dict_generic(resource)
+        assert resource.to_dict() == expected
+        for pretty in (True, False):
+            assert to_json(resource, pretty=pretty) == dict2json(expected, pretty=pretty)
+
+    expected = [_to_dict_generic(resource) for resource in resources]
+    for pretty in (True, False):
+        stream = io.StringIO()
+        dump_json(iter(resources), stream, pretty=pretty)
+        assert stream.getvalue() == dict2json(expected, pretty=pretty)
+
+    stream = io.StringIO()
+    dump_ndjson(resources, stream)
+    assert stream.getvalue() == ''.join(dict2json(item, pretty=False) + '\n' for item in expected)
+
+
+def test_serialization_nested_values():
+    """Test that nested resources, enums, datetimes and lists of them are serialized in plain values."""
+    issue = Issue.from_response(sample_response(Issue))
+    result = issue.to_dict()
+    assert result['state'] == issue.state.value
+    assert result['created_at'] == serialize_datetime(issue.created_at)
+    assert result['user']['login'] == issue.user.login
+    assert [label['name'] for label in result['labels']] == [label.name for label in issue.labels]
+    assert result['milestone']['creator'] == issue.milestone.creator.to_dict()
+    assert json.loads(to_json(issue)) == result
@@ -0,0 +1,108 @@
+"""Tests of local SQLite store of issues."""
+
+import json
+import sqlite3
+
+import pytest
+
+import githubcap.enums as enums
+from githubcap.exceptions import UserInputError
+from githubcap.storage import IssueStore
+
+# Schema of stores created before issues were stored in indexed columns (schema version 0).
+_UNVERSIONED_SCHEMA_SQL = """
+CREATE TABLE issues (
+    repository TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    id INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (repository, number)
+);
+CREATE TABLE sync_state (
+    scope TEXT PRIMARY KEY,
+    high_water_mark TEXT NOT NULL
+);
+"""
+
+
+def _issue(number: int, comments: int = 0, labels: list = None) -> dict:
+    """Create an issue as returned by GitHub API, only attributes needed by the store are stated."""
+    return {
+        'repository_url': 'https://api.github.com/repos/fridex/githubcap',
+        'number': number,
+        'id': 1000 + number,
+        'state': 'open',
+        'title': 'Issue {:d}'.format(number),
+        'comments': comments,
+        'labels': [{'name': label} for label in labels or ()],
+        'assignees': [],
+        'milestone': None,
+        'created_at': '2018-01-0{:d}T00:00:00Z'.format(number),
+        'updated_at': '2018-02-0{:d}T00:00:00Z'.format(10 - number),
+    }
+
+
+def test_migrate_unversioned_store(tmpdir):
+    """Test that a store created with the schema without indexed columns is migrated on open."""
+    path = str(tmpdir.join('issues.db'))
+    connection = sqlite3.connect(path)
+    connection.executescript(_UNVERSIONED_SCHEMA_SQL)
+    with connection:
+        for issue in (_issue(1, labels=['bug']), _issue(2)):
+            connection.execute('INSERT INTO issues VALUES (?, ?, ?, ?, ?)', (
+                'fridex/githubcap', issue['number'], issue['id'], issue['updated_at'], json.dumps(issue)
+            ))
+        connection.execute('INSERT INTO sync_state VALUES (?, ?)', ('fridex/githubcap', '2018-02-09T00:00:00Z'))
+    connection.close()
+
+    with IssueStore(path) as store:
+        assert store.get_high_water_mark('fridex/githubcap') == '2018-02-09T00:00:00Z'
+        assert [issue['number'] for issue in store.query(raw=True)] == [2, 1]
+        assert [issue['number'] for issue in store.query(labels=['bug'], raw=True)] == [1]
+
+    connection = sqlite3.connect(path)
+    assert connection.execute('PRAGMA user_version').fetchone()[0] > 0
+    assert connection.execute("SELECT name FROM sqlite_master WHERE name = 'issues_unmigrated'").fetchone() is None
+    connection.close()
+
+    # Opening a migrated store keeps its content.
+    with IssueStore(path) as store:
+        assert len(list(store.query(raw=True))) == 2
+
+
+def test_open_store_of_newer_version(tmpdir):
+    """Test that a store created by a newer version is not opened."""
+    path = str(tmpdir.join('issues.db'))
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA user_version = 1000')
+    connection.close()
+
+    with pytest.raises(UserInputError):
+        IssueStore(path)
+
+
+@pytest.mark.parametrize('sort,direction,expected', [
+    (None, None, [3, 2, 1]),
+    (enums.Sorting.UPDATED, enums.SortingDirection.ASC, [3, 2, 1]),
+    ('updated', 'desc', [1, 2, 3]),
+    ('COMMENTS', 'ASC', [2, 3, 1]),
+])
+def test_query_sort(sort, direction, expected):
+    """Test that sorting criteria and direction are accepted as enum members, their values and names."""
+    with IssueStore() as store:
+        store.upsert([_issue(1, comments=5), _issue(2, comments=0), _issue(3, comments=1)])
+        assert [issue['number'] for issue in store.query(sort=sort, direction=direction, raw=True)] == expected
+
+
+@pytest.mark.parametrize('sort,direction', [
+    ('popularity', None),
+    (None, 'up'),
+    (None, 'desc; DROP TABLE issues'),
+    (enums.SortingDirection.ASC, None),
+])
+def test_query_invalid_sort(sort, direction):
+    """Test that invalid sorting criteria and direction are reported."""
+    with IssueStore() as store:
+        with pytest.raises(UserInputError):
+            list(store.query(sort=sort, direction=direction))
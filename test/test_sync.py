@@ -0,0 +1,119 @@
+"""Tests of incremental synchronization of issues into a local store."""
+
+import urllib.parse
+
+import pytest
+
+import githubcap.enums as enums
+from githubcap.bench import sample_response
+from githubcap.classes import Issue
+from githubcap.storage import IssueStore
+from githubcap.storage import IssueSync
+
+
+def _issue(number: int, updated_at: str, title: str = None) -> dict:
+    """Create an issue as returned by GitHub API."""
+    issue = sample_response(Issue)
+    issue.update({
+        'repository_url': 'https://api.github.com/repos/fridex/githubcap',
+        'number': number,
+        'id': 1000 + number,
+        'title': title or 'Issue {:d}'.format(number),
+        'created_at': '2017-12-{:02d}T00:00:00Z'.format(number),
+        'updated_at': updated_at,
+    })
+    return issue
+
+
+class _Issues(object):
+    """Issues of a repository served by GitHub API stub, queries are recorded."""
+
+    def __init__(self):
+        """Initialize with no issues."""
+        self.issues = {}
+        self.queries = []
+
+    def __call__(self, method, uri, headers, payload):
+        """List issues updated since the given time (inclusive) from the most recently updated ones."""
+        # pylint: disable=unused-argument
+        path, _, query_string = uri.partition('?')
+        assert path == '/repos/fridex/githubcap/issues'
+        query = dict(urllib.parse.parse_qsl(query_string))
+        self.queries.append(query)
+        if query.get('page', '1') != '1':
+            return 200, [], {}
+
+        issues = [issue for issue in self.issues.values() if issue['updated_at'] >= query.get('since', '')]
+        return 200, sorted(issues, key=lambda issue: issue['updated_at'], reverse=True), {}
+
+
+@pytest.fixture
+def issues(github):
+    """Serve issues of fridex/githubcap by GitHub API stub."""
+    github.handler = _Issues()
+    return github.handler
+
+
+def test_sync_project(issues):  # pylint: disable=redefined-outer-name
+    """Test that issues updated since the last synchronization are stored and the high-water mark is moved."""
+    issues.issues[1] = _issue(1, '2018-01-01T00:00:00Z')
+    issues.issues[2] = _issue(2, '2018-01-02T00:00:00Z')
+    scope = IssueSync.get_project_scope('fridex', 'githubcap')
+
+    with IssueStore() as store:
+        sync = IssueSync(store)
+        assert sync.sync_project('fridex', 'githubcap') == 2
+        assert store.get_high_water_mark(scope) == '2018-01-02T00:00:00Z'
+        assert 'since' not in issues.queries[-1]
+        assert issues.queries[-1]['state'] == 'all'
+        assert issues.queries[-1]['sort'] == 'updated'
+        assert issues.queries[-1]['direction'] == 'desc'
+
+        # The issue at the high-water mark is listed again, but it is not stored again.
+        assert sync.sync_project('fridex', 'githubcap') == 0
+        assert issues.queries[-1]['since'] == '2018-01-02T00:00:00Z'
+        assert store.get_high_water_mark(scope) == '2018-01-02T00:00:00Z'
+
+        # An issue updated at the high-water mark after the previous synchronization is stored.
+        issues.issues[3] = _issue(3, '2018-01-02T00:00:00Z')
+        issues.issues[2] = _issue(2, '2018-01-02T00:00:00Z', title='Changed')
+        assert sync.sync_project('fridex', 'githubcap') == 2
+        assert store.get('fridex/githubcap', 2, raw=True)['title'] == 'Changed'
+        assert store.count() == 3
+
+        issues.issues[1] = _issue(1, '2018-01-03T00:00:00Z', title='Updated')
+        assert sync.sync_project('fridex', 'githubcap') == 1
+        assert store.get('fridex/githubcap', 1, raw=True)['title'] == 'Updated'
+        assert store.get_high_water_mark(scope) == '2018-01-03T00:00:00Z'
+        assert sync.sync_project('fridex', 'githubcap') == 0
+
+
+def test_sync_query(issues):  # pylint: disable=redefined-outer-name
+    """Test that synchronized issues are queried by state, milestone, assignee and update time."""
+    for number in range(1, 5):
+        issues.issues[number] = _issue(number, '2018-01-0{:d}T00:00:00Z'.format(number))
+    issues.issues[1]['state'] = 'closed'
+    issues.issues[2]['milestone'] = None
+    issues.issues[3]['milestone'] = dict(issues.issues[3]['milestone'], number=7, title='v7')
+    issues.issues[4]['assignees'] = []
+    milestone = issues.issues[1]['milestone']
+
+    with IssueStore() as store:
+        assert IssueSync(store).sync_project('fridex', 'githubcap') == 4
+
+        def query(**filters):
+            return [issue['number'] for issue in store.query(sort='created', direction='asc', raw=True, **filters)]
+
+        assert query() == [1, 2, 3, 4]
+        assert query(repository='fridex/other') == []
+        assert query(state=enums.IssueState.OPEN) == [2, 3, 4]
+        assert query(state='closed') == [1]
+        assert query(state=enums.IssueState.ALL) == [1, 2, 3, 4]
+        assert query(milestone=milestone['number']) == [1, 4]
+        assert query(milestone='v7') == [3]
+        assert query(milestone='none') == [2]
+        assert query(milestone='*') == [1, 3, 4]
+        assert query(assignee='none') == [4]
+        assert query(assignee=issues.issues[1]['assignees'][0]['login']) == [1, 2, 3]
+        assert query(updated_since='2018-01-02T00:00:00Z', updated_until='2018-01-03T00:00:00Z') == [2, 3]
+        assert query(state='open', milestone='*', number=[1, 3, 4], limit=1) == [3]
@@ -1,3 +1,88 @@
+"""Tests of utilities for githubcap project."""
 
-def test_utils():
-    pass
+import datetime
+
+import pytest
+
+from githubcap import utils
+
+_DATETIME_STRINGS = [
+    '2018-03-04T05:06:07Z',
+    '1999-12-31T23:59:59Z',
+    '0999-01-01T00:00:00Z',
+    '2016-02-29T12:00:00Z',
+    # Invalid dates matching the canonical form.
+    '2018-02-30T00:00:00Z',
+    '2018-13-01T00:00:00Z',
+    '2018-01-01T24:00:00Z',
+    # Forms that are not canonical, but accepted by strptime.
+    '2018-3-4T5:6:7Z',
+    # Offsets, fractional seconds and a missing Z are not accepted.
+    '2018-03-04T05:06:07+00:00',
+    '2018-03-04T05:06:07+02:00Z',
+    '2018-03-04T05:06:07.123Z',
+    '2018-03-04T05:06:07.123456Z',
+    '2018-03-04T05:06:07',
+    '2018-03-04T05:06:07z',
+    '2018-03-04 05:06:07Z',
+    '2018-03-04T05:06:07Z ',
+    '2018-03-04T05:06:07Z\n',
+    '٢018-03-04T05:06:07Z',
+    '',
+]
+
+
+def _strptime(datetime_string: str) -> datetime.datetime:
+    """Parse datetime the way it was parsed before fast path was introduced."""
+    return datetime.datetime.strptime(datetime_string, utils._DATETIME_ISO_8601)  # pylint: disable=protected-access
+
+
+def _get_result(parse, datetime_string: str):
+    """Get parsed datetime or type of exception raised."""
+    try:
+        return parse(datetime_string)
+    except ValueError as exc:
+        return exc.__class__
+
+
+@pytest.mark.parametrize('from_iso_format', [True, False])
+@pytest.mark.parametrize('datetime_string', _DATETIME_STRINGS)
+def test_parse_datetime_fast_path(monkeypatch, datetime_string, from_iso_format):
+    """Test that fast path parses datetimes the same way strptime does, including rejected ones."""
+    # pylint: disable=protected-access
+    if not from_iso_format:
+        monkeypatch.setattr(utils, '_DATETIME_FROM_ISO_FORMAT', None)
+
+    parse = utils._parse_datetime.__wrapped__
+    expected = _get_result(_strptime, datetime_string)
+    assert _get_result(parse, datetime_string) == expected
+    if expected is not ValueError:
+        assert parse(datetime_string).tzinfo is None
+
+
+def test_parse_datetime_cached():
+    """Test that parsed datetimes are cached and None is passed through."""
+    assert utils.parse_datetime(None) is None
+    first = utils.parse_datetime('2018-03-04T05:06:07Z')
+    assert first == datetime.datetime(2018, 3, 4, 5, 6, 7)
+    assert utils.parse_datetime('2018-03-04T05:06:07Z') is first
+    with pytest.raises(ValueError):
+        utils.parse_datetime('2018-03-04T05:06:07.123Z')
+
+
+@pytest.mark.parametrize('datetime_string', _DATETIME_STRINGS[:4])
+def test_serialize_datetime(datetime_string):
+    """Test that datetimes are serialized the same way strftime does."""
+    # pylint: disable=protected-access
+    parsed = utils.parse_datetime(datetime_string)
+    assert utils.serialize_datetime(parsed) == parsed.strftime(utils._DATETIME_ISO_8601)
+    assert utils.serialize_datetime(None) is None
+
+
+def test_clear_datetime_cache():
+    """Test that datetimes are parsed again once the cache is cleared."""
+    first = utils.parse_datetime('2018-03-04T05:06:07Z')
+    utils.clear_datetime_cache()
+    second = utils.parse_datetime('2018-03-04T05:06:07Z')
+    assert second == first
+    assert second is not first
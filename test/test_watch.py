@@ -0,0 +1,159 @@
+"""Tests of polling repositories for issue changes."""
+
+import hashlib
+import json
+import urllib.parse
+
+import pytest
+
+from githubcap.classes import Issue
+from githubcap.exceptions import HTTPError
+from githubcap.exceptions import UserInputError
+from githubcap.watch import EVENT_CHANGED
+from githubcap.watch import EVENT_CREATED
+from githubcap.watch import EVENT_ERROR
+from githubcap.watch import IssuePoller
+
+
+def _issue(number: int, updated_at: str, **attributes) -> dict:
+    """Create an issue as returned by GitHub API, only attributes needed for polling are stated."""
+    issue = {
+        'number': number,
+        'title': 'Issue {:d}'.format(number),
+        'state': 'open',
+        'labels': [],
+        'created_at': '2018-01-01T00:00:00Z',
+        'updated_at': updated_at,
+    }
+    issue.update(attributes)
+    return issue
+
+
+class _IssueListing(object):
+    """A stub of API calls listing issues of fridex/githubcap, requests are recorded."""
+
+    def __init__(self):
+        """Initialize with no issues."""
+        self.issues = {}
+        self.requests = []
+        self.failing_pages = set()
+
+    def __call__(self, cls, uri, payload=None, method=None, json_response=True, headers=None):
+        """Answer listing of issues updated since the given time as Issue._call does."""
+        # pylint: disable=unused-argument,too-many-arguments
+        path, _, query_string = uri.partition('?')
+        assert path == '/repos/fridex/githubcap/issues'
+        query = dict(urllib.parse.parse_qsl(query_string))
+        self.requests.append((query, (headers or {}).get('If-None-Match')))
+
+        page = int(query['page'])
+        if page in self.failing_pages:
+            raise HTTPError({'message': 'Server Error'}, 500)
+
+        per_page = int(query['per_page'])
+        issues = sorted((issue for issue in self.issues.values() if issue['updated_at'] >= query['since']),
+                        key=lambda issue: issue['updated_at'], reverse=True)
+        content = issues[(page - 1) * per_page:page * per_page]
+        response_headers = {'ETag': '"{}"'.format(hashlib.sha1(json.dumps(content).encode()).hexdigest())}
+        if page * per_page < len(issues):
+            response_headers['Link'] = '<https://api.github.com{}?page={:d}>; rel="next"'.format(path, page + 1)
+
+        if headers and headers.get('If-None-Match') == response_headers['ETag']:
+            return None, response_headers
+        return content, response_headers
+
+
+@pytest.fixture
+def listing(monkeypatch, configuration):
+    """Stub API calls listing issues."""
+    # Issues stated only partially are listed.
+    configuration.validate_schemas = False
+    stub = _IssueListing()
+    monkeypatch.setattr(Issue, '_call', classmethod(stub))
+    return stub
+
+
+def _poll(poller: IssuePoller) -> list:
+    """Poll all repositories regardless of poll interval."""
+    # pylint: disable=protected-access
+    for state in poller._repositories:
+        state.next_poll = 0
+    return poller.poll()
+
+
+def test_poll_since_advanced(listing, configuration):  # pylint: disable=redefined-outer-name
+    """Test that listing start is moved forward once the first page is full, issues are reported once."""
+    configuration.per_page_listing = 2
+    listing.issues[1] = _issue(1, '2018-01-02T00:00:00Z')
+    poller = IssuePoller(['fridex/githubcap'], since='2018-01-01T00:00:00Z')
+
+    events = _poll(poller)
+    assert [(event['event'], event['number']) for event in events] == [(EVENT_CREATED, 1)]
+    assert listing.requests[-1][0]['since'] == '2018-01-01T00:00:00Z'
+
+    listing.issues[2] = _issue(2, '2018-01-03T00:00:00Z')
+    listing.issues[3] = _issue(3, '2018-01-04T00:00:00Z')
+    events = _poll(poller)
+    # Events are reported in the order issues were updated.
+    assert [(event['event'], event['number']) for event in events] == [(EVENT_CREATED, 2), (EVENT_CREATED, 3)]
+    assert [query['page'] for query, _ in listing.requests] == ['1', '1', '2']
+
+    # The first page was full, the listing starts at the most recent update seen.
+    assert _poll(poller) == []
+    assert listing.requests[-1] == ({'page': '1', 'per_page': '2', 'filter': 'all', 'state': 'all', 'sort': 'updated',
+                                     'direction': 'desc', 'since': '2018-01-04T00:00:00Z'}, None)
+
+    listing.issues[1] = _issue(1, '2018-01-05T00:00:00Z', state='closed')
+    events = _poll(poller)
+    assert [(event['event'], event['number']) for event in events] == [(EVENT_CHANGED, 1)]
+    # The previous version was seen before the listing start moved, so changes are not known.
+    assert 'changes' not in events[0]
+
+
+def test_poll_watched_fields(listing):  # pylint: disable=redefined-outer-name
+    """Test that only changes of watched fields are reported, issues updated before the first poll are a baseline."""
+    listing.issues[1] = _issue(1, '2099-01-01T00:00:00Z')
+    poller = IssuePoller(['fridex/githubcap'], fields=['state', 'labels'])
+    assert _poll(poller) == []
+
+    listing.issues[1] = _issue(1, '2099-01-02T00:00:00Z', title='Renamed')
+    assert _poll(poller) == []
+
+    listing.issues[1] = _issue(1, '2099-01-03T00:00:00Z', title='Renamed', state='closed',
+                               labels=[{'name': 'bug'}])
+    events = _poll(poller)
+    assert len(events) == 1
+    assert events[0]['changes'] == {
+        'state': {'old': 'open', 'new': 'closed'},
+        'labels': {'old': [], 'new': ['bug']},
+    }
+    assert events[0]['issue'] == listing.issues[1]
+
+    with pytest.raises(UserInputError):
+        IssuePoller(['fridex/githubcap'], fields=['unknown'])
+
+
+def test_poll_etag_not_kept_on_failure(listing, configuration):  # pylint: disable=redefined-outer-name
+    """Test that a listing is revalidated only once it was retrieved completely."""
+    configuration.per_page_listing = 2
+    for number in range(1, 4):
+        listing.issues[number] = _issue(number, '2018-01-0{:d}T00:00:00Z'.format(number + 1))
+    poller = IssuePoller(['fridex/githubcap'], since='2018-01-01T00:00:00Z')
+
+    listing.failing_pages.add(2)
+    events = _poll(poller)
+    assert [(event['event'], event['status_code']) for event in events] == [(EVENT_ERROR, 500)]
+    assert poller._repositories[0].etag is None  # pylint: disable=protected-access
+
+    # Nothing changed since, but the listing is retrieved again as it was not retrieved completely.
+    listing.failing_pages.clear()
+    events = _poll(poller)
+    assert listing.requests[-2][1] is None
+    assert sorted(event['number'] for event in events) == [1, 2, 3]
+    assert poller._repositories[0].since == '2018-01-04T00:00:00Z'  # pylint: disable=protected-access
+
+    # A listing retrieved completely is revalidated using its ETag.
+    assert _poll(poller) == []
+    assert _poll(poller) == []
+    assert listing.requests[-1][1] is not None
+    assert listing.requests[-1][1] == poller._repositories[0].etag  # pylint: disable=protected-access